@@ -1,19 +1,37 @@
 import os
 import requests
 
+from log_anaylzer.api_codec import FETCH_FORMAT, ACCEPT, decode_body
+
 API_BASE_URL = os.environ.get("API_BASE_URL", "http://localhost:5001")
 
+def iter_logs(log_type="cloud", range_type="daily", page_size=500):
+    """
+    DB API에서 정책 로그를 페이지 단위로 불러와 하나씩 yield
+    GET /api/policy?type={log_type}&range={range_type}&limit={page_size}[&cursor=...]
+    """
+    url = f"{API_BASE_URL}/api/policy"
+    params = {"type": log_type, "range": range_type, "limit": page_size}
+    while True:
+        try:
+            response = requests.get(url, params=params, headers={"Accept": ACCEPT[FETCH_FORMAT]})
+            response.raise_for_status()
+            data = decode_body(response)
+        except requests.RequestException as e:
+            print(f"❌ API 호출 오류: {e}")
+            return
+        yield from data.get("data", [])
+        if not data.get("next_cursor"):
+            return
+        params["cursor"] = data["next_cursor"]
+
 def fetch_logs(log_type="cloud", range_type="daily", limit=50):
     """
-    DB API에서 정책 로그 불러오기
-    GET /api/policy?type={log_type}&range={range_type}
+    DB API에서 정책 로그 최신 limit 건 불러오기
     """
-    url = f"{API_BASE_URL}/api/policy?type={log_type}&range={range_type}"
-    try:
-        response = requests.get(url, params={"limit": limit})
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", [])
-    except requests.RequestException as e:
-        print(f"❌ API 호출 오류: {e}")
-        return []
+    logs = []
+    for log in iter_logs(log_type, range_type, page_size=min(limit, 500)):
+        logs.append(log)
+        if len(logs) >= limit:
+            break
+    return logs
@@ -15,4 +15,8 @@ def create_app():
     # 앱에 Blueprint를 등록합니다. 이제 @bp.route로 정의된 모든 경로가 활성화됩니다.
     app.register_blueprint(main_bp)
 
+    # 조회 API 응답 압축 (gzip / brotli)
+    from . import http_cache
+    http_cache.init_app(app)
+
     return app
\ No newline at end of file
@@ -0,0 +1,13 @@
+"""
+AI 분석 Celery 작업 (app/services/analysis_jobs.py 의 작업 행을 실행)
+
+    celery -A celery_worker.celery_app worker -l info
+"""
+from celery_worker import celery_app
+from app.services import analysis_jobs
+
+
+@celery_app.task(name="analysis.run_job", ignore_result=True)
+def run_analysis_job(job_id):
+    """상태/결과는 analysis_jobs 테이블에 저장 (Celery result backend 는 쓰지 않음)"""
+    return analysis_jobs.run_job(job_id)
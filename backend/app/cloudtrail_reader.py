@@ -0,0 +1,109 @@
+"""
+CloudTrail 로그 스트리밍 리더
+
+{"Records": [ {...}, {...}, ... ]} 형식의 파일을 청크 단위로 읽으면서
+Records 배열의 각 객체를 원본 문자열 조각 그대로 하나씩 꺼낸다.
+- 파일 전체를 json.load 하지 않으므로 메모리는 청크 + 레코드 하나 크기로 제한
+- eventName 을 정규식으로 먼저 확인해 변경(mutating) 이벤트가 아니면 json 디코딩 없이 버림
+- 원본 조각을 raw_event 로 그대로 저장하므로 json.dumps 재직렬화가 필요 없음
+"""
+import re
+import json
+
+READ_CHUNK = 256 * 1024
+
+MUTATING_KEYWORDS = ("create", "put", "update", "delete")
+
+# 문자열 토큰 / 닫히지 않은 문자열의 시작 따옴표 / 중괄호
+_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|"|[{}]')
+_RECORDS = re.compile(r'"Records"\s*:\s*\[')
+_WS_COMMA = re.compile(r"[\s,]*")
+# CloudTrail 레코드에서 최상위 eventName 은 userIdentity 다음, requestParameters 앞에 온다
+_EVENT_NAME = re.compile(r'"eventName"\s*:\s*"([^"\\]*)"')
+_READ_ONLY_TRUE = re.compile(r'"readOnly"\s*:\s*true')
+
+
+def is_mutating_name(event_name):
+    lower = (event_name or "").lower()
+    return any(x in lower for x in MUTATING_KEYWORDS)
+
+
+def _object_end(buf, start):
+    """buf[start] 의 '{' 와 짝이 맞는 '}' 다음 위치. 버퍼 안에서 끝나지 않으면 None"""
+    depth = 0
+    for m in _TOKEN.finditer(buf, start):
+        tok = m.group()
+        if tok == "{":
+            depth += 1
+        elif tok == "}":
+            depth -= 1
+            if depth == 0:
+                return m.end()
+        elif tok == '"':
+            return None  # 문자열이 청크 경계에서 잘림
+    return None
+
+
+def iter_record_slices(f, chunk_size=READ_CHUNK):
+    """Records 배열의 각 객체를 원본 JSON 문자열로 yield. 형식이 깨졌으면 ValueError"""
+    buf, pos, eof = "", 0, False
+    in_records = False
+
+    def more():
+        nonlocal buf, pos, eof
+        data = f.read(chunk_size)
+        if not data:
+            eof = True
+            return False
+        if pos > chunk_size:
+            buf, pos = buf[pos:], 0
+        buf += data
+        return True
+
+    while True:
+        if not in_records:
+            m = _RECORDS.search(buf, pos)
+            if m:
+                in_records, pos = True, m.end()
+                continue
+            if not more():
+                return  # Records 키 없음
+            continue
+
+        pos = _WS_COMMA.match(buf, pos).end()
+        if pos >= len(buf):
+            if not more():
+                raise ValueError("Records 배열이 닫히지 않았습니다.")
+            continue
+        ch = buf[pos]
+        if ch == "]":
+            return
+        if ch != "{":
+            raise ValueError(f"Records 항목이 객체가 아닙니다: {buf[pos:pos + 20]!r}")
+
+        end = _object_end(buf, pos)
+        if end is None:
+            if not more():
+                raise ValueError("레코드가 중간에 끊겼습니다.")
+            continue
+        yield buf[pos:end]
+        pos = end
+
+
+def iter_mutating_events(f, chunk_size=READ_CHUNK, counts=None):
+    """
+    변경 이벤트만 (event dict, 원본 문자열) 로 yield.
+    eventName 으로 비변경 이벤트를 디코딩 전에 버리고,
+    readOnly:true 가 조각 어디에도 없으면 readOnly 검사도 디코딩 후 dict 로 맡긴다.
+    counts 를 넘기면 counts["records"] 에 읽은 전체 레코드 수를 센다.
+    """
+    for raw in iter_record_slices(f, chunk_size):
+        if counts is not None:
+            counts["records"] = counts.get("records", 0) + 1
+        m = _EVENT_NAME.search(raw)
+        if m and not is_mutating_name(m.group(1)):
+            continue
+        event = json.loads(raw)
+        if _READ_ONLY_TRUE.search(raw) and event.get("readOnly"):
+            continue
+        yield event, raw
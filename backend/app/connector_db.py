@@ -1,37 +1,459 @@
 import os
+import time
+import threading
+from contextlib import contextmanager
+
 import mysql.connector
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_connection():
+# 커넥션 풀 설정
+POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "10"))          # 빈 커넥션 대기 최대 초
+POOL_RECYCLE = int(os.getenv("MYSQL_POOL_RECYCLE", "1800"))          # 이 시간(초)이 지난 커넥션은 새로 연결
+POOL_PING_AFTER = float(os.getenv("MYSQL_POOL_PING_AFTER", "5"))    # 이 시간(초) 이상 쉰 커넥션은 체크아웃 시 ping
+
+
+# 호스트 장애 조치(failover) / 서킷 브레이커 설정
+FAILOVER_COOLDOWN = float(os.getenv("MYSQL_FAILOVER_COOLDOWN", "30"))  # 실패 호스트를 건너뛰는 최소 시간(초)
+PROBE_INTERVAL = float(os.getenv("MYSQL_PROBE_INTERVAL", "10"))        # 차단된 호스트 재확인 주기(초)
+FAILBACK = os.getenv("MYSQL_FAILBACK", "1") == "1"                     # 복구된 앞 순위 호스트로 복귀
+
+
+def _connect_host(host):
+    return mysql.connector.connect(
+        host=host,
+        port=int(os.getenv("MYSQL_PORT", "3306")),
+        user=os.getenv("MYSQL_USER"),
+        password=os.getenv("MYSQL_PASSWORD"),
+        database=os.getenv("MYSQL_DB"),
+        connection_timeout=int(os.getenv("MYSQL_CONNECT_TIMEOUT", "5")),
+    )
+
+
+def _configured_hosts(role="primary"):
     """
-    MYSQL_HOSTS에 여러 호스트를 콤마(,)로 나열하면 순서대로 접속 시도.
-    예: MYSQL_HOSTS=192.168.5.30,127.0.0.1
+    primary: 쓰기 + 기본 읽기 (MYSQL_HOSTS, 없으면 MYSQL_HOST)
+    replica: 읽기 전용 복제본 (MYSQL_REPLICA_HOSTS, 비어 있으면 읽기 분리 안 함)
     """
-    hosts_env = os.getenv("MYSQL_HOSTS") or os.getenv("MYSQL_HOST", "127.0.0.1")
-    hosts = [h.strip() for h in hosts_env.split(",") if h.strip()]
-    port = int(os.getenv("MYSQL_PORT", "3306"))
-    user = os.getenv("MYSQL_USER")
-    password = os.getenv("MYSQL_PASSWORD")
-    database = os.getenv("MYSQL_DB")
-    timeout = int(os.getenv("MYSQL_CONNECT_TIMEOUT", "5"))
+    if role == "replica":
+        hosts_env = os.getenv("MYSQL_REPLICA_HOSTS", "")
+    else:
+        hosts_env = os.getenv("MYSQL_HOSTS") or os.getenv("MYSQL_HOST", "127.0.0.1")
+    return [h.strip() for h in hosts_env.split(",") if h.strip()]
+
 
-    last_err = None
+class HostTopology:
+    """
+    MYSQL_HOSTS 에 나열된 호스트(앞쪽이 우선순위 높음)의 상태를 기억한다.
+    - 마지막으로 접속에 성공한 호스트를 먼저 시도 (매 요청마다 죽은 첫 호스트에서 타임아웃 나지 않도록)
+    - 접속 실패한 호스트는 서킷을 열어(open) 후보에서 제외
+    - 백그라운드 prober 가 열린 호스트에 주기적으로 접속해 보고 복구되면 다시 받아들임
+    - 모든 호스트가 열려 있으면 마지막 수단으로 전부 순서대로 시도
+    """
 
-    for host in hosts:
+    def __init__(self, hosts, connect=_connect_host):
+        self.hosts = list(hosts)
+        self._connect = connect
+        self._lock = threading.Lock()
+        self._health = {
+            h: {"state": "closed", "failures": 0, "opened_at": None,
+                "last_error": None, "last_ok": None, "probes": 0}
+            for h in self.hosts
+        }
+        self.preferred = self.hosts[0] if self.hosts else None
+        self.failovers = 0
+        self.failbacks = 0
+        self._prober = None
+
+    def _candidates(self):
+        with self._lock:
+            closed = [h for h in self.hosts if self._health[h]["state"] == "closed"]
+            if self.preferred in closed:
+                closed.remove(self.preferred)
+                closed.insert(0, self.preferred)
+            return closed or list(self.hosts)
+
+    def available(self):
+        """서킷이 닫힌(사용 가능한) 호스트가 하나라도 있는지"""
+        with self._lock:
+            return any(hh["state"] == "closed" for hh in self._health.values())
+
+    def _mark_ok(self, host):
+        with self._lock:
+            hh = self._health[host]
+            hh.update({"state": "closed", "last_ok": time.time()})
+            if host != self.preferred:
+                self.failovers += 1
+                print(f"[DB] failover: {self.preferred} → {host}")
+                self.preferred = host
+
+    def _mark_failed(self, host, err):
+        with self._lock:
+            hh = self._health[host]
+            hh["failures"] += 1
+            hh["last_error"] = str(err)
+            if hh["state"] != "open":
+                hh["state"] = "open"
+                hh["opened_at"] = time.monotonic()
+                print(f"[DB] circuit open: {host} ({err})")
+        self._ensure_prober()
+
+    def connect(self):
+        last_err = None
+        for host in self._candidates():
+            try:
+                conn = self._connect(host)
+            except Exception as e:
+                last_err = e
+                self._mark_failed(host, e)
+                continue
+            self._mark_ok(host)
+            return conn
+        # 모든 시도가 실패하면 마지막 에러를 발생시킴
+        raise last_err or RuntimeError("No available MySQL hosts")
+
+    # ------------------------------
+    # 백그라운드 prober
+    # ------------------------------
+    def _ensure_prober(self):
+        with self._lock:
+            if self._prober is not None and self._prober.is_alive():
+                return
+            self._prober = threading.Thread(target=self._probe_loop, name="mysql-prober", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        while True:
+            time.sleep(PROBE_INTERVAL)
+            with self._lock:
+                now = time.monotonic()
+                targets = [h for h in self.hosts
+                           if self._health[h]["state"] == "open"
+                           and now - self._health[h]["opened_at"] >= FAILOVER_COOLDOWN]
+                any_open = any(hh["state"] == "open" for hh in self._health.values())
+            if not any_open:
+                return
+            for host in targets:
+                self._probe(host)
+
+    def _probe(self, host):
+        with self._lock:
+            self._health[host]["probes"] += 1
         try:
-            return mysql.connector.connect(
-                host=host,
-                port=port,
-                user=user,
-                password=password,
-                database=database,
-                connection_timeout=timeout,
-            )
+            self._connect(host).close()
         except Exception as e:
-            last_err = e
-            continue
+            with self._lock:
+                self._health[host]["last_error"] = str(e)
+                self._health[host]["opened_at"] = time.monotonic()
+            return
+        with self._lock:
+            self._health[host].update({"state": "closed", "last_ok": time.time()})
+            print(f"[DB] host recovered: {host}")
+            if FAILBACK and self.hosts.index(host) < self.hosts.index(self.preferred):
+                self.failbacks += 1
+                print(f"[DB] failback: {self.preferred} → {host}")
+                self.preferred = host
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            hosts = []
+            for h in self.hosts:
+                hh = self._health[h]
+                hosts.append({
+                    "host": h,
+                    "state": hh["state"],
+                    "failures": hh["failures"],
+                    "probes": hh["probes"],
+                    "open_for_sec": round(now - hh["opened_at"], 1) if hh["state"] == "open" else None,
+                    "last_error": hh["last_error"],
+                    "last_ok": hh["last_ok"],
+                })
+            return {
+                "preferred": self.preferred,
+                "failovers": self.failovers,
+                "failbacks": self.failbacks,
+                "hosts": hosts,
+            }
+
+
+_topologies = {}
+_topology_pid = None
+
+
+def get_topology(role="primary"):
+    global _topologies, _topology_pid
+    if _topology_pid != os.getpid():
+        _topologies, _topology_pid = {}, os.getpid()
+    if role not in _topologies:
+        _topologies[role] = HostTopology(_configured_hosts(role))
+    return _topologies[role]
+
+
+def _connect(role="primary"):
+    """현재 건강한 호스트에 새 커넥션 생성 (호스트 순서 + 서킷 브레이커)"""
+    return get_topology(role).connect()
+
+
+class PoolTimeout(RuntimeError):
+    pass
+
+
+class PooledConnection:
+    """
+    실제 MySQL 커넥션을 감싼 프록시. close() 하면 끊지 않고 풀로 반납한다.
+    기존 코드의 conn.cursor() / commit() / close() 패턴을 그대로 쓸 수 있다.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise AttributeError(f"connection already returned to pool ({name})")
+        return getattr(raw, name)
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw, self._created_at)
+
+    def discard(self):
+        """
+        풀로 돌려보내지 않고 끊음.
+        스트리밍 조회를 중간에 멈춘 경우 남은 결과를 끝까지 읽어 버리는 대신 사용
+        """
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._discard(raw)
+
+    def __del__(self):
+        # 반납 누락 시 안전망
+        if self.__dict__.get("_raw") is not None:
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self._raw is not None:
+            try:
+                self._raw.rollback()
+            except Exception:
+                pass
+        self.close()
+
+
+class ConnectionPool:
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT, connect=_connect):
+        self.size = size
+        self.timeout = timeout
+        self._connect = connect
+        self._idle = []          # (raw, created_at, released_at)
+        self._open = 0           # 풀이 관리 중인 커넥션 수 (idle + 사용 중 + 생성 중)
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total_ms": 0.0,
+            "wait_time_max_ms": 0.0,
+            "validation_failures": 0,
+            "timeouts": 0,
+        }
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._open -= 1
+            self._stats["closed"] += 1
+            self._cond.notify()
+
+    def _valid(self, raw, created_at, released_at):
+        now = time.monotonic()
+        if now - created_at > POOL_RECYCLE:
+            return False
+        if now - released_at < POOL_PING_AFTER:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        start = time.monotonic()
+        waited = False
+        while True:
+            with self._cond:
+                while not self._idle and self._open >= self.size:
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"MySQL pool exhausted (size={self.size})")
+                    waited = True
+                    self._cond.wait(remaining)
+                item = self._idle.pop() if self._idle else None
+                if item is None:
+                    self._open += 1
+
+            if item is not None:
+                raw, created_at, released_at = item
+                if not self._valid(raw, created_at, released_at):
+                    with self._cond:
+                        self._stats["validation_failures"] += 1
+                    self._discard(raw)
+                    continue
+            else:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                created_at = time.monotonic()
+                with self._cond:
+                    self._stats["created"] += 1
+            break
+
+        wait_ms = (time.monotonic() - start) * 1000
+        with self._cond:
+            s = self._stats
+            s["checkouts"] += 1
+            if waited:
+                s["waits"] += 1
+                s["wait_time_total_ms"] += wait_ms
+                s["wait_time_max_ms"] = max(s["wait_time_max_ms"], wait_ms)
+        return PooledConnection(self, raw, created_at)
+
+    def _release(self, raw, created_at):
+        # 읽지 않은 결과/열린 트랜잭션을 정리해 다음 사용자에게 깨끗한 상태로 넘김
+        try:
+            if raw.unread_result:
+                raw.consume_results()
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        with self._cond:
+            self._idle.append((raw, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            s = dict(self._stats)
+            s.update({
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "checked_out": self._open - len(self._idle),
+            })
+        s["wait_time_total_ms"] = round(s["wait_time_total_ms"], 2)
+        s["wait_time_max_ms"] = round(s["wait_time_max_ms"], 2)
+        return s
+
+
+_pools = {}
+_pool_pid = None
+_pool_lock = threading.Lock()
+_abandoned = []  # fork 이전 풀: 부모와 소켓을 공유하므로 자식에서 닫지 않고 버림
+
+_routing_lock = threading.Lock()
+_routing = {"primary": 0, "reads_primary": 0, "reads_replica": 0, "replica_fallbacks": 0}
+
+
+def get_pool(role="primary"):
+    global _pools, _pool_pid
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            _abandoned.extend(_pools.values())
+            _pools, _pool_pid = {}, os.getpid()
+        if role not in _pools:
+            _pools[role] = ConnectionPool(connect=lambda: _connect(role))
+        return _pools[role]
+
+
+def has_replicas():
+    return bool(_configured_hosts("replica"))
+
+
+def _count(key):
+    with _routing_lock:
+        _routing[key] += 1
+
+
+def get_connection(readonly=False):
+    """
+    풀에서 커넥션을 빌려 반환. conn.close() 시 풀로 반납됨
+    readonly=True 이면 복제본(MYSQL_REPLICA_HOSTS)으로 보내고,
+    복제본이 없거나 모두 접속 불가면 primary 로 대체
+    """
+    if not readonly:
+        _count("primary")
+        return get_pool().acquire()
+    if has_replicas():
+        # 복제본이 모두 차단된 상태면 접속 시도 없이 바로 primary (복구는 prober 가 처리)
+        if get_topology("replica").available():
+            try:
+                conn = get_pool("replica").acquire()
+                _count("reads_replica")
+                return conn
+            except PoolTimeout:
+                raise
+            except Exception as e:
+                print(f"[DB] replica unavailable, reading from primary: {e}")
+        _count("replica_fallbacks")
+    _count("reads_primary")
+    return get_pool().acquire()
+
+
+@contextmanager
+def connection(readonly=False):
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        ...
+    블록을 벗어나면 반납, 예외 시 롤백
+    """
+    conn = get_connection(readonly=readonly)
+    with conn:
+        yield conn
+
+
+def pool_stats(role="primary"):
+    return get_pool(role).stats()
+
+
+def topology_stats(role="primary"):
+    return get_topology(role).snapshot()
+
+
+def routing_stats():
+    with _routing_lock:
+        s = dict(_routing)
+    s["replicas"] = _configured_hosts("replica")
+    return s
+
 
-    # 모든 시도가 실패하면 마지막 에러를 발생시킴
-    raise last_err or RuntimeError("No available MySQL hosts")
+def db_stats():
+    """primary/replica 풀·토폴로지와 읽기/쓰기 라우팅 집계"""
+    stats = {
+        "pool": pool_stats(),
+        "topology": topology_stats(),
+        "routing": routing_stats(),
+    }
+    if has_replicas():
+        stats["replica_pool"] = pool_stats("replica")
+        stats["replica_topology"] = topology_stats("replica")
+    return stats
@@ -1,25 +1,8 @@
 # 파일 전체를 이 코드로 교체하세요.
 
-import os
-import mysql.connector
-from dotenv import load_dotenv
-
-# .env 파일의 환경 변수를 로드합니다.
-load_dotenv()
-
-# [수정] DB 접속 정보를 받아 새 커넥션을 반환하는 함수
-def get_connection():
-    """
-    .env 파일의 정보를 바탕으로 새로운 DB 커넥션을 생성하고 반환합니다.
-    """
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOSTS"),  # .env 파일에 MYSQL_HOSTS로 되어 있어 맞춤
-        port=os.getenv("MYSQL_PORT", 3306),
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        database=os.getenv("MYSQL_DB"),
-        connect_timeout=int(os.getenv("MYSQL_CONNECT_TIMEOUT", 5))
-    )
+from app.connector_db import get_connection
+
+# [수정] 커넥션은 공용 풀(app.connector_db)에서 빌려 쓰고 close() 시 반납합니다.
 
 # [삭제] 전역 변수 conn, cursor를 삭제했습니다.
 
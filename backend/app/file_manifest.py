@@ -0,0 +1,160 @@
+"""
+적재 완료 파일 매니페스트 (ingest_file_manifest)
+
+cron 로더(save_log.py / save_cloudtrail.py)가 같은 날 디렉터리를 반복 적재해도
+새 파일이나 내용이 바뀐 파일만 처리하도록 (loader, path) 별 size / mtime / sha256 을 기록한다.
+
+파일 단위 커밋 프로토콜:
+    info = check_file(cur, loader, path)   # None 이면 이미 적재됨 → skip
+    ... 파일의 행들을 INSERT ...
+    record_file(cur, loader, path, info, rows)
+    conn.commit()                            # 데이터 + 매니페스트가 같은 트랜잭션
+
+커밋 전에 죽으면 데이터와 매니페스트가 함께 롤백되므로 재실행해도 중복되지 않는다.
+
+동시 실행: check_file 이 (loader, path) 행을 먼저 INSERT IGNORE 로 선점한 뒤 SELECT ... FOR UPDATE 로 잠근다.
+잠금은 파일 커밋까지 유지되므로, 같은 파일을 동시에 집은 다른 로더는 커밋을 기다렸다가 "적재됨" 으로 skip 한다.
+(innodb_lock_wait_timeout 을 넘기면 그 실행에서는 skip)
+
+내용이 바뀐 파일: check_file(allow_changed=True) 는 info["changed"] 를 True 로 돌려준다.
+- flow log: record_file 에 넘긴 log_id 구간(ingest_file_rows)으로 이전 적재 행과 롤업 기여분을
+  같은 파일 트랜잭션 안에서 지운 뒤 다시 적재 (save_log.unload_file)
+- CloudTrail: 이미 저장된 event_id 를 걸러내므로 그대로 재적재
+allow_changed=False 인 로더는 경고만 남기고 건너뛴다.
+"""
+import os
+import hashlib
+
+from mysql.connector import errors as mysql_errors
+
+LOCK_WAIT_TIMEOUT_ERRNO = 1205
+
+MANIFEST_DDL = """
+CREATE TABLE IF NOT EXISTS ingest_file_manifest (
+    id           BIGINT AUTO_INCREMENT PRIMARY KEY,
+    loader       VARCHAR(32)  NOT NULL,
+    path         VARCHAR(512) NOT NULL,
+    size         BIGINT       NOT NULL,
+    mtime        DOUBLE       NOT NULL,
+    sha256       CHAR(64)     NOT NULL,
+    rows_loaded  INT          NOT NULL DEFAULT 0,
+    processed_at DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_manifest_loader_path (loader, path)
+)
+"""
+
+# 파일별 적재 log_id 구간 (multi-row INSERT 한 번이 받은 연속 AUTO_INCREMENT 구간 단위)
+FILE_ROWS_DDL = """
+CREATE TABLE IF NOT EXISTS ingest_file_rows (
+    manifest_id   BIGINT NOT NULL,
+    first_log_id  BIGINT NOT NULL,
+    last_log_id   BIGINT NOT NULL,
+    PRIMARY KEY (manifest_id, first_log_id)
+)
+"""
+
+
+def ensure_table(cur):
+    cur.execute(MANIFEST_DDL)
+    cur.execute(FILE_ROWS_DDL)
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def check_file(cur, loader, path, allow_changed=False):
+    """
+    적재가 필요하면 {"id", "size", "mtime", "sha256", "changed", "rows_loaded"} 를, 건너뛸 파일이면 None 을 반환.
+    changed: 이전에 다른 내용으로 적재한 파일 (rows_loaded 는 그때 저장한 행 수)
+    size/mtime 이 같으면 해시 계산 없이 skip, 다르면 해시로 내용 변경 여부를 판정.
+    반환 후 매니페스트 행은 호출 측 트랜잭션이 끝날 때까지 잠겨 있다.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    try:
+        # 처음 보는 파일이면 빈 선점 행(sha256='') 을 만들어 잠금 대상이 항상 존재하도록 함
+        cur.execute(
+            """
+            INSERT IGNORE INTO ingest_file_manifest (loader, path, size, mtime, sha256, rows_loaded)
+            VALUES (%s, %s, 0, 0, '', 0)
+            """,
+            (loader, path),
+        )
+        cur.execute(
+            """
+            SELECT size, mtime, sha256, id, rows_loaded
+            FROM ingest_file_manifest WHERE loader=%s AND path=%s FOR UPDATE
+            """,
+            (loader, path),
+        )
+    except mysql_errors.DatabaseError as e:
+        if e.errno != LOCK_WAIT_TIMEOUT_ERRNO:
+            raise
+        print(f"[SKIP] 다른 로더가 적재 중: {path}")
+        return None
+    row = cur.fetchone()
+    manifest_id = row[3]
+    if not row[2]:
+        row = None  # 방금 선점한 새 파일
+    if row and int(row[0]) == st.st_size and abs(float(row[1]) - st.st_mtime) < 1e-6:
+        return None
+
+    digest = sha256_file(path)
+    if row and row[2] == digest:
+        # 내용은 같고 mtime 만 바뀜(aws s3 sync 재다운로드 등) → 메타데이터만 갱신
+        cur.execute(
+            "UPDATE ingest_file_manifest SET size=%s, mtime=%s WHERE loader=%s AND path=%s",
+            (st.st_size, st.st_mtime, loader, path),
+        )
+        return None
+    if row and not allow_changed:
+        print(f"[WARN] 이미 적재한 파일의 내용이 바뀌어 건너뜀 (다시 적재하면 이전 행과 중복): {path}")
+        return None
+    return {"id": manifest_id, "size": st.st_size, "mtime": st.st_mtime, "sha256": digest,
+            "changed": row is not None, "rows_loaded": int(row[4]) if row else 0}
+
+
+def id_ranges(ids, step=1):
+    """log_id 목록 → 연속 구간 [(first, last)] (step: auto_increment_increment)"""
+    ranges = []
+    for log_id in ids:
+        if ranges and log_id == ranges[-1][1] + step:
+            ranges[-1][1] = log_id
+        else:
+            ranges.append([log_id, log_id])
+    return [tuple(r) for r in ranges]
+
+
+def file_row_ranges(cur, manifest_id):
+    """이전 적재 때 기록한 log_id 구간"""
+    cur.execute(
+        "SELECT first_log_id, last_log_id FROM ingest_file_rows WHERE manifest_id=%s ORDER BY first_log_id",
+        (manifest_id,),
+    )
+    return cur.fetchall()
+
+
+def record_file(cur, loader, path, info, rows, ranges=None):
+    """ranges: 이번에 저장한 log_id 구간 (넘기면 이전 구간을 대체, 변경 시 삭제 재적재에 사용)"""
+    cur.execute(
+        """
+        INSERT INTO ingest_file_manifest (loader, path, size, mtime, sha256, rows_loaded, processed_at)
+        VALUES (%s, %s, %s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            size=VALUES(size), mtime=VALUES(mtime), sha256=VALUES(sha256),
+            rows_loaded=VALUES(rows_loaded), processed_at=NOW()
+        """,
+        (loader, os.path.abspath(path), info["size"], info["mtime"], info["sha256"], rows),
+    )
+    if ranges is not None:
+        cur.execute("DELETE FROM ingest_file_rows WHERE manifest_id=%s", (info["id"],))
+        if ranges:
+            cur.executemany(
+                "INSERT INTO ingest_file_rows (manifest_id, first_log_id, last_log_id) VALUES (%s, %s, %s)",
+                [(info["id"], first, last) for first, last in ranges],
+            )
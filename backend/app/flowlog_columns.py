@@ -0,0 +1,148 @@
+"""
+VPC Flow Log 컬럼 단위(batch) 파서
+
+파일(또는 줄 묶음)을 필드별 컬럼 리스트로 바꾸고, epoch → KST 변환과 정수 캐스팅을
+NumPy 로 한 번에 처리한다. writer 는 컬럼을 zip 해서 executemany 파라미터로 쓴다.
+"""
+import json
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+
+kst = timezone(timedelta(hours=9))
+KST_OFFSET_SEC = 9 * 3600
+
+FIELDS = [
+    "version", "account-id", "interface-id", "srcaddr", "dstaddr",
+    "srcport", "dstport", "protocol", "packets", "bytes",
+    "start", "end", "action", "log-status",
+]
+
+# json.dumps(entry, ensure_ascii=False) 와 같은 모양의 raw_log 템플릿
+_RAW_TEMPLATE = "{" + ", ".join(f'"{f}": "%s"' for f in FIELDS) + "}"
+
+
+def split_lines(lines):
+    """줄 묶음 → (필드 14개 튜플 리스트, 오류 줄 수). 헤더/빈 줄은 건너뜀"""
+    rows, errors = [], 0
+    for line in lines:
+        parts = line.split()
+        if not parts or parts[0] == "version":
+            continue
+        if len(parts) < 14:
+            errors += 1
+            continue
+        rows.append(parts[:14])
+    return rows, errors
+
+
+def _int_column(values):
+    """숫자 문자열 컬럼 → (int64 배열, 유효 마스크). '-' 등은 마스크 False"""
+    arr = np.asarray(values)
+    mask = np.char.isdigit(arr)
+    ints = np.where(mask, arr, "0").astype(np.int64)
+    return ints, mask
+
+
+def _nullable_ints(values):
+    ints, mask = _int_column(values)
+    return np.where(mask, ints.astype(object), None).tolist()
+
+
+def epoch_to_kst(values):
+    """epoch(초/밀리초) 문자열 컬럼 → KST naive datetime 리스트 (변환 불가 시 None)"""
+    e, mask = _int_column(values)
+    mask &= e > 0
+    e = np.where(e > 10**12, e // 1000, e) + KST_OFFSET_SEC
+    dts = e.astype("datetime64[s]").astype(object)
+    return np.where(mask, dts, None).tolist()
+
+
+def _raw_log(row):
+    if any('"' in v or "\\" in v for v in row):
+        return json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False)
+    return _RAW_TEMPLATE % tuple(row)
+
+
+def parse_columns(lines):
+    """
+    줄 묶음 → 컬럼 dict.
+    반환 키: FIELDS 각각(문자열 튜플) + start_dt, end_dt, srcport_i, dstport_i, version_i, raw_log
+    """
+    rows, errors = split_lines(lines)
+    if not rows:
+        return None, errors
+
+    cols = dict(zip(FIELDS, zip(*rows)))
+    cols["start_dt"] = epoch_to_kst(cols["start"])
+    cols["end_dt"] = epoch_to_kst(cols["end"])
+    cols["srcport_i"] = _nullable_ints(cols["srcport"])
+    cols["dstport_i"] = _nullable_ints(cols["dstport"])
+    cols["version_i"] = _nullable_ints(cols["version"])
+    cols["raw_log"] = [_raw_log(r) for r in rows]
+    cols["count"] = len(rows)
+    return cols, errors
+
+
+def start_times(cols):
+    """
+    행별 기준 시각 (start 변환 실패 시 현재 KST 시각).
+    log_common.timestamp 와 log_cloud.start_time 이 같은 값(같은 일자 파티션)을 쓰도록 한 번만 계산
+    """
+    if "start_ts" not in cols:
+        now = datetime.now(kst).replace(tzinfo=None)
+        cols["start_ts"] = [ts if ts is not None else now for ts in cols["start_dt"]]
+    return cols["start_ts"]
+
+
+def common_rows(cols, log_type="CLOUD"):
+    """log_common INSERT 파라미터"""
+    return [(log_type, ts, raw) for ts, raw in zip(start_times(cols), cols["raw_log"])]
+
+
+def cloud_rows(cols, first_id, step=1):
+    """log_cloud INSERT 파라미터 (log_id 는 first_id 부터 step 간격)"""
+    n = cols["count"]
+    ids = range(first_id, first_id + n * step, step)
+    return list(zip(
+        ids,
+        cols["version_i"],
+        cols["account-id"],
+        cols["interface-id"],
+        cols["srcaddr"],
+        cols["dstaddr"],
+        cols["protocol"],
+        cols["srcport_i"],
+        cols["dstport_i"],
+        cols["packets"],
+        cols["bytes"],
+        start_times(cols),
+        cols["end_dt"],
+        cols["action"],
+        cols["log-status"],
+    ))
+
+
+def flowlog_rollup_rows(cols):
+    """롤업 입력 (ts, log_type, src, dst, dport, protocol, action, packets, bytes)"""
+    return zip(
+        start_times(cols),
+        ["CLOUD"] * cols["count"],
+        cols["srcaddr"],
+        cols["dstaddr"],
+        cols["dstport_i"],
+        cols["protocol"],
+        cols["action"],
+        cols["packets"],
+        cols["bytes"],
+    )
+
+
+def iter_file_columns(f, chunk_lines=10000):
+    """열린 파일에서 chunk_lines 줄씩 읽어 (cols, errors) 를 yield"""
+    while True:
+        lines = f.readlines(chunk_lines * 160)  # 평균 줄 길이 ~120~160 바이트 가정
+        if not lines:
+            return
+        cols, errors = parse_columns(lines)
+        yield cols, errors
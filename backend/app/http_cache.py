@@ -0,0 +1,139 @@
+"""
+조회 API HTTP 최적화: 응답 압축(gzip / brotli) + 조건부 GET(ETag → 304)
+
+- init_app(app): after_request 에서 COMPRESS_MIN_BYTES 이상인 응답을 Accept-Encoding 에 맞춰 압축
+  (brotli 패키지가 있으면 br 우선, 없으면 gzip)
+- @conditional: 뷰 응답에 강한(strong) ETag 를 붙이고 If-None-Match 가 같으면 본문 없이 304
+  뷰가 set_validator() 로 ETag 를 정하지 않았으면 본문 해시(스냅샷 해시)를 사용
+- not_modified(): 쿼리 전에 최신 id 같은 값싼 validator 로 먼저 304 판단
+
+압축한 응답은 표현(representation)이 다르므로 ETag 뒤에 "-gzip" / "-br" 를 붙인다.
+클라이언트가 어느 쪽 ETag 를 보내도 같은 원본이면 304.
+"""
+import os
+import gzip
+import hashlib
+import functools
+
+from flask import request, make_response
+
+try:
+    import brotli
+except ImportError:  # brotli 는 선택 사항
+    brotli = None
+
+COMPRESS_ENABLED = os.getenv("HTTP_COMPRESS", "1") == "1"
+COMPRESS_MIN_BYTES = int(os.getenv("HTTP_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("HTTP_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("HTTP_BROTLI_QUALITY", "4"))  # 11 은 압축률은 좋지만 요청마다 쓰기엔 느림
+
+COMPRESSIBLE = {
+    "application/json",
+    "application/vnd.fortizero.columnar+json",
+    "application/msgpack",
+    "application/vnd.apache.arrow.stream",
+}
+ENCODING_SUFFIX = {"gzip": "-gzip", "br": "-br"}
+
+
+# ==============================
+# 조건부 GET
+# ==============================
+def validator(*parts):
+    """ETag 값 (구성 요소를 이어 해시)"""
+    raw = "\x1f".join(str(p) for p in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def set_validator(resp, *parts):
+    """뷰에서 본문 대신 최신 log_id / version_id 등으로 ETag 지정"""
+    resp.set_etag(validator(*parts))
+    return resp
+
+
+def _matches(etag):
+    inm = request.if_none_match
+    if not inm:
+        return None
+    if inm.star_tag:
+        return etag
+    for candidate in [etag] + [etag + s for s in ENCODING_SUFFIX.values()]:
+        if inm.contains(candidate):
+            return candidate
+    return None
+
+
+def _not_modified(etag, vary=()):
+    resp = make_response("", 304)
+    resp.set_etag(etag)
+    resp.vary.update(vary)
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def not_modified(*parts, vary=()):
+    """
+    본문을 만들기 전에 값싼 validator(최신 id 등)로 If-None-Match 확인.
+    맞으면 304 응답, 아니면 None → 뷰는 같은 parts 로 set_validator() 후 본문 생성
+    vary: 200 응답과 같은 Vary 헤더 (형식 협상 응답이면 ("Accept",))
+    """
+    matched = _matches(validator(*parts))
+    return _not_modified(matched, vary) if matched else None
+
+
+def conditional(view):
+    """GET 200 응답에 ETag 를 붙이고 If-None-Match 가 맞으면 304 (스트리밍 응답은 제외)"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        resp = make_response(view(*args, **kwargs))
+        if request.method != "GET" or resp.status_code != 200 or resp.is_streamed:
+            return resp
+        etag, _ = resp.get_etag()
+        if not etag:
+            etag = hashlib.sha1(resp.get_data()).hexdigest()
+            resp.set_etag(etag)
+        matched = _matches(etag)
+        if matched:
+            return _not_modified(matched, resp.vary)
+        return resp
+    return wrapper
+
+
+# ==============================
+# 압축
+# ==============================
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(resp):
+    if (not COMPRESS_ENABLED or resp.status_code != 200 or resp.direct_passthrough or resp.is_streamed
+            or resp.mimetype not in COMPRESSIBLE or "Content-Encoding" in resp.headers):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    encoding = _choose_encoding()
+    if encoding is None:
+        return resp
+    body = resp.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return resp
+
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    resp.set_data(compressed)
+    resp.headers["Content-Encoding"] = encoding
+    etag, weak = resp.get_etag()
+    if etag:
+        resp.set_etag(etag + ENCODING_SUFFIX[encoding], weak)
+    return resp
+
+
+def init_app(app):
+    app.after_request(compress_response)
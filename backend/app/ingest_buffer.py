@@ -0,0 +1,371 @@
+"""
+로그 인입 write-behind 버퍼
+
+- 수신한 로그를 append-only 스풀 파일(NDJSON)에 기록(fsync)한 뒤 메모리 큐에 넣고 바로 응답
+- 백그라운드 flusher 가 크기(LOG_FLUSH_SIZE) 또는 경과 시간(LOG_FLUSH_AGE) 기준으로 MySQL 에 저장
+- 저장 성공 시 스풀 오프셋을 체크포인트(.ckpt)에 기록, DB 장애(접속/연결 오류) 시 같은 배치를 재시도
+- 레코드는 스풀 기록 전에 검증/정규화 (시각·필수 필드·숫자 필드), 잘못된 레코드는 거부
+- 그 밖의 오류로 저장에 실패한 레코드는 dead-letter 파일에 남기고 체크포인트를 넘김
+  (한 레코드 때문에 flusher 가 멈춰 큐가 차고 모든 인입이 503 이 되지 않도록)
+- 프로세스가 죽어 남은 스풀 파일(잠금 해제 상태)은 다음 프로세스의 flusher 가 재적재
+  (커밋 직후 체크포인트 기록 전에 죽으면 해당 배치가 한 번 더 저장될 수 있음: at-least-once)
+"""
+import os
+import json
+import glob
+import time
+import fcntl
+import threading
+from collections import deque
+
+from mysql.connector import errors as mysql_errors
+
+from log_db import insert_logs_onprem_bulk, insert_log_policy, policy_time
+from connector_db import PoolTimeout
+
+WRITE_BEHIND = os.getenv("LOG_WRITE_BEHIND", "0") == "1"
+SPOOL_DIR = os.getenv("LOG_SPOOL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "spool"))
+QUEUE_MAX = int(os.getenv("LOG_BUFFER_MAX", "50000"))
+FLUSH_SIZE = int(os.getenv("LOG_FLUSH_SIZE", "1000"))
+FLUSH_AGE = float(os.getenv("LOG_FLUSH_AGE", "1.0"))
+SPOOL_FSYNC = os.getenv("LOG_SPOOL_FSYNC", "1") == "1"
+SPOOL_ROTATE_BYTES = int(os.getenv("LOG_SPOOL_ROTATE_BYTES", str(64 * 1024 * 1024)))
+RETRY_BACKOFF_MAX = 30.0
+
+# 재시도할 DB 오류 (접속 끊김, 서버 다운, 풀 대기 초과). 나머지는 재시도해도 같은 결과
+TRANSIENT_ERRORS = (mysql_errors.OperationalError, mysql_errors.InterfaceError, PoolTimeout)
+
+# 종류별 저장 함수 (한 배치 = 한 종류 = 한 트랜잭션)
+WRITERS = {
+    "onprem": insert_logs_onprem_bulk,
+    "policy": insert_log_policy,
+}
+
+
+class BufferFull(Exception):
+    pass
+
+
+# ==============================
+# 레코드 검증 / 정규화 (스풀 기록 전)
+# ==============================
+ONPREM_INT_FIELDS = ("LEN", "TTL", "ID", "SPT", "DPT")
+
+
+def _normalize_onprem(rec):
+    if not (rec.get("readable_time") or rec.get("time")):
+        raise ValueError("시간 필드(readable_time/time)가 없습니다.")
+    for field in ONPREM_INT_FIELDS:
+        if rec.get(field):
+            try:
+                int(rec[field])
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} 가 정수가 아닙니다: {rec[field]!r}")
+    return rec
+
+
+def _normalize_policy(rec):
+    for field in ("host", "message"):
+        if field not in rec:
+            raise ValueError(f"{field} 필드가 없습니다.")
+    rec = dict(rec)
+    ts = rec.get("timestamp")
+    if ts:
+        formatted = policy_time(ts)
+        if formatted is None:
+            # 배치 INSERT 한 건이 실패하면 묶음 전체가 롤백되므로 접수 시점에 거부
+            raise ValueError(f"timestamp 를 해석할 수 없습니다: {str(ts)[:50]!r}")
+        rec["timestamp"] = formatted
+    return rec
+
+
+NORMALIZERS = {
+    "onprem": _normalize_onprem,
+    "policy": _normalize_policy,
+}
+
+
+def normalize_records(kind, records):
+    """return: (정상 레코드 리스트, [{"index", "error"}] 거부 목록)"""
+    valid, rejected = [], []
+    for i, rec in enumerate(records):
+        try:
+            if not isinstance(rec, dict):
+                raise ValueError("레코드는 JSON 객체여야 합니다.")
+            valid.append(NORMALIZERS[kind](rec))
+        except ValueError as e:
+            rejected.append({"index": i, "error": str(e)})
+    return valid, rejected
+
+
+def _read_offset(ckpt_path):
+    try:
+        with open(ckpt_path) as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_offset(ckpt_path, offset):
+    tmp = ckpt_path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(str(offset))
+    os.replace(tmp, ckpt_path)
+
+
+def _iter_spool(path, offset):
+    """스풀 파일의 offset 이후 레코드를 (kind, record, end_offset) 로 yield. 잘린 마지막 줄은 무시"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                entry = json.loads(line)
+                yield entry["k"], entry["r"], offset
+            except (ValueError, KeyError):
+                continue
+
+
+class IngestBuffer:
+    def __init__(self, spool_dir=SPOOL_DIR):
+        os.makedirs(spool_dir, exist_ok=True)
+        self.spool_dir = spool_dir
+        self.spool_path = os.path.join(spool_dir, f"spool-{os.getpid()}-{int(time.time() * 1000)}.ndjson")
+        self.ckpt_path = self.spool_path + ".ckpt"
+        self.deadletter_path = os.path.join(spool_dir, "deadletter.ndjson")
+        self._spool = open(self.spool_path, "ab")
+        fcntl.flock(self._spool.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        _write_offset(self.ckpt_path, 0)
+
+        self._queue = deque()       # (kind, record, end_offset, enqueued_at)
+        self._pending = []          # flush 중(재시도 포함)인 배치
+        self._cond = threading.Condition()
+        self._stats = {
+            "enqueued": 0,
+            "flushed": 0,
+            "flush_batches": 0,
+            "flush_failures": 0,
+            "replayed": 0,
+            "dead_lettered": 0,
+            "last_flush_ms": None,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+            "last_error": None,
+        }
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self._thread.start()
+
+    # ------------------------------
+    # 인입
+    # ------------------------------
+    def enqueue(self, kind, records):
+        """return: (큐에 넣은 건수, 거부 목록)"""
+        if kind not in WRITERS:
+            raise ValueError(f"unknown kind: {kind}")
+        if isinstance(records, dict):
+            records = [records]
+        records, rejected = normalize_records(kind, records or [])
+        if not records:
+            return 0, rejected
+
+        lines = [json.dumps({"k": kind, "r": r}, ensure_ascii=False).encode("utf-8") + b"\n" for r in records]
+        with self._cond:
+            if len(self._queue) + len(self._pending) + len(records) > QUEUE_MAX:
+                raise BufferFull(f"ingest buffer full ({QUEUE_MAX})")
+            offset = self._spool.tell()
+            ends = []
+            for line in lines:
+                offset += len(line)
+                ends.append(offset)
+            self._spool.write(b"".join(lines))
+            self._spool.flush()
+            if SPOOL_FSYNC:
+                os.fsync(self._spool.fileno())
+
+            now = time.monotonic()
+            for rec, end in zip(records, ends):
+                self._queue.append((kind, rec, end, now))
+            self._stats["enqueued"] += len(records)
+            if len(self._queue) >= FLUSH_SIZE:
+                self._cond.notify()
+        return len(records), rejected
+
+    # ------------------------------
+    # flusher
+    # ------------------------------
+    def _take_batch(self):
+        """같은 종류의 연속 레코드를 최대 FLUSH_SIZE 개 꺼냄 (조건 충족 시까지 대기)"""
+        with self._cond:
+            while True:
+                if self._queue:
+                    age = time.monotonic() - self._queue[0][3]
+                    if len(self._queue) >= FLUSH_SIZE or age >= FLUSH_AGE:
+                        break
+                    self._cond.wait(FLUSH_AGE - age)
+                else:
+                    self._cond.wait(FLUSH_AGE)
+                    self._maybe_rotate()
+            kind = self._queue[0][0]
+            batch = []
+            while self._queue and len(batch) < FLUSH_SIZE and self._queue[0][0] == kind:
+                batch.append(self._queue.popleft())
+            self._pending = batch
+            return kind, batch
+
+    def _write(self, kind, records):
+        start = time.perf_counter()
+        WRITERS[kind](records)
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._cond:
+            s = self._stats
+            s["flush_batches"] += 1
+            s["last_flush_ms"] = round(elapsed, 2)
+            s["max_flush_ms"] = max(s["max_flush_ms"], elapsed)
+            s["total_flush_ms"] += elapsed
+            s["last_error"] = None
+
+    def _write_with_retry(self, kind, records):
+        """DB 장애(TRANSIENT_ERRORS)만 재시도. 그 밖의 오류는 그대로 올림"""
+        backoff = 0.5
+        while True:
+            try:
+                self._write(kind, records)
+                return
+            except TRANSIENT_ERRORS as e:
+                self._record_failure(e)
+                print(f"❌ write-behind flush 실패 ({kind}, {len(records)}건), {backoff:.1f}초 후 재시도: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, RETRY_BACKOFF_MAX)
+
+    def _flush(self, kind, records):
+        """
+        배치 저장. 재시도해도 안 되는 오류면 한 건씩 다시 저장해
+        실패한 레코드만 dead-letter 로 보냄 (나머지 레코드는 정상 저장)
+        """
+        try:
+            self._write_with_retry(kind, records)
+            return
+        except Exception as e:
+            self._record_failure(e)
+            if len(records) == 1:
+                self._dead_letter(kind, records, e)
+                return
+            print(f"[WARN] write-behind 배치 저장 실패 ({kind}, {len(records)}건), 한 건씩 재시도: {e}")
+        for rec in records:
+            try:
+                self._write_with_retry(kind, [rec])
+            except Exception as e:
+                self._record_failure(e)
+                self._dead_letter(kind, [rec], e)
+
+    def _record_failure(self, e):
+        with self._cond:
+            self._stats["flush_failures"] += 1
+            self._stats["last_error"] = str(e)
+
+    def _dead_letter(self, kind, records, error):
+        with open(self.deadletter_path, "ab") as f:
+            for rec in records:
+                entry = json.dumps({"k": kind, "r": rec, "error": str(error)}, ensure_ascii=False, default=str)
+                f.write(entry.encode("utf-8") + b"\n")
+        with self._cond:
+            self._stats["dead_lettered"] += len(records)
+        print(f"❌ write-behind dead-letter ({kind}, {len(records)}건) → {self.deadletter_path}: {error}")
+
+    def _maybe_rotate(self):
+        # _cond 보유 상태에서 호출: 모두 저장됐고 스풀이 크면 비움
+        if self._queue or self._pending:
+            return
+        if self._spool.tell() < SPOOL_ROTATE_BYTES:
+            return
+        self._spool.truncate(0)
+        self._spool.seek(0)
+        _write_offset(self.ckpt_path, 0)
+
+    def _replay_batch(self, kind, records, ckpt, end_offset):
+        self._flush(kind, records)
+        _write_offset(ckpt, end_offset)
+        with self._cond:
+            self._stats["replayed"] += len(records)
+
+    def _replay_orphans(self):
+        """잠금이 풀린(죽은 프로세스의) 스풀 파일을 체크포인트 이후부터 재적재"""
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, "spool-*.ndjson"))):
+            if path == self.spool_path:
+                continue
+            try:
+                f = open(path, "ab")
+            except OSError:
+                continue
+            try:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue  # 살아있는 다른 워커의 스풀
+                ckpt = path + ".ckpt"
+                kind, batch, end = None, [], 0
+                for k, rec, offset in _iter_spool(path, _read_offset(ckpt)):
+                    if batch and (k != kind or len(batch) >= FLUSH_SIZE):
+                        self._replay_batch(kind, batch, ckpt, end)
+                        batch = []
+                    kind, end = k, offset
+                    batch.append(rec)
+                if batch:
+                    self._replay_batch(kind, batch, ckpt, end)
+                print(f"[OK] 스풀 재적재 완료: {path}")
+                for p in (path, ckpt):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+            finally:
+                f.close()
+
+    def _run(self):
+        self._replay_orphans()
+        while True:
+            kind, batch = self._take_batch()
+            self._flush(kind, [item[1] for item in batch])
+            with self._cond:
+                self._stats["flushed"] += len(batch)
+                self._pending = []
+                _write_offset(self.ckpt_path, batch[-1][2])
+
+    # ------------------------------
+    # 지표
+    # ------------------------------
+    def stats(self):
+        with self._cond:
+            s = dict(self._stats)
+            depth = len(self._queue) + len(self._pending)
+            oldest = time.monotonic() - self._queue[0][3] if self._queue else 0.0
+            spool_bytes = self._spool.tell()
+        total_ms = s.pop("total_flush_ms")
+        s["avg_flush_ms"] = round(total_ms / s["flush_batches"], 2) if s["flush_batches"] else None
+        s["max_flush_ms"] = round(s["max_flush_ms"], 2)
+        s.update({
+            "queue_depth": depth,
+            "queue_max": QUEUE_MAX,
+            "oldest_age_sec": round(oldest, 3),
+            "spool_path": self.spool_path,
+            "spool_bytes": spool_bytes,
+            "deadletter_path": self.deadletter_path,
+        })
+        return s
+
+
+_buffer = None
+_buffer_pid = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """프로세스별 싱글턴 (fork 이후 워커에서 새로 생성)"""
+    global _buffer, _buffer_pid
+    with _buffer_lock:
+        if _buffer is None or _buffer_pid != os.getpid():
+            _buffer = IngestBuffer()
+            _buffer_pid = os.getpid()
+        return _buffer
@@ -1,8 +1,17 @@
+import os
+import json
 from flask import Flask, request, jsonify
-from log_db import insert_log_common, insert_log_onprem, insert_log_policy  # ← 통일
+from log_db import get_connection, insert_logs_onprem_bulk, insert_log_policy  # ← 통일
+from ingest_buffer import WRITE_BEHIND, BufferFull, get_buffer
+from timeparse import stats as timeparse_stats
+from connector_db import db_stats
 
 app = Flask(__name__)
 
+# NDJSON 스트리밍 인입: 배치당 행 수 / 한 줄 최대 바이트
+STREAM_BATCH_SIZE = int(os.getenv("LOG_STREAM_BATCH_SIZE", "500"))
+STREAM_MAX_LINE = int(os.getenv("LOG_STREAM_MAX_LINE", str(64 * 1024)))
+
 # 온프레 로그 API
 @app.route("/api/log/onprem", methods=["POST"])
 def save_onprem():
@@ -10,11 +19,94 @@ def save_onprem():
     if isinstance(logs, dict):
         logs = [logs]
 
-    ids = insert_log_common("ONPREM", logs)   # 파일 기반 스텁에 기록
-    insert_log_onprem(ids, logs)
+    if WRITE_BEHIND:
+        return _enqueue("onprem", logs)
+
+    # log_common + log_onprem 을 한 트랜잭션에서 multi-row INSERT 로 기록
+    ids = insert_logs_onprem_bulk(logs)
 
     return jsonify({"status": "ok", "inserted": len(ids), "ids": ids})
 
+def _enqueue(kind, logs):
+    """write-behind 모드: 로컬 스풀에 기록되면 바로 202 응답 (검증 실패 레코드는 rejected 로 돌려줌)"""
+    try:
+        accepted, rejected = get_buffer().enqueue(kind, logs)
+    except BufferFull as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    if rejected and not accepted:
+        return jsonify({"status": "error", "accepted": 0, "rejected": len(rejected), "errors": rejected[:20]}), 400
+    return jsonify({"status": "queued", "accepted": accepted, "rejected": len(rejected), "errors": rejected[:20]}), 202
+
+def _iter_ndjson(stream, max_line):
+    """
+    요청 본문을 한 줄씩 읽어 (dict | None) 을 yield.
+    JSON 이 아니거나 max_line 을 넘는 줄은 None (거부) 으로 넘긴다.
+    """
+    while True:
+        line = stream.readline(max_line)
+        if not line:
+            return
+        if len(line) >= max_line and not line.endswith(b"\n"):
+            # 너무 긴 줄: 나머지를 버리고 거부 처리
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(max_line)
+            yield None
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield item if isinstance(item, dict) else None
+
+def _flush_stream_batch(conn, no, batch, rejected):
+    accepted = 0
+    error = None
+    if batch:
+        try:
+            accepted = len(insert_logs_onprem_bulk(batch, conn=conn))
+        except Exception as e:
+            rejected += len(batch)
+            error = str(e)
+    result = {"batch": no, "accepted": accepted, "rejected": rejected}
+    if error:
+        result["error"] = error
+    return result
+
+# 온프레 로그 스트리밍 API (NDJSON, chunked 전송 가능)
+@app.route("/api/log/onprem/stream", methods=["POST"])
+def save_onprem_stream():
+    """
+    본문 전체를 메모리에 올리지 않고 한 줄씩 파싱해
+    STREAM_BATCH_SIZE 단위로 log_common/log_onprem 에 커밋.
+    """
+    batches = []
+    batch, rejected = [], 0
+    conn = get_connection()
+    try:
+        for item in _iter_ndjson(request.stream, STREAM_MAX_LINE):
+            if item is None:
+                rejected += 1
+            else:
+                batch.append(item)
+            if len(batch) + rejected >= STREAM_BATCH_SIZE:
+                batches.append(_flush_stream_batch(conn, len(batches) + 1, batch, rejected))
+                batch, rejected = [], 0
+        if batch or rejected:
+            batches.append(_flush_stream_batch(conn, len(batches) + 1, batch, rejected))
+    finally:
+        conn.close()
+
+    return jsonify({
+        "status": "ok",
+        "accepted": sum(b["accepted"] for b in batches),
+        "rejected": sum(b["rejected"] for b in batches),
+        "batches": batches,
+    })
+
 # (선택) 클라우드 로그 API는 비활성 상태 유지
 # @app.route("/api/log/cloud", methods=["POST"])
 # def save_cloud():
@@ -31,8 +123,22 @@ def save_policy():
     logs = request.get_json()
     if isinstance(logs, dict):
         logs = [logs]
+    if WRITE_BEHIND:
+        return _enqueue("policy", logs)
     inserted_ids = insert_log_policy(logs)    # 파일 기반 스텁
     return jsonify({"status": "ok", "inserted": len(inserted_ids), "ids": inserted_ids})
 
+# write-behind 버퍼 상태 (큐 깊이, flush 지연)
+@app.route("/api/log/buffer", methods=["GET"])
+def buffer_stats():
+    if not WRITE_BEHIND:
+        return jsonify({"status": "ok", "write_behind": False})
+    return jsonify({"status": "ok", "write_behind": True, "buffer": get_buffer().stats()})
+
+# 시각 파싱 통계 (실패 건수, 캐시 적중) + DB 커넥션 풀 / 호스트 토폴로지 / 라우팅 상태
+@app.route("/api/log/stats", methods=["GET"])
+def ingest_stats():
+    return jsonify({"status": "ok", "timeparse": timeparse_stats(), **db_stats()})
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -1,14 +1,78 @@
 import os
 import json
-import mysql.connector
-from datetime import datetime
+from datetime import datetime, timezone, timedelta
+from connector_db import get_connection
+from timeparse import parse_log_time
+from rollup import RollupBuffer, is_deadlock, DEADLOCK_RETRIES
+from response_cache import invalidate
+
+kst = timezone(timedelta(hours=9))
+
+# 일괄 저장 시 multi-row INSERT 한 번에 넣을 최대 행 수
+BULK_CHUNK_SIZE = int(os.getenv("LOG_BULK_CHUNK_SIZE", "1000"))
+
+def to_naive_kst(dt):
+    """ISO "...Z" 등 오프셋이 있는 시각은 KST 로 바꿔 naive 로 (syslog 시각과 같은 기준)"""
+    return dt.astimezone(kst).replace(tzinfo=None) if dt and dt.tzinfo else dt
+
+def now_kst():
+    """수신 시각 (저장 컬럼과 같은 naive KST)"""
+    return datetime.now(kst).replace(tzinfo=None)
+
+def parse_common_time(item):
+    """log_common.timestamp: 파싱 실패/누락 시 수신 시각 (실패 건수는 timeparse.stats() 에 집계)"""
+    raw_ts = item.get("readable_time") or item.get("timestamp") or item.get("time")
+    return to_naive_kst(parse_log_time(raw_ts)) or now_kst()
+
+def parse_time(t):
+    if not t:
+        raise ValueError("시간 필드가 없습니다.")
+    return to_naive_kst(parse_log_time(t)) or now_kst()
+
+LOG_COMMON_SQL = """
+    INSERT INTO log_common (log_type, timestamp, raw_log, created_at)
+    VALUES (%s, %s, %s, NOW())
+"""
 
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST"),
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        database=os.getenv("MYSQL_DB"),
+LOG_ONPREM_SQL = """
+    INSERT INTO log_onprem
+    (log_id, host, program,
+     in_iface, out_iface, mac, source_ip, destination_ip,
+     length, tos, precedence, ttl, packet_id,
+     protocol, source_port, destination_port,
+     timestamp)
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+"""
+
+def onprem_time(data):
+    """log_onprem.timestamp (시간 필드 누락 시 ValueError)"""
+    return parse_time(data.get("readable_time") or data.get("time"))
+
+def onprem_params(log_id, data, ts=None):
+    """
+    log_onprem INSERT 파라미터 튜플 생성.
+    ts: log_common.timestamp 에 쓴 값 (조회 JOIN 이 log_id + 시각으로 같은 일자 파티션만 읽도록 동일해야 함)
+    """
+    if ts is None:
+        ts = onprem_time(data)
+    return (
+        log_id,
+        data.get("host"),
+        data.get("program"),
+        data.get("IN"),
+        data.get("OUT"),
+        data.get("MAC"),
+        data.get("SRC"),
+        data.get("DST"),
+        int(data.get("LEN")) if data.get("LEN") else None,
+        data.get("TOS"),
+        data.get("PREC"),
+        int(data.get("TTL")) if data.get("TTL") else None,
+        int(data.get("ID")) if data.get("ID") else None,
+        data.get("PROTO"),
+        int(data.get("SPT")) if data.get("SPT") else None,
+        int(data.get("DPT")) if data.get("DPT") else None,
+        ts,
     )
 
 def insert_log_common(log_type: str, ts_or_list, raw=None):
@@ -16,38 +80,20 @@ def insert_log_common(log_type: str, ts_or_list, raw=None):
     conn = get_connection()
     cursor = conn.cursor()
 
-    def parse_common_time(item):
-        raw_ts = item.get("readable_time") or item.get("timestamp") or item.get("time")
-        if raw_ts:
-            try:
-                if "T" in raw_ts:
-                    return datetime.fromisoformat(raw_ts.replace("Z", "+00:00"))
-                else:
-                    return datetime.strptime(f"{datetime.utcnow().year} {raw_ts}", "%Y %b %d %H:%M:%S")
-            except Exception:
-                return datetime.utcnow()
-        return datetime.utcnow()
-
     try:
         if isinstance(ts_or_list, list):
             for item in ts_or_list:
                 ts = parse_common_time(item)
-                sql = """
-                    INSERT INTO log_common (log_type, timestamp, raw_log, created_at)
-                    VALUES (%s, %s, %s, NOW())
-                """
-                cursor.execute(sql, (log_type, ts, json.dumps(item, ensure_ascii=False)))
+                cursor.execute(LOG_COMMON_SQL, (log_type, ts, json.dumps(item, ensure_ascii=False)))
                 ids.append(cursor.lastrowid)
             conn.commit()
+            invalidate(f"logs:{log_type}")
             return ids
 
         ts = parse_common_time(raw or {})
-        sql = """
-            INSERT INTO log_common (log_type, timestamp, raw_log, created_at)
-            VALUES (%s, %s, %s, NOW())
-        """
-        cursor.execute(sql, (log_type, ts, json.dumps(raw, ensure_ascii=False)))
+        cursor.execute(LOG_COMMON_SQL, (log_type, ts, json.dumps(raw, ensure_ascii=False)))
         conn.commit()
+        invalidate(f"logs:{log_type}")
         return cursor.lastrowid
     finally:
         cursor.close()
@@ -58,50 +104,8 @@ def insert_log_onprem(log_ids, data_or_list):
     conn = get_connection()
     cursor = conn.cursor()
 
-    def parse_time(t):
-        if not t:
-            raise ValueError("시간 필드가 없습니다.")
-        try:
-            if "T" in t:
-                return datetime.fromisoformat(t.replace("Z", "+00:00"))
-            else:
-                return datetime.strptime(f"2025 {t}", "%Y %b %d %H:%M:%S")
-        except Exception:
-            return datetime.utcnow()
-
     def insert_one(log_id, data):
-        ts = parse_time(data.get("readable_time") or data.get("time"))
-        sql = """
-            INSERT INTO log_onprem
-            (log_id, host, program,
-             in_iface, out_iface, mac, source_ip, destination_ip,
-             length, tos, precedence, ttl, packet_id,
-             protocol, source_port, destination_port,
-             timestamp)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-        """
-        cursor.execute(
-            sql,
-            (
-                log_id,
-                data.get("host"),
-                data.get("program"),
-                data.get("IN"),
-                data.get("OUT"),
-                data.get("MAC"),
-                data.get("SRC"),
-                data.get("DST"),
-                int(data.get("LEN")) if data.get("LEN") else None,
-                data.get("TOS"),
-                data.get("PREC"),
-                int(data.get("TTL")) if data.get("TTL") else None,
-                int(data.get("ID")) if data.get("ID") else None,
-                data.get("PROTO"),
-                int(data.get("SPT")) if data.get("SPT") else None,
-                int(data.get("DPT")) if data.get("DPT") else None,
-                ts,
-            ),
-        )
+        cursor.execute(LOG_ONPREM_SQL, onprem_params(log_id, data))
 
     try:
         if isinstance(data_or_list, list):
@@ -111,10 +115,89 @@ def insert_log_onprem(log_ids, data_or_list):
         else:
             insert_one(log_ids, data_or_list)
         conn.commit()
+        invalidate("logs:ONPREM")
     finally:
         cursor.close()
         conn.close()
 
+# 온프레 로그 일괄 저장 (log_common + log_onprem 단일 트랜잭션)
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def insert_onprem_chunk(cursor, chunk, rollups, step=1):
+    """
+    이미 열린 커서로 온프레 로그 한 덩어리를 multi-row INSERT 로 기록.
+    log_common 의 첫 insert id(lastrowid)에서 auto_increment_increment 간격으로
+    id 를 복원해 log_onprem 에 매핑한다. (InnoDB 는 단일 multi-row INSERT 에
+    연속된 AUTO_INCREMENT 구간을 할당)
+    롤업 입력은 rollups(RollupBuffer)에 모으고, 호출 측이 커밋 직전에 flush 한다.
+    """
+    times = [onprem_time(item) for item in chunk]
+    common_rows = [
+        ("ONPREM", ts, json.dumps(item, ensure_ascii=False))
+        for ts, item in zip(times, chunk)
+    ]
+    cursor.executemany(LOG_COMMON_SQL, common_rows)
+    if cursor.rowcount != len(chunk):
+        raise RuntimeError(f"log_common 일괄 저장 행 수 불일치: {cursor.rowcount}/{len(chunk)}")
+
+    first_id = cursor.lastrowid
+    ids = [first_id + i * step for i in range(len(chunk))]
+    params = [onprem_params(i, d, ts) for i, d, ts in zip(ids, chunk, times)]
+    cursor.executemany(LOG_ONPREM_SQL, params)
+    rollups.add(onprem_rollup_rows(params))
+    return ids
+
+def onprem_rollup_rows(params):
+    """log_onprem 파라미터 → 롤업 입력 (패킷 로그 1건 = 1패킷, 바이트는 LEN)"""
+    for p in params:
+        # (ts, log_type, src, dst, dport, protocol, action, packets, bytes)
+        yield (p[16], "ONPREM", p[6], p[7], p[15], p[13], None, 1, p[8])
+
+def get_autoinc_step(cursor):
+    cursor.execute("SELECT @@auto_increment_increment")
+    return int(cursor.fetchone()[0] or 1)
+
+def insert_logs_onprem_bulk(logs, chunk_size=None, conn=None):
+    """
+    온프레 로그를 하나의 커넥션/트랜잭션으로 log_common, log_onprem 에 저장.
+    - chunk_size(기본 LOG_BULK_CHUNK_SIZE) 단위로 나눠 executemany(multi-row INSERT)
+    - conn 을 넘기면 해당 커넥션을 사용하고 닫지 않음
+    - 롤업은 커밋 직전 한 번에 기록, 데드락(1213)이면 트랜잭션 전체를 DEADLOCK_RETRIES 번까지 재실행
+    return: log_common id 리스트
+    """
+    if isinstance(logs, dict):
+        logs = [logs]
+    if not logs:
+        return []
+
+    size = chunk_size or BULK_CHUNK_SIZE
+    own_conn = conn is None
+    conn = conn or get_connection()
+    cursor = conn.cursor()
+    try:
+        step = get_autoinc_step(cursor)
+        for attempt in range(1, DEADLOCK_RETRIES + 1):
+            ids, rollups = [], RollupBuffer()
+            try:
+                for chunk in _chunks(logs, size):
+                    ids.extend(insert_onprem_chunk(cursor, chunk, rollups, step))
+                rollups.flush(cursor)
+                conn.commit()
+                break
+            except Exception as e:
+                conn.rollback()
+                if not is_deadlock(e) or attempt == DEADLOCK_RETRIES:
+                    raise
+                print(f"[WARN] 온프레 로그 저장 데드락, 재시도 {attempt}/{DEADLOCK_RETRIES - 1}")
+        invalidate("logs:ONPREM")  # 조회 API 응답 캐시
+        return ids
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+
 # (보류) 클라우드 로그 저장 — 필요 시 사용
 '''
 def insert_log_cloud(log_ids, items):
@@ -124,6 +207,11 @@ def insert_log_cloud(log_ids, items):
 # feat/#10: 온프레 정책 로그 저장
 from datetime import datetime
 
+def policy_time(ts):
+    """policy_history_o.timestamp 문자열 (KST). 해석할 수 없으면 None (동기/write-behind 경로 공통)"""
+    dt = to_naive_kst(parse_log_time(ts))
+    return dt.strftime("%Y-%m-%d %H:%M:%S") if dt else None
+
 def insert_log_policy(logs):
     conn = get_connection()
     cur = conn.cursor()
@@ -135,11 +223,7 @@ def insert_log_policy(logs):
     """
     for log in logs:
         ts = log.get("timestamp")
-        try:
-            dt = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ")
-            ts_formatted = dt.strftime("%Y-%m-%d %H:%M:%S")
-        except Exception:
-            ts_formatted = ts
+        ts_formatted = policy_time(ts) or ts
 
         cur.execute(sql, (
             log["host"],
@@ -149,6 +233,7 @@ def insert_log_policy(logs):
         inserted_ids.append(cur.lastrowid)
 
     conn.commit()
+    invalidate("policy:onprem")
     cur.close()
     conn.close()
     return inserted_ids
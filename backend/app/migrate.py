@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+DB 스키마 마이그레이션
+
+backend/migrations/NNNN_설명.sql 파일을 번호 순서대로 한 번씩 적용하고
+적용 이력을 schema_migrations 테이블에 남긴다.
+
+사용법 (backend 디렉터리에서):
+    python3 app/migrate.py status        # 적용/미적용 목록
+    python3 app/migrate.py up            # 미적용 마이그레이션 적용
+    python3 app/migrate.py check-plans   # 서비스 쿼리 EXPLAIN → 풀 스캔이면 exit 1
+
+- MySQL DDL 은 암묵적으로 커밋되므로 파일 단위 롤백은 없다.
+  대신 "이미 존재" 에러(테이블/인덱스/컬럼)는 건너뛰어 중간에 실패한 파일을 다시 실행해도 안전하다.
+- 이미 적용된 파일의 내용이 바뀌면 status 에서 checksum 불일치로 표시한다 (재적용하지 않음).
+"""
+import os
+import re
+import sys
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+
+from connector_db import get_connection
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, "migrations")
+
+# 재실행 시 무시할 MySQL 에러 코드
+#   1050: Table already exists / 1060: Duplicate column name / 1061: Duplicate key name
+#   1091: Can't DROP; check that column/key exists
+IGNORABLE_ERRNOS = {1050, 1060, 1061, 1091}
+
+SCHEMA_MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version     VARCHAR(16)  NOT NULL,
+    name        VARCHAR(255) NOT NULL,
+    checksum    CHAR(64)     NOT NULL,
+    applied_at  DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (version)
+)
+"""
+
+_FILE_RE = re.compile(r"^(\d{4})_([\w\-]+)\.sql$")
+_COMMENT_RE = re.compile(r"(^|\s)--(\s.*)?$")
+
+
+# ==============================
+# 마이그레이션 파일
+# ==============================
+def list_migrations(directory=MIGRATIONS_DIR):
+    """[(version, name, path)] 번호 순"""
+    found = []
+    for fname in sorted(os.listdir(directory)):
+        m = _FILE_RE.match(fname)
+        if m:
+            found.append((m.group(1), m.group(2), os.path.join(directory, fname)))
+    versions = [v for v, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"마이그레이션 번호 중복: {versions}")
+    return found
+
+
+def read_migration(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    return text, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_statements(sql_text):
+    """-- 주석 제거 후 줄 끝의 ';' 기준으로 문장 분리 (프로시저/트리거 구문은 지원하지 않음)"""
+    lines = [_COMMENT_RE.sub("", line).rstrip() for line in sql_text.splitlines()]
+    statements, current = [], []
+    for line in lines:
+        if not line.strip():
+            continue
+        current.append(line)
+        if line.endswith(";"):
+            statements.append("\n".join(current)[:-1].strip())
+            current = []
+    if current:
+        statements.append("\n".join(current).strip())
+    return [s for s in statements if s]
+
+
+# ==============================
+# 적용
+# ==============================
+def applied_migrations(cur):
+    cur.execute(SCHEMA_MIGRATIONS_DDL)
+    cur.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+    return {row[0]: row for row in cur.fetchall()}
+
+
+def apply_migration(cur, path):
+    text, _ = read_migration(path)
+    skipped = 0
+    for stmt in split_statements(text):
+        try:
+            cur.execute(stmt)
+        except Exception as e:
+            if getattr(e, "errno", None) in IGNORABLE_ERRNOS:
+                skipped += 1
+                print(f"  - skip ({e.errno}): {stmt.splitlines()[0][:80]}")
+                continue
+            raise
+    return skipped
+
+
+def migrate_up(conn, directory=MIGRATIONS_DIR):
+    cur = conn.cursor()
+    try:
+        done = applied_migrations(cur)
+        pending = [m for m in list_migrations(directory) if m[0] not in done]
+        if not pending:
+            print("[OK] 적용할 마이그레이션이 없습니다.")
+            return 0
+        for version, name, path in pending:
+            print(f"[..] {version}_{name}")
+            skipped = apply_migration(cur, path)
+            _, checksum = read_migration(path)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                (version, name, checksum),
+            )
+            conn.commit()
+            print(f"[OK] {version}_{name} 적용 완료 (이미 존재해 건너뛴 문장 {skipped}개)")
+        return len(pending)
+    finally:
+        cur.close()
+
+
+def migrate_status(conn, directory=MIGRATIONS_DIR):
+    cur = conn.cursor()
+    try:
+        done = applied_migrations(cur)
+    finally:
+        cur.close()
+    for version, name, path in list_migrations(directory):
+        _, checksum = read_migration(path)
+        row = done.get(version)
+        if row is None:
+            print(f"  [ ] {version}_{name}")
+        elif row[2] != checksum:
+            print(f"  [!] {version}_{name}  applied {row[3]}  (checksum 불일치: 적용 후 파일이 수정됨)")
+        else:
+            print(f"  [x] {version}_{name}  applied {row[3]}")
+
+
+# ==============================
+# 쿼리 플랜 점검
+# ==============================
+def plan_checks():
+    """
+    (이름, SQL, 파라미터) 목록.
+    SQL 은 손으로 옮겨 적지 않고 서비스가 실행하는 쿼리 빌더/상수에서 그대로 가져온다.
+    """
+    # app.services.* 는 backend 디렉터리 기준 패키지 import
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import save_cloudtrail
+    from app.services import (log_service, log_stats_service, policy_service, ansible_service,
+                              iptables_versioning, analysis_jobs)
+
+    now = datetime.now()
+    since = now - timedelta(days=1)
+    max_id = 2 ** 62
+    hour_where, hour_params = log_stats_service.stats_where(since)
+    minute_where, minute_params = log_stats_service.stats_where(now - timedelta(hours=1))
+    hour_table, minute_table = log_service.ROLLUP_TABLES["hour"], log_service.ROLLUP_TABLES["minute"]
+    filters = log_service.clean_filters({"srcip": "10.0.0.1", "protocol": "tcp"})
+
+    return [
+        ("log_service.get_logs_page",
+         *log_service.log_query(since, after_id=max_id, limit=1001)),
+        ("log_service.get_logs_page(filters)",
+         *log_service.log_query(since, before_ts=now, filters=filters, include_raw=True, limit=1001)),
+        ("log_service.get_logs_page(onprem)",
+         *log_service.log_query(since, filters=log_service.clean_filters({"log_type": "onprem"}), limit=1001)),
+        ("log_service.logs_version",
+         *log_service.log_version_query(since, before_ts=now, log_type="CLOUD")),
+        ("log_service.get_traffic_rollup",
+         *log_service.traffic_rollup_query("weekly")),
+        ("log_stats_service.top_talkers",
+         *log_stats_service.top_talkers_query(hour_table, hour_where, hour_params)),
+        ("log_stats_service.top_ports",
+         *log_stats_service.top_ports_query(hour_table, hour_where, hour_params)),
+        ("log_stats_service.action_ratio",
+         *log_stats_service.actions_query(hour_table, hour_where, hour_params)),
+        ("log_stats_service.timeline",
+         *log_stats_service.timeline_query(minute_table, minute_where, minute_params)),
+        ("policy_service.get_policy_page(cloud)",
+         *policy_service.policy_query("cloud", since, after_id=max_id, before_ts=now, limit=1001)),
+        ("policy_service.get_policy_page(onprem)",
+         *policy_service.policy_query("onprem", since, after_id=max_id, before_ts=now, limit=1001)),
+        ("policy_service.policy_version(cloud)",
+         *policy_service.policy_version_query("cloud", since)),
+        ("policy_service.policy_version(onprem)",
+         *policy_service.policy_version_query("onprem", since)),
+        ("save_cloudtrail.get_previous_after",
+         save_cloudtrail.PREVIOUS_AFTER_SQL, ("example-bucket",)),
+        ("save_cloudtrail.preload_previous_after",
+         save_cloudtrail.preload_sql(1), ("example-bucket",)),
+        ("ansible_service._get_latest_onprem_version",
+         ansible_service.LATEST_VERSION_SQL, ()),
+        ("ansible_service._get_latest_onprem_version(name)",
+         ansible_service.LATEST_VERSION_BY_NAME_SQL, ("example-policy",)),
+        ("ansible_service.fetch_rules",
+         ansible_service.RULES_SQL, (1,)),
+        ("iptables_versioning._get_next_version",
+         iptables_versioning.NEXT_VERSION_SQL, (1,)),
+        ("iptables_versioning._create_or_get_policy_id",
+         iptables_versioning.POLICY_ID_SQL, ("example-policy",)),
+        ("analysis_jobs._find_reusable",
+         analysis_jobs.REUSABLE_SQL, ("0" * 40, analysis_jobs.REUSE_SECONDS, analysis_jobs.STALE_SECONDS)),
+    ]
+
+
+def explain(cur, sql, params):
+    cur.execute("EXPLAIN " + sql, params or None)  # 파라미터가 없으면 '%' 를 그대로 전달
+    return cur.fetchall()
+
+
+# 일자 파티션 로그 테이블의 EXPLAIN 별칭 (log_service.log_query 의 c / o / cl)
+PARTITIONED_LOG_ALIASES = ("c", "o", "cl")
+_PARTITION_REF_RE = re.compile(r"\.(timestamp|start_time)\b")
+
+
+def partition_join_problem(row):
+    """
+    조인으로 읽는 로그 테이블(ref/eq_ref)의 ref 에 상대 테이블 시각이 없으면
+    행마다 모든 일자 파티션을 조회하므로 실패 메시지, 아니면 None
+    """
+    if row.get("table") not in PARTITIONED_LOG_ALIASES or row.get("type") not in ("ref", "eq_ref"):
+        return None
+    if _PARTITION_REF_RE.search(row.get("ref") or ""):
+        return None
+    return f"{row['table']}: 시각(파티션 키) 없이 log_id 로만 조인 (ref={row.get('ref')}) → 모든 일자 파티션 조회"
+
+
+def check_plans(conn):
+    """
+    각 쿼리의 EXPLAIN 에서 type=ALL(풀 스캔)을 찾아 모두 실패로 센다.
+    인덱스가 있는데 옵티마이저가 풀 스캔을 고른 경우도 실패 (메시지로만 구분)
+    일자 파티션 로그 테이블을 파티션 키 없이 조인하는 경우도 실패
+    return: 실패 건수
+    """
+    cur = conn.cursor(dictionary=True)
+    failures = 0
+    try:
+        for name, sql, params in plan_checks():
+            problems, pruned = [], []
+            for row in explain(cur, sql, params):
+                table = row.get("table") or ""
+                if row.get("partitions"):
+                    pruned.append(f"{table}:{len(row['partitions'].split(','))}개 파티션")
+                join_problem = partition_join_problem(row)
+                if join_problem:
+                    problems.append(join_problem)
+                if row.get("type") != "ALL" or table.startswith("<"):
+                    continue  # <derived2> 등 임시 테이블은 제외
+                if not row.get("possible_keys"):
+                    problems.append(f"{table}: 사용할 인덱스 없이 풀 스캔")
+                else:
+                    problems.append(f"{table}: 인덱스({row['possible_keys']})가 있으나 풀 스캔 선택")
+            if not problems:
+                print(f"[OK] {name}" + (f" ({', '.join(pruned)})" if pruned else ""))
+                continue
+            for msg in problems:
+                failures += 1
+                print(f"❌ {name} - {msg}")
+    finally:
+        cur.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB 스키마 마이그레이션")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("up", help="미적용 마이그레이션 적용")
+    sub.add_parser("status", help="적용 상태 확인")
+    sub.add_parser("check-plans", help="서비스 쿼리 EXPLAIN 점검 (풀 스캔이면 exit 1)")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        if args.command == "up":
+            migrate_up(conn)
+        elif args.command == "status":
+            migrate_status(conn)
+        elif args.command == "check-plans":
+            failures = check_plans(conn)
+            if failures:
+                print(f"❌ 풀 스캔 {failures}건")
+                sys.exit(1)
+            print("[OK] 모든 쿼리가 인덱스를 사용합니다.")
+    except Exception as e:
+        print(f"❌ {args.command} 실패: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+로그 테이블 일 단위 파티션 관리 (migrations/0003_partition_log_tables.sql 적용 후 사용)
+
+- precreate   : p_future(MAXVALUE) 를 쪼개 오늘 + N일치 pYYYYMMDD 파티션을 미리 만든다.
+                처음 실행 시에는 보존 기간 시작일부터 만들며, 그 이전 데이터는 첫 파티션에 들어간다.
+- drop-expired: 보존 기간(LOG_RETENTION_DAYS)이 지난 일자 파티션을 DROP PARTITION 으로 통째로 삭제
+                (행 단위 DELETE 없음 → undo/binlog 부담 없이 즉시 반환)
+- run         : drop-expired 후 precreate (cron_partitions.sh 에서 하루 한 번)
+
+사용법 (backend 디렉터리에서):
+    python3 app/partition_maintenance.py run
+    python3 app/partition_maintenance.py drop-expired --retention-days 30 --dry-run
+"""
+import os
+import re
+import argparse
+from datetime import date, datetime, timedelta
+
+from dotenv import load_dotenv
+from connector_db import get_connection
+
+load_dotenv()
+
+# 파티션 테이블 → 파티션 키 컬럼
+PARTITIONED_TABLES = {
+    "log_common": "timestamp",
+    "log_onprem": "timestamp",
+    "log_cloud": "start_time",
+}
+
+RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "90"))
+AHEAD_DAYS = int(os.getenv("LOG_PARTITION_AHEAD_DAYS", "7"))
+FUTURE_PARTITION = "p_future"
+
+_DAILY = re.compile(r"^p(\d{8})$")
+
+
+def partition_name(day):
+    return f"p{day:%Y%m%d}"
+
+
+def partition_day(name):
+    """pYYYYMMDD → date (일자 파티션이 아니면 None)"""
+    m = _DAILY.match(name or "")
+    return datetime.strptime(m.group(1), "%Y%m%d").date() if m else None
+
+
+def list_partitions(cur, table):
+    cur.execute("""
+        SELECT PARTITION_NAME, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table,))
+    return cur.fetchall()
+
+
+def daily_partitions(partitions):
+    days = []
+    for name, _ in partitions:
+        day = partition_day(name)
+        if day:
+            days.append(day)
+    return sorted(days)
+
+
+# ==============================
+# 미리 만들기
+# ==============================
+def precreate_sql(table, partitions, today, ahead_days=AHEAD_DAYS, retention_days=RETENTION_DAYS):
+    """필요한 파티션이 없으면 None"""
+    names = [name for name, _ in partitions]
+    if FUTURE_PARTITION not in names:
+        raise RuntimeError(f"{table}: {FUTURE_PARTITION} 파티션이 없습니다. (0003 마이그레이션 적용 여부 확인)")
+
+    days = daily_partitions(partitions)
+    start = days[-1] + timedelta(days=1) if days else today - timedelta(days=retention_days)
+    end = today + timedelta(days=ahead_days)
+    if start > end:
+        return None
+
+    defs = []
+    day = start
+    while day <= end:
+        upper = day + timedelta(days=1)
+        defs.append(f"PARTITION {partition_name(day)} VALUES LESS THAN (TO_DAYS('{upper:%Y-%m-%d}'))")
+        day = upper
+    defs.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+    return (f"ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO (\n    "
+            + ",\n    ".join(defs) + "\n)")
+
+
+# ==============================
+# 만료 파티션 삭제
+# ==============================
+def expired_partitions(partitions, today, retention_days=RETENTION_DAYS):
+    """보존 기간 시작일보다 앞선 일자 파티션 이름 목록"""
+    cutoff = today - timedelta(days=retention_days)
+    return [partition_name(d) for d in daily_partitions(partitions) if d < cutoff]
+
+
+def drop_sql(table, names):
+    if not names:
+        return None
+    return f"ALTER TABLE {table} DROP PARTITION {', '.join(names)}"
+
+
+def maintain(conn, do_drop=True, do_precreate=True, today=None,
+             retention_days=RETENTION_DAYS, ahead_days=AHEAD_DAYS, dry_run=False):
+    today = today or date.today()
+    cur = conn.cursor()
+    failed = 0
+    try:
+        for table in PARTITIONED_TABLES:
+            try:
+                statements = []
+                partitions = list_partitions(cur, table)
+                if not partitions:
+                    print(f"❌ {table}: 파티션 테이블이 아닙니다. (0003 마이그레이션 적용 여부 확인)")
+                    failed += 1
+                    continue
+                if do_drop:
+                    expired = expired_partitions(partitions, today, retention_days)
+                    if expired:
+                        rows = sum(r or 0 for n, r in partitions if n in expired)
+                        print(f"[..] {table}: 만료 파티션 {len(expired)}개 삭제 (약 {rows:,}행) "
+                              f"{expired[0]} ~ {expired[-1]}")
+                        statements.append(drop_sql(table, expired))
+                        partitions = [p for p in partitions if p[0] not in expired]
+                if do_precreate:
+                    sql = precreate_sql(table, partitions, today, ahead_days, retention_days)
+                    if sql:
+                        statements.append(sql)
+                for sql in statements:
+                    print(sql if dry_run else f"[OK] {sql.splitlines()[0]}")
+                    if not dry_run:
+                        cur.execute(sql)
+            except Exception as e:
+                failed += 1
+                print(f"❌ {table} 파티션 관리 실패: {e}")
+    finally:
+        cur.close()
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로그 테이블 일자 파티션 관리")
+    parser.add_argument("command", choices=["precreate", "drop-expired", "run"])
+    parser.add_argument("--retention-days", type=int, default=RETENTION_DAYS)
+    parser.add_argument("--ahead-days", type=int, default=AHEAD_DAYS)
+    parser.add_argument("--dry-run", action="store_true", help="실행할 ALTER 문만 출력")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        failed = maintain(
+            conn,
+            do_drop=args.command in ("drop-expired", "run"),
+            do_precreate=args.command in ("precreate", "run"),
+            retention_days=args.retention_days,
+            ahead_days=args.ahead_days,
+            dry_run=args.dry_run,
+        )
+    finally:
+        conn.close()
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
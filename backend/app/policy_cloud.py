@@ -1,22 +1,13 @@
 #!/usr/bin/env python3
 import os
 import json
-import mysql.connector
 from datetime import datetime
 from dotenv import load_dotenv
+from connector_db import get_connection
 import boto3
 
 load_dotenv()
 
-#DB 접속
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST"),
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        database=os.getenv("MYSQL_DB"),
-    )
-
 #배치 ID 생성
 def create_batch(cur):
     cur.execute("INSERT INTO policy_cloud (timestamp) VALUES (NOW())")
@@ -0,0 +1,244 @@
+"""
+조회 API 응답 캐시 (in-process LRU + 선택적 Redis)
+
+대시보드 위젯이 같은 파라미터로 몇 초마다 폴링하는 GET 응답을 재사용한다.
+
+- 키: 경로 + 쿼리 파라미터 + 시간 버킷(RESPONSE_CACHE_BUCKET_SECONDS) + 태그별 세대(generation)
+  → 버킷이 바뀌면 자연히 새 키 (NOW() 기준 구간 쿼리가 최대 버킷 길이만큼만 늦음)
+  → 적재 경로가 invalidate(tag) 로 세대를 올리면 그 태그를 쓰는 응답이 즉시 새 키
+- RESPONSE_CACHE_REDIS_URL 이 있으면 세대와 응답 본문을 Redis 에 두어
+  적재 프로세스(log_app, cron 스크립트)의 무효화가 API 프로세스(여러 워커)에 바로 반영된다.
+  없으면 프로세스 안에서만 무효화되고, 다른 프로세스의 적재는 시간 버킷으로만 반영된다.
+- Redis 장애 시 로컬 LRU 만으로 동작 (REDIS_RETRY 초 뒤 재시도)
+
+태그:
+    logs:ONPREM / logs:CLOUD  log_common + 타입 테이블 적재
+    policy:cloud / policy:onprem  policy_history_c / policy_history_o 적재
+    policy:version  iptables 정책 버전 저장, 정책 적용
+"""
+import os
+import time
+import json
+import hashlib
+import threading
+import functools
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # Redis 는 선택 사항
+    redis = None
+
+ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+MAX_BODY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BODY_BYTES", str(4 * 1024 * 1024)))
+BUCKET_SECONDS = int(os.getenv("RESPONSE_CACHE_BUCKET_SECONDS", "5"))
+REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "")
+REDIS_RETRY = float(os.getenv("RESPONSE_CACHE_REDIS_RETRY", "30"))
+
+KEY_PREFIX = "rc:"
+
+
+class LRUCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local = LRUCache()
+_generations = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "local_hits": 0, "redis_hits": 0, "misses": 0,
+          "stores": 0, "skipped": 0, "invalidations": 0, "redis_errors": 0}
+
+_redis = None
+_redis_down_until = 0.0
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+# ==============================
+# Redis (선택)
+# ==============================
+def _redis_client():
+    global _redis
+    if not REDIS_URL or redis is None or time.monotonic() < _redis_down_until:
+        return None
+    if _redis is None:
+        _redis = redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _redis
+
+
+def _redis_failed(e):
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_RETRY
+    _count("redis_errors")
+    print(f"[WARN] response cache: Redis 사용 불가, {REDIS_RETRY:.0f}초간 로컬 캐시만 사용: {e}")
+
+
+# ==============================
+# 세대(generation) / 무효화
+# ==============================
+def generations(tags):
+    """태그별 현재 세대 튜플 (Redis 가 있으면 Redis 값)"""
+    client = _redis_client()
+    if client is not None and tags:
+        try:
+            values = client.mget([f"{KEY_PREFIX}gen:{t}" for t in tags])
+            return tuple(int(v or 0) for v in values)
+        except Exception as e:
+            _redis_failed(e)
+    with _lock:
+        return tuple(_generations.get(t, 0) for t in tags)
+
+
+def invalidate(*tags):
+    """적재/정책 저장 커밋 후 호출. 실패해도 적재 자체는 영향 없음"""
+    if not tags:
+        return
+    with _lock:
+        for tag in tags:
+            _generations[tag] = _generations.get(tag, 0) + 1
+        _stats["invalidations"] += len(tags)
+    client = _redis_client()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            for tag in tags:
+                pipe.incr(f"{KEY_PREFIX}gen:{tag}")
+            pipe.execute()
+        except Exception as e:
+            _redis_failed(e)
+
+
+# ==============================
+# 조회 / 저장
+# ==============================
+def cache_key(path, params, tags, now=None):
+    bucket = int((now or time.time()) // BUCKET_SECONDS)
+    raw = json.dumps([path, sorted(params), bucket, list(tags), generations(tags)], default=str)
+    return KEY_PREFIX + "resp:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def get(key):
+    """return: (body bytes, mimetype, etag) 또는 None"""
+    hit = _local.get(key)
+    if hit is not None:
+        _count("hits")
+        _count("local_hits")
+        return hit
+    client = _redis_client()
+    if client is not None:
+        try:
+            raw = client.get(key)
+        except Exception as e:
+            _redis_failed(e)
+            raw = None
+        if raw is not None:
+            mimetype, etag, body = raw.split(b"\n", 2)
+            hit = (body, mimetype.decode("ascii"), etag.decode("ascii") or None)
+            _local.set(key, hit)
+            _count("hits")
+            _count("redis_hits")
+            return hit
+    _count("misses")
+    return None
+
+
+def put(key, body, mimetype, etag=None):
+    _local.set(key, (body, mimetype, etag))
+    _count("stores")
+    client = _redis_client()
+    if client is not None:
+        try:
+            # 버킷이 지나면 같은 키로 다시 조회되지 않으므로 두 버킷 정도만 보관
+            header = f"{mimetype}\n{etag or ''}\n".encode("ascii")
+            client.setex(key, BUCKET_SECONDS * 2, header + body)
+        except Exception as e:
+            _redis_failed(e)
+
+
+def stats():
+    with _lock:
+        data = dict(_stats)
+    lookups = data["hits"] + data["misses"]
+    data.update({
+        "enabled": ENABLED,
+        "hit_ratio": round(data["hits"] / lookups, 3) if lookups else None,
+        "entries": len(_local),
+        "max_entries": _local.max_entries,
+        "bucket_seconds": BUCKET_SECONDS,
+        "redis": bool(REDIS_URL and redis is not None),
+    })
+    return data
+
+
+# ==============================
+# Flask 뷰 데코레이터
+# ==============================
+def cached(tags):
+    """
+    GET 200 응답을 캐시. tags 는 태그 목록 또는 request.args → 태그 목록 함수.
+    stream=1 (스트리밍 응답)과 MAX_BODY_BYTES 를 넘는 응답은 캐시하지 않는다.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import request, make_response
+
+            if not ENABLED or request.method != "GET" or request.args.get("stream") == "1":
+                return view(*args, **kwargs)
+
+            tag_list = tuple(tags(request.args) if callable(tags) else tags)
+            # 같은 파라미터라도 Accept 에 따라 응답 형식(response_format)이 다름
+            params = list(request.args.items(multi=True)) + [("Accept", request.headers.get("Accept", ""))]
+            # 세대는 쿼리 전에 읽음 → 쿼리 도중 무효화되면 이 응답은 이전 세대 키로 저장됨
+            key = cache_key(request.path, params, tag_list)
+            hit = get(key)
+            if hit is not None:
+                body, mimetype, etag = hit
+                resp = make_response(body)
+                resp.mimetype = mimetype
+                if etag:
+                    resp.set_etag(etag)
+                resp.headers["X-Cache"] = "HIT"
+                resp.vary.add("Accept")
+                return resp
+
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code == 200 and not resp.is_streamed:
+                body = resp.get_data()
+                if len(body) <= MAX_BODY_BYTES:
+                    put(key, body, resp.mimetype, resp.get_etag()[0])
+                else:
+                    _count("skipped")
+            resp.headers["X-Cache"] = "MISS"
+            resp.vary.add("Accept")
+            return resp
+        return wrapper
+    return decorator
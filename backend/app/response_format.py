@@ -0,0 +1,111 @@
+"""
+대량 조회 응답 인코딩 (/api/logs, /api/policy)
+
+기본 JSON 은 행마다 같은 키 이름을 반복하므로, 큰 구간에서는 바이트 대부분이 키 이름이다.
+format 쿼리 파라미터 또는 Accept 헤더로 열(column) 단위 인코딩을 고를 수 있다.
+
+    format=json      application/json                          (기본, 행 목록)
+    format=columnar  application/vnd.fortizero.columnar+json   {"columns": [...], "data": {열: [값...]}}
+    format=msgpack   application/msgpack                       columnar 와 같은 구조를 MessagePack 으로
+    format=arrow     application/vnd.apache.arrow.stream       Arrow IPC 스트림 (메타데이터에 next_cursor)
+
+msgpack / pyarrow 는 선택 의존성: 설치되지 않은 형식을 요청하면 406.
+"""
+import json
+
+from flask import Response, jsonify
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+MIMETYPES = {
+    "json": "application/json",
+    "columnar": "application/vnd.fortizero.columnar+json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+# Accept 헤더 별칭
+ACCEPT_ALIASES = {"application/x-msgpack": "msgpack", "application/vnd.apache.arrow.file": "arrow"}
+
+
+class FormatUnavailable(Exception):
+    """요청한 형식을 지원하지 않거나 선택 의존성이 없음 (406)"""
+
+
+def negotiate(request):
+    """format 파라미터 우선, 없으면 Accept 헤더. 와일드카드(*/*)만 있으면 json"""
+    fmt = request.args.get("format")
+    if fmt:
+        if fmt not in MIMETYPES:
+            raise FormatUnavailable(f"Unknown format: {fmt} ({', '.join(MIMETYPES)})")
+    else:
+        offered = list(MIMETYPES.values()) + list(ACCEPT_ALIASES)
+        best = request.accept_mimetypes.best_match(offered, default=MIMETYPES["json"])
+        fmt = ACCEPT_ALIASES.get(best) or next(k for k, v in MIMETYPES.items() if v == best)
+    if fmt == "msgpack" and msgpack is None:
+        raise FormatUnavailable("msgpack 형식을 쓰려면 msgpack 패키지가 필요합니다.")
+    if fmt == "arrow" and pa is None:
+        raise FormatUnavailable("arrow 형식을 쓰려면 pyarrow 패키지가 필요합니다.")
+    return fmt
+
+
+def to_columns(rows):
+    """행 목록 → (열 이름 목록, {열: 값 목록}). 행마다 키가 달라도 합집합, 없는 값은 None"""
+    columns = []
+    seen = set()
+    for row in rows:
+        for key in row:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    return columns, {col: [row.get(col) for row in rows] for col in columns}
+
+
+def _arrow_column(values):
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # 타입이 섞인 열(알 수 없는 log_type 의 원본 필드 등)은 문자열로
+        return pa.array([None if v is None else (v if isinstance(v, str) else json.dumps(v, default=str))
+                         for v in values])
+
+
+def _arrow_body(columns, data, meta):
+    table = pa.table({col: _arrow_column(data[col]) for col in columns})
+    table = table.replace_schema_metadata({k: json.dumps(v, default=str) for k, v in meta.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def render(fmt, rows, **meta):
+    """
+    rows 를 fmt 형식 응답으로. meta(next_cursor 등)는 응답 최상위(arrow 는 스키마 메타데이터)에.
+    형식이 Accept 헤더로 정해질 수 있으므로 Vary: Accept (응답 캐시 사용 여부와 무관)
+    """
+    meta = {"status": "success", **meta}
+    if fmt == "json":
+        resp = jsonify({**meta, "data": rows})
+        resp.vary.add("Accept")
+        return resp
+
+    columns, data = to_columns(rows)
+    if fmt == "arrow":
+        body = _arrow_body(columns, data, meta)
+    else:
+        payload = {**meta, "format": "columnar", "count": len(rows), "columns": columns, "data": data}
+        if fmt == "msgpack":
+            body = msgpack.packb(payload, default=str, use_bin_type=True)
+        else:
+            body = json.dumps(payload, ensure_ascii=False, default=str, separators=(",", ":"))
+    resp = Response(body, mimetype=MIMETYPES[fmt])
+    resp.vary.add("Accept")
+    return resp
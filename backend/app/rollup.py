@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+트래픽 롤업 (traffic_rollup_minute / traffic_rollup_hour)
+
+(log_type, source_ip, destination_ip, destination_port, protocol, action) 별
+분/시간 단위 flows·packets·bytes 를 적재 시점에 누적한다.
+대시보드 차트는 원본 로그 수백만 행 대신 롤업 수천 행을 읽는다.
+
+- 적재 경로(log_db / save_log / save_cloudtrail)가 원본 INSERT 와 같은 트랜잭션에서 롤업을 기록
+  → 원본이 롤백되면 롤업도 롤백
+- 한 트랜잭션(파일/배치)에서 여러 번 INSERT 하는 경로는 RollupBuffer 에 모아 커밋 직전에 한 번만 기록.
+  병렬 로더가 뜨거운 시간 버킷 행을 트랜잭션마다 정렬된 순서로 한 번에 잠그므로 잠금 순서 역전이 줄어든다.
+  UPSERT 의 gap 잠금 등으로 그래도 데드락(1213)이 나면 호출 측이 트랜잭션을 통째로 재시도 (is_deadlock)
+- 키 컬럼은 NOT NULL DEFAULT '' / 0 (NULL 이 섞이면 UNIQUE 키로 합산되지 않음)
+- 프로토콜은 번호(flow log)와 이름(iptables)이 섞이지 않도록 이름으로 통일
+- bucket 은 naive KST (원본 테이블과 같은 기준). 오프셋이 있는(aware) 시각은 KST 로 바꿔 오프셋 제거
+
+기존 데이터 재집계 (backend 디렉터리에서):
+    python3 app/rollup.py backfill --from 2026-10-01 --to 2026-10-18
+    python3 app/rollup.py backfill --from 2026-10-17 --to 2026-10-18 --type CLOUD
+백필 구간은 해당 구간의 롤업을 지우고 원본에서 다시 계산하므로, 적재가 끝난 과거 구간에 사용한다.
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from connector_db import get_connection
+
+kst = timezone(timedelta(hours=9))
+DEADLOCK_ERRNO = 1213
+DEADLOCK_RETRIES = 3
+ROLLUP_TABLES = ("traffic_rollup_minute", "traffic_rollup_hour")
+LOG_TYPES = ("ONPREM", "CLOUD", "CLOUDTRAIL")
+
+# IANA 프로토콜 번호 → 이름
+PROTOCOL_NAMES = {"1": "ICMP", "6": "TCP", "17": "UDP", "47": "GRE", "50": "ESP", "58": "ICMPV6"}
+
+UPSERT_SQL = """
+    INSERT INTO {table}
+        (bucket, log_type, source_ip, destination_ip, destination_port, protocol, action,
+         flows, packets, bytes)
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    ON DUPLICATE KEY UPDATE
+        flows = flows + VALUES(flows),
+        packets = packets + VALUES(packets),
+        bytes = bytes + VALUES(bytes)
+"""
+
+
+def protocol_name(value):
+    if value is None:
+        return ""
+    value = str(value).strip()
+    return PROTOCOL_NAMES.get(value, value.upper())
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+# ==============================
+# 적재 시점 누적
+# ==============================
+def _add_minutes(minute, rows, sign=1):
+    """rows 를 분 단위 집계 dict(key → [flows, packets, bytes])에 더함. sign=-1 이면 기여분을 뺌"""
+    for ts, log_type, src, dst, dport, proto, action, packets, nbytes in rows:
+        if ts is None:
+            continue
+        if ts.tzinfo is not None:
+            # aware/naive 가 섞이면 키 정렬(write_rollups)에서 TypeError
+            ts = ts.astimezone(kst).replace(tzinfo=None)
+        key = (ts.replace(second=0, microsecond=0), log_type, src or "", dst or "",
+               _int(dport), protocol_name(proto), (action or "").upper())
+        acc = minute.get(key)
+        if acc is None:
+            acc = minute[key] = [0, 0, 0]
+        acc[0] += sign
+        acc[1] += sign * _int(packets)
+        acc[2] += sign * _int(nbytes)
+    return minute
+
+
+def _hours(minute):
+    hour = {}
+    for key, (flows, packets, nbytes) in minute.items():
+        hkey = (key[0].replace(minute=0),) + key[1:]
+        acc = hour.get(hkey)
+        if acc is None:
+            acc = hour[hkey] = [0, 0, 0]
+        acc[0] += flows
+        acc[1] += packets
+        acc[2] += nbytes
+    return hour
+
+
+def write_rollups(cur, minute):
+    """
+    분 단위 집계와 그 시간 단위 합을 ON DUPLICATE KEY UPDATE 로 누적.
+    테이블마다 키 정렬 후 multi-row INSERT 한 번 → 같은 트랜잭션 안에서는 잠금 순서가 항상 같음
+    return: 기록한 분 단위 롤업 행 수
+    """
+    for table, agg in zip(ROLLUP_TABLES, (minute, _hours(minute))):
+        if agg:
+            cur.executemany(UPSERT_SQL.format(table=table),
+                            [k + tuple(v) for k, v in sorted(agg.items())])
+    return len(minute)
+
+
+def apply_rollups(cur, rows, sign=1):
+    """한 번만 롤업을 기록하는 경로(트랜잭션당 호출 1회)용: 집계 후 바로 기록"""
+    return write_rollups(cur, _add_minutes({}, rows, sign))
+
+
+class RollupBuffer:
+    """
+    트랜잭션 하나의 롤업 입력을 모았다가 커밋 직전 flush(cur) 로 한 번에 기록.
+    (파일을 여러 배치로 INSERT 하는 로더가 배치마다 롤업 행을 잠그지 않도록)
+    """
+
+    def __init__(self):
+        self.minute = {}
+
+    def add(self, rows, sign=1):
+        _add_minutes(self.minute, rows, sign)
+
+    def flush(self, cur):
+        written = write_rollups(cur, self.minute)
+        self.minute = {}
+        return written
+
+
+def is_deadlock(e):
+    """MySQL 데드락(1213): 트랜잭션 전체가 롤백되었으므로 처음부터 다시 실행해야 함"""
+    return getattr(e, "errno", None) == DEADLOCK_ERRNO
+
+
+# ==============================
+# 백필 (원본 테이블에서 SQL 로 재집계)
+# ==============================
+def _protocol_case(column):
+    whens = " ".join(f"WHEN '{num}' THEN '{name}'" for num, name in PROTOCOL_NAMES.items())
+    return f"CASE {column} {whens} ELSE UPPER(COALESCE({column}, '')) END"
+
+
+MINUTE_FMT = "DATE_FORMAT({col}, '%%Y-%%m-%%d %%H:%%i:00')"
+HOUR_FMT = "DATE_FORMAT(bucket, '%%Y-%%m-%%d %%H:00:00')"
+
+BACKFILL_SOURCES = {
+    "ONPREM": f"""
+        SELECT {MINUTE_FMT.format(col="timestamp")}, 'ONPREM',
+               COALESCE(source_ip, ''), COALESCE(destination_ip, ''), COALESCE(destination_port, 0),
+               {_protocol_case("protocol")}, '',
+               COUNT(*), COUNT(*), COALESCE(SUM(length), 0)
+        FROM log_onprem
+        WHERE timestamp >= %s AND timestamp < %s
+        GROUP BY 1, 3, 4, 5, 6
+    """,
+    "CLOUD": f"""
+        SELECT {MINUTE_FMT.format(col="start_time")}, 'CLOUD',
+               COALESCE(source_ip, ''), COALESCE(destination_ip, ''), COALESCE(destination_port, 0),
+               {_protocol_case("protocol")}, UPPER(COALESCE(action, '')),
+               COUNT(*), COALESCE(SUM(packet), 0), COALESCE(SUM(byte), 0)
+        FROM log_cloud
+        WHERE start_time >= %s AND start_time < %s
+        GROUP BY 1, 3, 4, 5, 6, 7
+    """,
+    "CLOUDTRAIL": f"""
+        SELECT {MINUTE_FMT.format(col="timestamp")}, 'CLOUDTRAIL',
+               COALESCE(JSON_UNQUOTE(JSON_EXTRACT(raw_event, '$.sourceIPAddress')), ''),
+               COALESCE(JSON_UNQUOTE(JSON_EXTRACT(raw_event, '$.eventSource')), ''),
+               0, '', UPPER(COALESCE(change_type, '')),
+               COUNT(*), 0, 0
+        FROM policy_history_c
+        WHERE timestamp >= %s AND timestamp < %s
+        GROUP BY 1, 3, 4, 7
+    """,
+}
+
+ROLLUP_COLUMNS = ("(bucket, log_type, source_ip, destination_ip, destination_port, protocol, action, "
+                  "flows, packets, bytes)")
+
+
+def backfill_day(cur, start, end, log_types=LOG_TYPES):
+    """[start, end) 구간(시간 경계)의 롤업을 지우고 원본에서 다시 계산"""
+    placeholders = ",".join(["%s"] * len(log_types))
+    for table in ROLLUP_TABLES:
+        cur.execute(f"DELETE FROM {table} WHERE bucket >= %s AND bucket < %s AND log_type IN ({placeholders})",
+                    (start, end, *log_types))
+
+    minute_rows = 0
+    for log_type in log_types:
+        cur.execute(f"INSERT INTO traffic_rollup_minute {ROLLUP_COLUMNS} {BACKFILL_SOURCES[log_type]}",
+                    (start, end))
+        minute_rows += cur.rowcount
+
+    cur.execute(f"""
+        INSERT INTO traffic_rollup_hour {ROLLUP_COLUMNS}
+        SELECT {HOUR_FMT}, log_type, source_ip, destination_ip, destination_port, protocol, action,
+               SUM(flows), SUM(packets), SUM(bytes)
+        FROM traffic_rollup_minute
+        WHERE bucket >= %s AND bucket < %s AND log_type IN ({placeholders})
+        GROUP BY 1, 2, 3, 4, 5, 6, 7
+    """, (start, end, *log_types))
+    return minute_rows
+
+
+def backfill(conn, start, end, log_types=LOG_TYPES):
+    """하루 단위로 나눠 커밋 (긴 트랜잭션/잠금 방지)"""
+    # 시간 롤업을 통째로 다시 만들 수 있도록 시간 경계로 맞춤
+    start = start.replace(minute=0, second=0, microsecond=0)
+    if end != end.replace(minute=0, second=0, microsecond=0):
+        end = end.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    total = 0
+    cur = conn.cursor()
+    try:
+        day = start
+        while day < end:
+            nxt = min(day + timedelta(days=1), end)
+            try:
+                rows = backfill_day(cur, day, nxt, log_types)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            total += rows
+            print(f"[OK] {day:%Y-%m-%d %H:%M} ~ {nxt:%Y-%m-%d %H:%M}: 분 단위 롤업 {rows}행")
+            day = nxt
+    finally:
+        cur.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="트래픽 롤업 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_fill = sub.add_parser("backfill", help="원본 로그에서 롤업 재집계")
+    p_fill.add_argument("--from", dest="start", required=True, help="YYYY-MM-DD[THH:MM]")
+    p_fill.add_argument("--to", dest="end", required=True, help="YYYY-MM-DD[THH:MM] (미포함)")
+    p_fill.add_argument("--type", dest="log_types", action="append", choices=LOG_TYPES,
+                        help="대상 로그 타입 (여러 번 지정 가능, 기본: 전체)")
+    args = parser.parse_args()
+
+    start = datetime.fromisoformat(args.start)
+    end = datetime.fromisoformat(args.end)
+    if end <= start:
+        raise SystemExit("❌ --to 는 --from 보다 뒤여야 합니다.")
+
+    conn = get_connection()
+    try:
+        total = backfill(conn, start, end, tuple(args.log_types or LOG_TYPES))
+        print(f"[DONE] 분 단위 롤업 {total}행")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
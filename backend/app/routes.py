@@ -1,9 +1,13 @@
 # app/routes.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from datetime import datetime
+import os
+import time
+import json
 import yaml
 import traceback
-from app.services import analysis_service, ansible_service, terraform_service, log_service, policy_service
+from app.services import ansible_service, terraform_service, log_service, policy_service
+from app.services import log_stats_service, analysis_jobs
 
 # iptables 버전관리 서비스
 from app.services.iptables_versioning import (
@@ -12,6 +16,10 @@ from app.services.iptables_versioning import (
     get_version_header,
 )
 from app.services.ansible_apply import apply_version_to_hosts
+from app.connector_db import db_stats
+from app.response_cache import cached, invalidate, generations, stats as cache_stats
+from app import response_format
+from app.http_cache import conditional, set_validator, not_modified
 
 bp = Blueprint("api", __name__, url_prefix="/api")
 
@@ -118,6 +126,7 @@ def apply_policy_route():
         # AWS 적용
         if aws_rules:
             results["aws"] = terraform_service.apply_rules(aws_rules)
+            invalidate("policy:version")  # /policy/current 의 AWS 상태
 
         return (
             jsonify(
@@ -132,19 +141,30 @@ def apply_policy_route():
 # ==============================
 # 현재 정책 조회
 # ==============================
+# AWS 상태는 콘솔 등 외부에서도 바뀔 수 있으므로 ETag 를 이 초 단위로 갱신
+AWS_STATE_MAX_AGE = int(os.getenv("POLICY_AWS_STATE_MAX_AGE", "60"))
+
 @bp.route("/policy/current", methods=["GET"])
+@conditional
+@cached(["policy:version"])
 def get_current_policy_route():
     try:
-        on_prem_rules = ansible_service.fetch_rules()
+        # 최신 version_id + 정책 적용 세대가 같으면 Ansible/Terraform 조회 없이 304
+        version_id = ansible_service.get_latest_version_id()
+        parts = ("policy/current", version_id, generations(["policy:version"]),
+                 int(time.time() // AWS_STATE_MAX_AGE))
+        unchanged = not_modified(*parts)
+        if unchanged is not None:
+            return unchanged
+
+        on_prem_rules = ansible_service.fetch_rules_by_version(version_id) if version_id else []
         # [수정] aws_rules 대신 포괄적인 aws_state를 가져오도록 변경
         aws_state = terraform_service.fetch_current_aws_state() 
-        return (
-            jsonify(
-                # [수정] 응답 구조 변경
-                {"status": "success", "data": {"on_premise": on_prem_rules, "aws": aws_state}}
-            ),
-            200,
+        resp = jsonify(
+            # [수정] 응답 구조 변경
+            {"status": "success", "data": {"on_premise": on_prem_rules, "aws": aws_state}}
         )
+        return set_validator(resp, *parts), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -166,36 +186,200 @@ def ingest_log_route():
 # ==============================
 # 로그 조회 (간단 API)
 # ==============================
+def _page_args():
+    """공통 페이지 파라미터: limit, after_id, before_ts, cursor"""
+    return {
+        "limit": request.args.get("limit", type=int),
+        "after_id": request.args.get("after_id", type=int),
+        "before_ts": request.args.get("before_ts"),
+        "cursor": request.args.get("cursor"),
+    }
+
+# stream=1: 페이지 없이 구간 전체를 JSON 배열로 흘려보냄 (unbuffered 커서 → 제너레이터)
+STREAM_CHUNK_BYTES = 64 * 1024
+_END = object()
+
+def _log_query_args():
+    """/logs 구간·필드 필터: from, to(미포함), srcip, dstip, srcport, dstport, protocol, action, log_type
+    raw=1 이면 원본 JSON(raw_log) 포함"""
+    return {
+        "start_ts": request.args.get("from"),
+        "end_ts": request.args.get("to"),
+        "filters": {name: request.args.get(name) for name in log_service.LOG_FILTERS},
+        "include_raw": request.args.get("raw") == "1",
+    }
+
+def _is_stream():
+    return request.args.get("stream") == "1"
+
+def _stream_json(rows):
+    """
+    rows 제너레이터를 {"data":[...],"status":"success"} 형태로 조금씩 직렬화.
+    첫 행을 미리 꺼내 파라미터 오류(ValueError)는 응답 시작 전에 터지게 한다.
+    응답 도중 실패하면 이미 200 이 나갔으므로 끝에 "status":"error" 를 붙여 닫는다.
+    """
+    first = next(rows, _END)
+
+    def generate():
+        buf, size = ['{"data":['], 0
+        try:
+            row = first
+            sep = ""
+            while row is not _END:
+                item = sep + json.dumps(row, ensure_ascii=False, default=str)
+                buf.append(item)
+                size += len(item)
+                if size >= STREAM_CHUNK_BYTES:
+                    yield "".join(buf)
+                    buf, size = [], 0
+                sep = ","
+                row = next(rows, _END)
+            buf.append('],"status":"success"}')
+        except Exception as e:
+            buf.append('],"status":"error","message":' + json.dumps(str(e), ensure_ascii=False) + "}")
+        finally:
+            rows.close()  # 클라이언트가 끊겨도 커서/커넥션 정리
+        yield "".join(buf)
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+def _log_cache_tags(args):
+    log_type = (args.get("log_type") or "").upper()
+    return [f"logs:{log_type}"] if log_type in log_service.LOG_TYPES else ["logs:ONPREM", "logs:CLOUD"]
+
 @bp.route('/logs', methods=['GET'])
+@conditional
+@cached(_log_cache_tags)
 def get_logs_route():
     range_type = request.args.get("range", "hour")  # daily, weekly, monthly, hour, 10min
 
     try:
-        logs = log_service.get_logs(range_type=range_type)
-        return jsonify({"status": "success", "data": logs}), 200
+        if _is_stream():
+            return _stream_json(log_service.stream_logs(
+                range_type,
+                after_id=request.args.get("after_id", type=int),
+                before_ts=request.args.get("before_ts"),
+                **_log_query_args(),
+            ))
+        fmt = response_format.negotiate(request)
+        page_args, query_args = _page_args(), _log_query_args()
+        # 구간의 최신 log_id / 건수가 같으면 페이지 쿼리 없이 304
+        latest, total = log_service.logs_version(
+            range_type, page_args["after_id"], page_args["before_ts"], page_args["cursor"],
+            query_args["start_ts"], query_args["end_ts"], query_args["filters"],
+        )
+        parts = ("logs", fmt, request.query_string, latest, total)
+        unchanged = not_modified(*parts, vary=("Accept",))
+        if unchanged is not None:
+            return unchanged
+
+        logs, next_cursor = log_service.get_logs_page(range_type=range_type, **page_args, **query_args)
+        resp = response_format.render(fmt, logs, next_cursor=next_cursor)
+        return set_validator(resp, *parts), 200
+    except response_format.FormatUnavailable as fe:
+        return jsonify({"status": "error", "message": str(fe)}), 406
+    except ValueError as ve:
+        return jsonify({"status": "error", "message": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@bp.route('/logs/rollup', methods=['GET'])
+def get_logs_rollup_route():
+    range_type = request.args.get("range", "daily")    # daily, weekly, monthly, hour, 10min
+    granularity = request.args.get("granularity")      # minute, hour (기본: 범위에 따라)
+    log_type = request.args.get("log_type")            # ONPREM, CLOUD, CLOUDTRAIL
+
+    try:
+        rows = log_service.get_traffic_rollup(range_type, granularity, log_type)
+        return jsonify({"status": "success", "data": rows}), 200
+    except ValueError as ve:
+        return jsonify({"status": "error", "message": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+# ==============================
+# 대시보드 통계 (롤업 테이블 SQL 집계)
+# ==============================
+STATS_VIEWS = {
+    "": log_stats_service.summary,
+    "top-talkers": log_stats_service.top_talkers,
+    "top-ports": log_stats_service.top_ports,
+    "actions": log_stats_service.action_ratio,
+    "timeline": log_stats_service.timeline,
+}
+TOP_VIEWS = ("", "top-talkers", "top-ports")
+
+def _stats_cache_tags(args):
+    log_type = (args.get("log_type") or "").upper()
+    return ["policy:cloud"] if log_type == "CLOUDTRAIL" else _log_cache_tags(args)
+
+@bp.route('/logs/stats', methods=['GET'], defaults={"kind": ""})
+@bp.route('/logs/stats/<kind>', methods=['GET'])
+@conditional
+@cached(_stats_cache_tags)
+def get_logs_stats_route(kind):
+    """
+    range 또는 from/to, log_type(ONPREM/CLOUD/CLOUDTRAIL), granularity(minute/hour)
+    top-talkers / top-ports / (요약): metric(flows/packets/bytes), limit
+    """
+    view = STATS_VIEWS.get(kind)
+    if view is None:
+        return jsonify({"status": "error", "message": f"Unknown stats: {kind}"}), 404
+
+    args = {
+        "range_type": request.args.get("range", "daily"),
+        "start_ts": request.args.get("from"),
+        "end_ts": request.args.get("to"),
+        "granularity": request.args.get("granularity"),
+        "log_type": request.args.get("log_type"),
+    }
+    if kind in TOP_VIEWS:
+        args["metric"] = request.args.get("metric", "flows")
+        args["limit"] = request.args.get("limit", type=int)
+
+    try:
+        data, window = view(**args)
+        return jsonify({"status": "success", "data": data, "window": window}), 200
     except ValueError as ve:
         return jsonify({"status": "error", "message": str(ve)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @bp.route('/policy', methods=['GET'])
+@conditional
+@cached(lambda args: [f"policy:{args.get('type')}"])
 def get_policy_logs_route():
     policy_type = request.args.get("type")       # cloud / onprem
     range_type = request.args.get("range", "hour")  # daily, weekly, monthly, hour, 10min
 
     try:
-        if policy_type == "cloud":
-            logs = policy_service.get_policy_cloud(range_type)
-        elif policy_type == "onprem":
-            logs = policy_service.get_policy_onprem(range_type)
-        else:
+        if policy_type not in ("cloud", "onprem"):
             return jsonify({
                 "status": "error",
                 "message": "Invalid type. Use 'cloud' or 'onprem'."
             }), 400
 
-        return jsonify({"status": "success", "data": logs}), 200
-
+        if _is_stream():
+            return _stream_json(policy_service.stream_policy(
+                policy_type, range_type,
+                after_id=request.args.get("after_id", type=int),
+                before_ts=request.args.get("before_ts"),
+            ))
+
+        fmt = response_format.negotiate(request)
+        # 구간의 최신 history_id / 건수가 같으면 페이지 쿼리 없이 304
+        latest, total = policy_service.policy_version(policy_type, range_type, cursor=request.args.get("cursor"))
+        parts = ("policy", fmt, request.query_string, latest, total)
+        unchanged = not_modified(*parts, vary=("Accept",))
+        if unchanged is not None:
+            return unchanged
+
+        logs, next_cursor = policy_service.get_policy_page(policy_type, range_type, **_page_args())
+        resp = response_format.render(fmt, logs, next_cursor=next_cursor)
+        return set_validator(resp, *parts), 200
+
+    except response_format.FormatUnavailable as fe:
+        return jsonify({"status": "error", "message": str(fe)}), 406
     except ValueError as ve:
         return jsonify({"status": "error", "message": str(ve)}), 400
     except Exception as e:
@@ -238,17 +422,19 @@ def create_iptables_version_route():
 def get_iptables_diff_route():
     """
     Query:
-      ?base=<version_id>&new=<version_id>
+      ?base=<version_id>&new=<version_id>[&ryw=1]
+      ryw=1: 방금 저장한 버전과 비교할 때 primary 에서 읽음 (복제 지연 회피)
     Return:
       { status, diff: { added, removed, changed, kept } }
     """
     base_id = request.args.get("base", type=int)
     new_id = request.args.get("new", type=int)
+    ryw = request.args.get("ryw") == "1"
     if not base_id or not new_id:
         return jsonify({"status": "error", "message": "base, new 파라미터가 필요합니다."}), 400
 
     try:
-        d = diff_versions(base_id, new_id)
+        d = diff_versions(base_id, new_id, read_your_writes=ryw)
         return jsonify({"status": "ok", "diff": d}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
@@ -257,7 +443,7 @@ def get_iptables_diff_route():
 # 3) 특정 버전 메타 조회
 @bp.route("/iptables/versions/<int:version_id>", methods=["GET"])
 def get_iptables_version_meta_route(version_id: int):
-    header = get_version_header(version_id)
+    header = get_version_header(version_id, readonly=request.args.get("ryw") != "1")
     if not header:
         return jsonify({"status": "error", "message": "not found"}), 404
     return jsonify({"status": "ok", "version": header}), 200
@@ -290,62 +476,94 @@ def apply_iptables_version_route():
 
 
 
-@bp.route("/logs/threats", methods=["GET"])
-def get_threat_log_table_route():
-    """
-    로그 데이터에서 위협으로 감지된 로그만 JSON 배열 형식으로 반환하는 API
-    """
-    log_type = request.args.get("type")
-    range_type = request.args.get("range", "daily")
-    limit = request.args.get("limit", 100, type=int)
-    
+# =======================================================
+# AI 분석 API (비동기 작업)
+# 요청은 작업만 만들고 202 + job_id 를 바로 반환 → /analysis/jobs/<job_id> 로 상태, /result 로 결과
+# sync=1 이면 기존처럼 요청 안에서 분석해 결과를 바로 반환
+# =======================================================
+def _submit_analysis(kind, params):
     try:
-        # JSON을 반환하는 새로운 서비스 함수를 호출합니다.
-        threat_list = analysis_service.get_threat_logs_as_json(
-            log_type=log_type,
-            range_type=range_type,
-            limit=limit
-        )
-        # key 이름을 "threats"로 변경하여 JSON 배열을 반환합니다.
-        return jsonify({"status": "success", "threats": threat_list}), 200
+        if request.args.get("sync") == "1":
+            return jsonify({"status": "success", **analysis_jobs.run_inline(kind, params)}), 200
+        job, reused = analysis_jobs.submit(kind, params)
+    except analysis_jobs.JobQueueError as e:
+        return jsonify({"status": "error", "message": f"분석 작업을 큐에 넣지 못했습니다: {e}"}), 503
     except Exception as e:
         traceback.print_exc()
         return jsonify({"status": "error", "message": str(e)}), 500
+    return jsonify({
+        "status": "accepted",
+        "job_id": job["job_id"],
+        "state": job["state"],
+        "reused": reused,
+        "status_url": f"/api/analysis/jobs/{job['job_id']}",
+        "result_url": f"/api/analysis/jobs/{job['job_id']}/result",
+    }), 202
+
+
+@bp.route("/logs/threats", methods=["GET"])
+def get_threat_log_table_route():
+    """
+    로그 데이터에서 위협으로 감지된 로그만 추출하는 분석 작업 (결과: {"threats": [...]})
+    """
+    return _submit_analysis("threats", {
+        "log_type": request.args.get("type"),
+        "range_type": request.args.get("range", "daily"),
+        "limit": request.args.get("limit", 100, type=int),
+    })
 
 @bp.route("/logs/analysis-report", methods=["GET"])
 def get_traffic_analysis_report_route():
-    """일반 트래픽 로그를 상세 분석하여 마크다운 보고서를 반환하는 API"""
-    range_type = request.args.get("range", "daily")
-    limit = request.args.get("limit", 100, type=int)
-    
-    try:
-        report_content = analysis_service.get_traffic_analysis_report(
-            range_type=range_type,
-            limit=limit
-        )
-        return jsonify({"status": "success", "report": report_content}), 200
-    except Exception as e:
-        traceback.print_exc()
-        return jsonify({"status": "error", "message": str(e)}), 500
+    """일반 트래픽 로그 상세 분석 작업 (결과: 마크다운 {"report": ...})"""
+    return _submit_analysis("traffic_report", {
+        "range_type": request.args.get("range", "daily"),
+        "limit": request.args.get("limit", 100, type=int),
+    })
 
-# =======================================================
-# [신규] AI 정책 로그 상세 보고서 API
-# =======================================================
 @bp.route("/policy/analysis-report", methods=["GET"])
 def get_policy_analysis_report_route():
-    """정책 변경 로그를 상세 분석하여 마크다운 보고서를 반환하는 API"""
+    """정책 변경 로그 상세 분석 작업 (결과: 마크다운 {"report": ...})"""
     policy_type = request.args.get("type")
-    range_type = request.args.get("range", "daily")
-    
-    if not policy_type:
+    if policy_type not in ("cloud", "onprem"):
         return jsonify({"status": "error", "message": "'type' 파라미터(cloud 또는 onprem)가 필요합니다."}), 400
-        
-    try:
-        report_content = analysis_service.get_policy_analysis_report(
-            policy_type=policy_type,
-            range_type=range_type
-        )
-        return jsonify({"status": "success", "report": report_content}), 200
-    except Exception as e:
-        traceback.print_exc()
-        return jsonify({"status": "error", "message": str(e)}), 500
\ No newline at end of file
+
+    return _submit_analysis("policy_report", {
+        "policy_type": policy_type,
+        "range_type": request.args.get("range", "daily"),
+    })
+
+@bp.route("/analysis/jobs/<job_id>", methods=["GET"])
+def get_analysis_job_route(job_id):
+    """분석 작업 상태 (state: PENDING / RUNNING / SUCCESS / FAILURE)"""
+    job = analysis_jobs.get_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "분석 작업을 찾을 수 없습니다."}), 404
+    return jsonify({"status": "success", "job": job}), 200
+
+@bp.route("/analysis/jobs/<job_id>/result", methods=["GET"])
+def get_analysis_job_result_route(job_id):
+    """
+    완료된 작업 결과: 기존 동기 API 와 같은 형태 ({"status": "success", "report" | "threats": ...})
+    아직 진행 중이면 202, 실패했으면 500
+    """
+    job, result = analysis_jobs.get_result(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "분석 작업을 찾을 수 없습니다."}), 404
+    if job["state"] in analysis_jobs.ACTIVE_STATES:
+        return jsonify({"status": "pending", "job_id": job_id, "state": job["state"]}), 202
+    if job["state"] != analysis_jobs.SUCCESS:
+        return jsonify({"status": "error", "job_id": job_id, "message": job["error"]}), 500
+    return jsonify({"status": "success", "job_id": job_id, **result}), 200
+
+
+# ==============================
+# DB 커넥션 풀 / 호스트 토폴로지 / 읽기·쓰기 라우팅 상태
+# ==============================
+@bp.route("/db/stats", methods=["GET"])
+def get_db_stats_route():
+    return jsonify({"status": "success", **db_stats()}), 200
+
+# 조회 API 응답 캐시 적중률
+@bp.route("/cache/stats", methods=["GET"])
+def get_cache_stats_route():
+    return jsonify({"status": "success", **cache_stats()}), 200
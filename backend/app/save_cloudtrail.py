@@ -1,28 +1,48 @@
 #!/usr/bin/env python3
-import os, sys, json, gzip, mysql.connector
+import os, sys, json, gzip, argparse
 from dotenv import load_dotenv
+from connector_db import get_connection
+from file_manifest import ensure_table, check_file, record_file
+from cloudtrail_reader import iter_mutating_events
+from timeparse import parse_log_time, stats as timeparse_stats
+from rollup import apply_rollups
+from response_cache import invalidate
 from datetime import datetime, timezone, timedelta
 
 load_dotenv()
 kst = timezone(timedelta(hours=9))
+MANIFEST_LOADER = "cloudtrail"
+# 조회 SQL (migrate.py check-plans 가 같은 SQL 을 EXPLAIN)
+# "직전 이력" 은 적재 순서(history_id)가 아니라 eventTime 순서 → (timestamp, history_id) 최신 행
+PREVIOUS_AFTER_SQL = """
+    SELECT after_change
+    FROM policy_history_c
+    WHERE policy_id = %s
+    ORDER BY timestamp DESC, history_id DESC
+    LIMIT 1
+"""
 
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST"),
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        database=os.getenv("MYSQL_DB"),
-    )
+def preload_sql(n):
+    """policy_id n 개에 대한 preload_previous_after SQL (정책별 (timestamp, history_id) 최신 행)"""
+    placeholders = ",".join(["%s"] * n)
+    return f"""
+        SELECT h.policy_id, h.after_change
+        FROM (
+            SELECT DISTINCT policy_id
+            FROM policy_history_c
+            WHERE policy_id IN ({placeholders})
+        ) p
+        JOIN policy_history_c h ON h.history_id = (
+            SELECT x.history_id
+            FROM policy_history_c x
+            WHERE x.policy_id = p.policy_id
+            ORDER BY x.timestamp DESC, x.history_id DESC
+            LIMIT 1
+        )
+    """
 
 def get_previous_after(cur, policy_id):
-    sql = """
-        SELECT after_change
-        FROM policy_history_c
-        WHERE policy_id = %s
-        ORDER BY history_id DESC
-        LIMIT 1
-    """
-    cur.execute(sql, (policy_id,))
+    cur.execute(PREVIOUS_AFTER_SQL, (policy_id,))
     row = cur.fetchone()
     return row[0] if row else None
 
@@ -35,18 +55,30 @@ def extract_policy_id(event):
     if "name" in req:       return req["name"]
     return 0
 
-def insert_policy_history(cur, event, user_id=0):
+HISTORY_SQL = """
+    INSERT IGNORE INTO policy_history_c
+        (policy_id, user_id, change_type,
+         before_change, after_change,
+         reason, timestamp, event_id, raw_event)
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+"""
+
+def build_history_row(event, user_id=0, raw_event=None):
+    """
+    변경 이벤트 → policy_history_c 행 dict (before_change 제외).
+    읽기 전용/비변경 이벤트면 None
+    """
     event_id = event.get("eventID")
     event_time = event.get("eventTime")
     event_name = event.get("eventName", "")
     read_only = event.get("readOnly", False)
 
     if read_only:
-        return False
+        return None
 
     lower = event_name.lower()
     if not any(x in lower for x in ["create", "put", "update", "delete"]):
-        return False
+        return None
 
     policy_id = extract_policy_id(event)
 
@@ -60,64 +92,154 @@ def insert_policy_history(cur, event, user_id=0):
         change_type = "UPDATE"
 
     after_json = json.dumps(event.get("requestParameters") or {}, ensure_ascii=False)
+    if raw_event is None:
+        raw_event = json.dumps(event, ensure_ascii=False)
+
+    dt_utc = parse_log_time(event_time)
+    ts = dt_utc.astimezone(kst).replace(tzinfo=None) if dt_utc else None
+
+    return {
+        "policy_id": policy_id, "user_id": user_id, "change_type": change_type,
+        "after_change": after_json, "timestamp": ts, "event_id": event_id,
+        "raw_event": raw_event,
+        # 롤업용 (policy_history_c 에는 raw_event 안에만 저장)
+        "source_ip": event.get("sourceIPAddress"), "event_source": event.get("eventSource"),
+    }
+
+def history_rollup_rows(rows):
+    """롤업 입력: 호출 IP → 서비스(eventSource) 별 변경 유형 건수"""
+    for row in rows:
+        # (ts, log_type, src, dst, dport, protocol, action, packets, bytes)
+        yield (row["timestamp"], "CLOUDTRAIL", row["source_ip"], row["event_source"],
+               0, None, row["change_type"], 0, 0)
+
+def _history_params(row, before_json):
+    return (
+        row["policy_id"], row["user_id"], row["change_type"],
+        before_json, row["after_change"],
+        None, row["timestamp"], row["event_id"], row["raw_event"]
+    )
+
+def insert_policy_history(cur, event, user_id=0, raw_event=None):
+    row = build_history_row(event, user_id, raw_event)
+    if row is None:
+        return False
+    policy_id = row["policy_id"]
     before_json = get_previous_after(cur, policy_id) if policy_id else None
-    raw_event = json.dumps(event, ensure_ascii=False)
+    cur.execute(HISTORY_SQL, _history_params(row, before_json))
+    if cur.rowcount == 1:  # INSERT IGNORE 로 건너뛴 중복 event_id 는 롤업에 더하지 않음
+        apply_rollups(cur, history_rollup_rows([row]))
+    return True
+
+# ==============================
+# 배치 모드: 이벤트별 SELECT(N+1) 없이 before_change 를 메모리에서 연결
+# ==============================
+PRELOAD_CHUNK = 1000
+
+def preload_previous_after(cur, policy_ids):
+    """policy_id 별 가장 최근 after_change 를 한 번의 쿼리(IN 목록 청크 단위)로 조회"""
+    latest = {}
+    ids = list(policy_ids)
+    for i in range(0, len(ids), PRELOAD_CHUNK):
+        chunk = ids[i:i + PRELOAD_CHUNK]
+        cur.execute(preload_sql(len(chunk)), chunk)
+        for policy_id, after_change in cur.fetchall():
+            latest[policy_id] = after_change
+    return latest
 
-    ts = None
-    if event_time:
+def existing_event_ids(cur, event_ids):
+    """이미 policy_history_c 에 있는 event_id 집합 (uq_policy_history_c_event 인덱스 조회)"""
+    found = set()
+    ids = [e for e in set(event_ids) if e]
+    for i in range(0, len(ids), PRELOAD_CHUNK):
+        chunk = ids[i:i + PRELOAD_CHUNK]
+        placeholders = ",".join(["%s"] * len(chunk))
+        cur.execute(f"SELECT event_id FROM policy_history_c WHERE event_id IN ({placeholders})", chunk)
+        found.update(r[0] for r in cur.fetchall())
+    return found
+
+def history_rows(events, user_id=0):
+    """(event dict, raw_event 문자열) 반복자 → policy_history_c 행 dict (변환 실패/비변경 이벤트 제외)"""
+    for event, raw in events:
         try:
-            dt_utc = datetime.fromisoformat(event_time.replace("Z", "+00:00"))
-            ts = dt_utc.astimezone(kst).replace(tzinfo=None)
-        except Exception:
-            ts = None
+            row = build_history_row(event, user_id, raw)
+        except Exception as e:
+            print(f"❌ 이벤트 변환 오류 ({event.get('eventID')}): {e}")
+            continue
+        if row is not None:
+            yield row
 
-    sql = """
-    INSERT IGNORE INTO policy_history_c
-        (policy_id, user_id, change_type,
-         before_change, after_change,
-         reason, timestamp, event_id, raw_event)
-    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+def insert_history_rows(cur, rows, chunk_size=500):
     """
-    cur.execute(sql, (
-        policy_id, user_id, change_type,
-        before_json, after_json,
-        None, ts, event_id, raw_event
-    ))
-    return True
+    eventTime 순으로 정렬 후, 앞선 이벤트를 포함해 before_change 를 연결하고
+    executemany 로 일괄 저장. return: 새로 저장한 건수
+    이미 저장된 event_id(파일 재처리)는 INSERT/롤업에서 빼고 before_change 연결에만 사용
+    """
+    if not rows:
+        return 0
+
+    rows.sort(key=lambda r: (r["timestamp"] is None, r["timestamp"] or datetime.min))
+    latest = preload_previous_after(cur, {r["policy_id"] for r in rows if r["policy_id"]})
+    seen = existing_event_ids(cur, (r["event_id"] for r in rows))
+
+    params, new_rows = [], []
+    for row in rows:
+        policy_id = row["policy_id"]
+        before_json = latest.get(policy_id) if policy_id else None
+        if policy_id:
+            latest[policy_id] = row["after_change"]
+        if row["event_id"] and row["event_id"] in seen:
+            continue
+        seen.add(row["event_id"])
+        params.append(_history_params(row, before_json))
+        new_rows.append(row)
+
+    for i in range(0, len(params), chunk_size):
+        cur.executemany(HISTORY_SQL, params[i:i + chunk_size])
+    apply_rollups(cur, history_rollup_rows(new_rows))
+    return len(params)
 
 def process_file(path, cur):
+    """
+    Records 를 스트리밍으로 읽어 변경 이벤트만 행으로 바꿔 모은 뒤,
+    파일 전체를 eventTime 순으로 정렬해 저장 (청크 단위 정렬이면 청크 경계에서 before_change 순서가 어긋남).
+    이벤트 dict 는 행으로 바꾼 즉시 버리므로 메모리에는 변경 이벤트 행(원본 문자열 포함)만 남는다.
+    return: 저장 건수, 파일 형식 오류 시 None (호출 측에서 롤백)
+    """
     opener = gzip.open if path.endswith(".gz") else open
+    counts = {"records": 0}
     with opener(path, "rt", encoding="utf-8") as f:
         try:
-            data = json.load(f)
-        except Exception as e:
+            rows = list(history_rows(iter_mutating_events(f, counts=counts)))
+        except (ValueError, EOFError, OSError) as e:
+            # 형식 오류 / 잘린 gzip(EOFError) / 깨진 gzip(BadGzipFile) → 이 파일만 건너뜀
             print(f"❌ JSON 파싱 실패: {path} ({e})")
-            return
-
-        records = data.get("Records", [])
-        if not records:
-            print(f"[INFO] Records 없음: {path}")
-            return
-
-        inserted = 0
-        for rec in records:
-            try:
-                if insert_policy_history(cur, rec, user_id=0):
-                    inserted += 1
-            except Exception as e:
-                print(f"❌ {path} 이벤트 저장 오류: {e}")
-
-        if inserted:
-            print(f"[OK] {path}: {inserted} rows inserted")
-        else:
-            print(f"[SKIP] {path}: 변경 이벤트 없음")
+            return None
+
+    if not counts["records"]:
+        print(f"[INFO] Records 없음: {path}")
+        return 0
+    try:
+        inserted = insert_history_rows(cur, rows)
+    except Exception as e:
+        print(f"❌ {path} 이벤트 저장 오류: {e}")
+        return None
+
+    if inserted:
+        print(f"[OK] {path}: {inserted} rows inserted")
+    else:
+        print(f"[SKIP] {path}: 변경 이벤트 없음")
+    return inserted
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 save_cloudtrail.py <log_directory>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="CloudTrail 로그 디렉터리 적재")
+    parser.add_argument("log_dir")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="적재 완료 파일 매니페스트를 쓰지 않고 전체 파일을 다시 적재")
+    args = parser.parse_args()
+    use_manifest = not args.no_manifest
 
-    log_dir = sys.argv[1]
+    log_dir = args.log_dir
     if not os.path.isdir(log_dir):
         print(f"❌ Not a directory: {log_dir}")
         sys.exit(1)
@@ -125,12 +247,34 @@ def main():
     conn = get_connection()
     cur = conn.cursor()
     try:
-        for fname in os.listdir(log_dir):
+        if use_manifest:
+            ensure_table(cur)
+            conn.commit()
+
+        # 파일 단위 커밋: 이벤트와 매니페스트를 같은 트랜잭션으로 기록
+        for fname in sorted(os.listdir(log_dir)):
             fpath = os.path.join(log_dir, fname)
-            if os.path.isfile(fpath) and (fname.endswith(".json") or fname.endswith(".gz")):
-                print(f"Processing {fpath} ...")
-                process_file(fpath, cur)
-        conn.commit()
+            if not (os.path.isfile(fpath) and (fname.endswith(".json") or fname.endswith(".gz"))):
+                continue
+            # 중복 event_id 는 저장/롤업에서 빠지므로 내용이 바뀐 파일도 다시 적재해도 안전
+            info = check_file(cur, MANIFEST_LOADER, fpath, allow_changed=True) if use_manifest else None
+            if use_manifest and info is None:
+                conn.commit()
+                continue
+            print(f"Processing {fpath} ...")
+            inserted = process_file(fpath, cur)
+            if inserted is None:
+                conn.rollback()  # 깨진 파일은 일부만 저장하지 않음
+                continue
+            if info is not None:
+                record_file(cur, MANIFEST_LOADER, fpath, info, inserted)
+            conn.commit()
+            if inserted:
+                invalidate("policy:cloud")
+
+        tp = timeparse_stats()
+        if tp["failures"]:
+            print(f"[WARN] eventTime 파싱 실패 {tp['failures']}건 (예: {tp['last_failure']})")
     finally:
         try: cur.close()
         except: pass
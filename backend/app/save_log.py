@@ -1,17 +1,16 @@
-import os, sys, json, gzip, mysql.connector
+import os, sys, json, gzip, time, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
+from connector_db import get_connection
+from file_manifest import ensure_table, check_file, record_file, id_ranges, file_row_ranges
+from response_cache import invalidate
+from flowlog_columns import iter_file_columns, common_rows, cloud_rows, flowlog_rollup_rows
+from rollup import apply_rollups, RollupBuffer, is_deadlock, DEADLOCK_RETRIES
 
 load_dotenv()
 kst = timezone(timedelta(hours=9))
-
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST"),
-        user=os.getenv("MYSQL_USER"),
-        password=os.getenv("MYSQL_PASSWORD"),
-        database=os.getenv("MYSQL_DB"),
-    )
+MANIFEST_LOADER = "flowlog"
 
 def insert_log_common(cur, log_type, raw, timestamp):
     sql = """INSERT INTO log_common (log_type, timestamp, raw_log, created_at)
@@ -19,25 +18,29 @@ def insert_log_common(cur, log_type, raw, timestamp):
     cur.execute(sql, (log_type, timestamp, json.dumps(raw, ensure_ascii=False)))
     return cur.lastrowid
 
-def insert_log_cloud(cur, log_id, entry):
-    sql = """INSERT IGNORE INTO log_cloud
+LOG_COMMON_SQL = """INSERT INTO log_common (log_type, timestamp, raw_log, created_at)
+                    VALUES (%s, %s, %s, NOW())"""
+
+LOG_CLOUD_SQL = """INSERT IGNORE INTO log_cloud
              (log_id, version, account_id, interface_id, source_ip, destination_ip,
               protocol, source_port, destination_port, packet, byte,
               start_time, end_time, action, log_status)
              VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"""
 
-    def to_dt(epoch):
-        if not epoch:
-            return None
-        try:
-            e = int(epoch)
-            if e > 10**12:
-                e //= 1000
-            return datetime.fromtimestamp(e, tz=timezone.utc).astimezone(kst).replace(tzinfo=None)
-        except Exception:
-            return None
-
-    cur.execute(sql, (
+def to_dt(epoch):
+    if not epoch:
+        return None
+    try:
+        e = int(epoch)
+        if e > 10**12:
+            e //= 1000
+        return datetime.fromtimestamp(e, tz=timezone.utc).astimezone(kst).replace(tzinfo=None)
+    except Exception:
+        return None
+
+def cloud_params(log_id, entry, start_time=None):
+    """start_time: log_common.timestamp 에 쓴 값 (조회 JOIN 키, 같은 일자 파티션)"""
+    return (
         log_id,
         int(entry.get("version")),
         entry.get("account-id"),
@@ -49,54 +52,241 @@ def insert_log_cloud(cur, log_id, entry):
         int(entry.get("dstport")) if entry.get("dstport") else None,
         entry.get("packets"),
         entry.get("bytes"),
-        to_dt(entry.get("start")),
+        start_time or entry_timestamp(entry),  # 파티션 키라 NULL 불가
         to_dt(entry.get("end")),
         entry.get("action"),
         entry.get("log-status"),
-    ))
+    )
+
+def insert_log_cloud(cur, log_id, entry):
+    cur.execute(LOG_CLOUD_SQL, cloud_params(log_id, entry))
+
+def parse_line(line):
+    """VPC Flow Log 한 줄 → entry dict (헤더/빈 줄은 None, 필드 부족 시 ValueError)"""
+    line = line.strip()
+    if not line or line.startswith("version"):
+        return None
+    parts = line.split()
+    if len(parts) < 14:
+        raise ValueError(f"Invalid VPC log line: {line}")
+    return {
+        "version": parts[0], "account-id": parts[1], "interface-id": parts[2],
+        "srcaddr": parts[3], "dstaddr": parts[4],
+        "srcport": parts[5], "dstport": parts[6],
+        "protocol": parts[7], "packets": parts[8], "bytes": parts[9],
+        "start": parts[10], "end": parts[11],
+        "action": parts[12], "log-status": parts[13],
+    }
 
-def process_file(path, cur):
+def entry_timestamp(entry):
+    ts = datetime.now(kst).replace(tzinfo=None)
+    try:
+        e = int(entry["start"])
+        if e > 10**12:
+            e //= 1000
+        ts = datetime.fromtimestamp(e, tz=timezone.utc).astimezone(kst).replace(tzinfo=None)
+    except Exception:
+        pass
+    return ts
+
+def open_log(path):
     opener = gzip.open if path.endswith(".gz") else open
-    with opener(path, "rt", encoding="utf-8") as f:
+    return opener(path, "rt", encoding="utf-8")
+
+def process_file(path, cur, ids=None, rollups=None):
+    """
+    ids: 넘기면 저장한 log_id 를 추가 (매니페스트 구간 기록용)
+    rollups: 넘기면 롤업 입력을 RollupBuffer 에 모으고 기록은 호출 측 flush 에 맡김
+    """
+    inserted = 0
+    rollup_rows = []
+    with open_log(path) as f:
         for line in f:
-            line = line.strip()
-            if not line or line.startswith("version"):
-                continue
             try:
-                parts = line.split()
-                if len(parts) < 14:
-                    print(f"❌ Invalid VPC log line in {path}: {line}")
+                entry = parse_line(line)
+                if entry is None:
                     continue
-
-                entry = {
-                    "version": parts[0], "account-id": parts[1], "interface-id": parts[2],
-                    "srcaddr": parts[3], "dstaddr": parts[4],
-                    "srcport": parts[5], "dstport": parts[6],
-                    "protocol": parts[7], "packets": parts[8], "bytes": parts[9],
-                    "start": parts[10], "end": parts[11],
-                    "action": parts[12], "log-status": parts[13],
-                }
-
-                ts = datetime.now(kst).replace(tzinfo=None)
-                try:
-                    e = int(entry["start"])
-                    if e > 10**12:
-                        e //= 1000
-                    ts = datetime.fromtimestamp(e, tz=timezone.utc).astimezone(kst).replace(tzinfo=None)
-                except Exception:
-                    pass
-
+                ts = entry_timestamp(entry)
                 log_id = insert_log_common(cur, "CLOUD", entry, ts)
-                insert_log_cloud(cur, log_id, entry)
+                params = cloud_params(log_id, entry, ts)
+                cur.execute(LOG_CLOUD_SQL, params)
+                if ids is not None:
+                    ids.append(log_id)
+                rollup_rows.append((params[11], "CLOUD", params[4], params[5], params[8],
+                                    params[6], params[13], params[9], params[10]))
+                inserted += 1
+            except ValueError as e:
+                print(f"❌ {e} ({path})")
             except Exception as e:
                 print(f"❌ Parse error in {path}: {e}")
+    if rollups is not None:
+        rollups.add(rollup_rows)
+    else:
+        apply_rollups(cur, rollup_rows)
+    return inserted
+
+# ==============================
+# 일괄(bulk) 로더: 파일 단위 병렬 처리 + 컬럼 단위 파싱 + multi-row INSERT
+# ==============================
+def write_columns(cur, cols, rollups, step=1):
+    """
+    log_common multi-row INSERT 후 첫 id 로부터 log_cloud 의 log_id 를 복원해 저장.
+    롤업 입력은 rollups(RollupBuffer)에 모으고, 커밋 직전에 flush 한다.
+    return: 저장한 (첫 log_id, 마지막 log_id)
+    """
+    cur.executemany(LOG_COMMON_SQL, common_rows(cols))
+    if cur.rowcount != cols["count"]:
+        raise RuntimeError(f"log_common 일괄 저장 행 수 불일치: {cur.rowcount}/{cols['count']}")
+    first_id = cur.lastrowid
+    cur.executemany(LOG_CLOUD_SQL, cloud_rows(cols, first_id, step))
+    rollups.add(flowlog_rollup_rows(cols))
+    return first_id, first_id + (cols["count"] - 1) * step
+
+# ==============================
+# 내용이 바뀐 파일: 이전 적재 행 삭제 후 재적재
+# ==============================
+UNLOAD_ROLLUP_SQL = """
+    SELECT start_time, 'CLOUD', source_ip, destination_ip, destination_port, protocol, action, packet, byte
+    FROM log_cloud
+    WHERE log_id BETWEEN %s AND %s
+"""
+
+def unload_file(cur, path, info, rollups):
+    """
+    check_file 이 changed 로 돌려준 파일의 이전 행(log_common / log_cloud)을 삭제하고 롤업 기여분은 rollups 에서 뺌.
+    호출 측 파일 트랜잭션 안에서 실행되므로 재적재가 실패하면 삭제도 롤백된다.
+    return: 재적재해도 되면 True, 이전 구간 기록이 없어 지울 수 없으면 False (중복 방지로 skip)
+    """
+    if not info["changed"]:
+        return True
+    ranges = file_row_ranges(cur, info["id"])
+    if info["rows_loaded"] and not ranges:
+        print(f"[WARN] 내용이 바뀌었지만 이전 적재 구간 기록이 없어 건너뜀 (다시 적재하면 중복): {path}")
+        return False
+    deleted = 0
+    for first, last in ranges:
+        cur.execute(UNLOAD_ROLLUP_SQL, (first, last))
+        rollups.add(cur.fetchall(), sign=-1)
+        cur.execute("DELETE FROM log_cloud WHERE log_id BETWEEN %s AND %s", (first, last))
+        cur.execute("DELETE FROM log_common WHERE log_id BETWEEN %s AND %s AND log_type = 'CLOUD'",
+                    (first, last))
+        deleted += cur.rowcount
+    print(f"[INFO] 내용이 바뀐 파일 재적재: 이전 {deleted}행 삭제 ({path})")
+    return True
+
+def load_file_bulk(path, batch_size=1000, commit_every=0, use_manifest=False):
+    """
+    (프로세스 풀 워커) 파일 하나를 자체 커넥션으로 적재.
+    batch_size 줄씩 컬럼 단위로 파싱해 multi-row INSERT, commit_every 행마다 커밋 (0 이면 파일 단위 커밋)
+    use_manifest 면 이미 적재된 파일은 건너뛰고, 데이터와 매니페스트를 한 번에 커밋
+    파일 단위 커밋에서 데드락(1213)이 나면 파일 전체를 DEADLOCK_RETRIES 번까지 다시 적재
+    return: (path, 저장 행 수, 파싱 오류 수, skip 여부)
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        attempt = 1
+        while True:
+            try:
+                return _load_file_bulk(conn, cur, path, batch_size, commit_every, use_manifest)
+            except Exception as e:
+                conn.rollback()
+                file_txn = use_manifest or not commit_every  # 중간 커밋이 있으면 재실행 시 중복
+                if not (is_deadlock(e) and file_txn and attempt < DEADLOCK_RETRIES):
+                    raise
+                print(f"[WARN] {path} 적재 중 데드락, 파일 재시도 {attempt}/{DEADLOCK_RETRIES - 1}")
+                time.sleep(0.2 * attempt)
+                attempt += 1
+    finally:
+        cur.close()
+        conn.close()
+
+def _load_file_bulk(conn, cur, path, batch_size, commit_every, use_manifest):
+    stats = {"rows": 0, "errors": 0}
+    rollups = RollupBuffer()
+    info = None
+    if use_manifest:
+        info = check_file(cur, MANIFEST_LOADER, path, allow_changed=True)
+        if info is None or not unload_file(cur, path, info, rollups):
+            conn.commit()
+            return path, 0, 0, True
+        commit_every = 0  # 파일 단위 커밋이어야 재실행 시 중복이 없음
+
+    cur.execute("SELECT @@auto_increment_increment")
+    step = int(cur.fetchone()[0] or 1)
+
+    ranges = []
+    uncommitted = 0
+    with open_log(path) as f:
+        for cols, errors in iter_file_columns(f, batch_size):
+            stats["errors"] += errors
+            if cols is None:
+                continue
+            ranges.append(write_columns(cur, cols, rollups, step))
+            stats["rows"] += cols["count"]
+            uncommitted += cols["count"]
+            if commit_every and uncommitted >= commit_every:
+                rollups.flush(cur)
+                conn.commit()
+                invalidate("logs:CLOUD")
+                uncommitted = 0
+    rollups.flush(cur)
+    if info is not None:
+        record_file(cur, MANIFEST_LOADER, path, info, stats["rows"], ranges)
+    conn.commit()
+    if stats["rows"]:
+        invalidate("logs:CLOUD")
+    return path, stats["rows"], stats["errors"], False
+
+def list_log_files(log_dir):
+    files = []
+    for fname in sorted(os.listdir(log_dir)):
+        fpath = os.path.join(log_dir, fname)
+        if os.path.isfile(fpath) and (fname.endswith(".json") or fname.endswith(".gz")):
+            files.append(fpath)
+    return files
+
+def run_bulk(files, workers=1, batch_size=1000, commit_every=0, use_manifest=False):
+    total_rows, failed, skipped = 0, 0, 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(load_file_bulk, f, batch_size, commit_every, use_manifest): f
+            for f in files
+        }
+        for fut in as_completed(futures):
+            fpath = futures[fut]
+            try:
+                _, rows, errors, skip = fut.result()
+                if skip:
+                    skipped += 1
+                    continue
+                total_rows += rows
+                print(f"[OK] {fpath}: {rows} rows ({errors} parse errors)")
+            except Exception as e:
+                failed += 1
+                print(f"❌ {fpath} 적재 실패: {e}")
+    elapsed = time.perf_counter() - started
+    rate = total_rows / elapsed if elapsed else 0
+    print(f"[DONE] files={len(files)} skipped={skipped} failed={failed} rows={total_rows} "
+          f"elapsed={elapsed:.1f}s ({rate:,.0f} rows/sec, workers={workers})")
+    return total_rows
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 save_logs.py <log_directory>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="VPC Flow Log 디렉터리 적재")
+    parser.add_argument("log_dir")
+    parser.add_argument("--bulk", action="store_true",
+                        help="파일 단위 병렬 + multi-row INSERT 로더 사용")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("FLOWLOG_WORKERS", "4")))
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("FLOWLOG_BATCH_SIZE", "1000")))
+    parser.add_argument("--commit-every", type=int, default=int(os.getenv("FLOWLOG_COMMIT_EVERY", "0")),
+                        help="N 행마다 커밋 (0: 파일 단위 커밋, 매니페스트 사용 시 무시)")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="적재 완료 파일 매니페스트를 쓰지 않고 전체 파일을 다시 적재")
+    args = parser.parse_args()
+    use_manifest = not args.no_manifest
 
-    log_dir = sys.argv[1]
+    log_dir = args.log_dir
     if not os.path.isdir(log_dir):
         print(f"❌ Not a directory: {log_dir}")
         sys.exit(1)
@@ -104,12 +294,30 @@ def main():
     conn = get_connection()
     cur = conn.cursor()
     try:
-        for fname in os.listdir(log_dir):
-            fpath = os.path.join(log_dir, fname)
-            if os.path.isfile(fpath) and (fname.endswith(".json") or fname.endswith(".gz")):
-                print(f"Processing {fpath} ...")
-                process_file(fpath, cur)
-        conn.commit()
+        if use_manifest:
+            ensure_table(cur)
+            conn.commit()
+
+        if args.bulk:
+            run_bulk(list_log_files(log_dir), args.workers, args.batch_size,
+                     args.commit_every, use_manifest)
+            return
+
+        for fpath in list_log_files(log_dir):
+            rollups = RollupBuffer()  # 삭제분(-)과 재적재분(+)을 합쳐 파일당 한 번만 기록
+            info = check_file(cur, MANIFEST_LOADER, fpath, allow_changed=True) if use_manifest else None
+            if use_manifest and (info is None or not unload_file(cur, fpath, info, rollups)):
+                conn.commit()
+                continue
+            print(f"Processing {fpath} ...")
+            ids = []
+            rows = process_file(fpath, cur, ids, rollups)
+            rollups.flush(cur)
+            if info is not None:
+                record_file(cur, MANIFEST_LOADER, fpath, info, rows, id_ranges(ids))
+            conn.commit()
+            if rows:
+                invalidate("logs:CLOUD")
     finally:
         try: cur.close()
         except: pass
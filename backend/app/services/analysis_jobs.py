@@ -0,0 +1,234 @@
+"""
+AI 분석 비동기 작업 (analysis_jobs 테이블 + Celery)
+
+OpenAI 호출은 수십 초가 걸리므로 API 요청 안에서 하지 않는다.
+- submit(): 작업 행(PENDING)을 만들고 Celery 에 넘긴 뒤 바로 반환 → 라우트는 202 + job_id
+  같은 종류/파라미터(job_key)의 작업이 REUSE_SECONDS 안에 끝났거나 아직 진행 중이면 그 작업을 돌려줌
+- run_job(): Celery 워커(app/analysis_tasks.py)에서 실제 분석 실행, 결과 JSON 을 행에 저장
+- get_job() / get_result(): 상태/결과 조회 API 용
+
+PENDING/RUNNING 인 채로 STALE_SECONDS 가 지난 작업(워커 종료 등)은 재사용하지 않고 새로 만든다.
+job_key 는 UNIQUE 가 아니므로(같은 키의 이력이 쌓임) 재사용 조회 → INSERT 는 job_key 별 GET_LOCK 으로 직렬화한다.
+"""
+import os
+import json
+import uuid
+import hashlib
+import traceback
+
+from app.connector_db import get_connection
+from app.services import analysis_service
+
+REUSE_SECONDS = int(os.getenv("ANALYSIS_JOB_REUSE_SECONDS", "300"))
+STALE_SECONDS = int(os.getenv("ANALYSIS_JOB_STALE_SECONDS", "900"))
+SUBMIT_LOCK_TIMEOUT = int(os.getenv("ANALYSIS_JOB_LOCK_TIMEOUT", "5"))
+
+PENDING, RUNNING, SUCCESS, FAILURE = "PENDING", "RUNNING", "SUCCESS", "FAILURE"
+ACTIVE_STATES = (PENDING, RUNNING)
+
+
+class JobQueueError(Exception):
+    """Celery 브로커에 작업을 넣지 못함 (라우트에서 503)"""
+
+
+# ==============================
+# 작업 종류: kind → 결과 dict 를 만드는 함수
+# ==============================
+def _threats(range_type="daily", limit=100, log_type=None):
+    return {"threats": analysis_service.get_threat_logs_as_json(log_type=log_type, range_type=range_type, limit=limit)}
+
+
+def _traffic_report(range_type="daily", limit=100):
+    return {"report": analysis_service.get_traffic_analysis_report(range_type=range_type, limit=limit)}
+
+
+def _policy_report(policy_type, range_type="daily"):
+    return {"report": analysis_service.get_policy_analysis_report(policy_type=policy_type, range_type=range_type)}
+
+
+KINDS = {
+    "threats": _threats,
+    "traffic_report": _traffic_report,
+    "policy_report": _policy_report,
+}
+
+
+def run_inline(kind, params):
+    """큐를 거치지 않고 바로 실행 (sync=1)"""
+    return KINDS[kind](**params)
+
+
+def job_key(kind, params):
+    raw = json.dumps([kind, params], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _row_to_job(row):
+    job = {
+        "job_id": row["job_id"],
+        "kind": row["kind"],
+        "params": json.loads(row["params"]) if isinstance(row["params"], (str, bytes)) else row["params"],
+        "state": row["state"],
+        "error": row["error"],
+    }
+    for col in ("created_at", "started_at", "finished_at"):
+        job[col] = str(row[col]) if row[col] else None
+    return job
+
+
+# ==============================
+# 제출 / 조회
+# ==============================
+# migrate.py check-plans 가 같은 SQL 을 EXPLAIN
+REUSABLE_SQL = """
+    SELECT job_id, kind, params, state, error, created_at, started_at, finished_at
+    FROM analysis_jobs
+    WHERE job_key = %s
+      AND (
+            (state = 'SUCCESS' AND finished_at >= NOW() - INTERVAL %s SECOND)
+         OR (state IN ('PENDING', 'RUNNING') AND created_at >= NOW() - INTERVAL %s SECOND)
+      )
+    ORDER BY created_at DESC
+    LIMIT 1
+"""
+
+
+def _find_reusable(cur, key):
+    cur.execute(REUSABLE_SQL, (key, REUSE_SECONDS, STALE_SECONDS))
+    rows = cur.fetchall()
+    return _row_to_job(rows[0]) if rows else None
+
+
+def submit(kind, params):
+    """return: (job dict, reused 여부)"""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown analysis job kind: {kind}")
+    key = job_key(kind, params)
+
+    conn = get_connection()
+    cur = conn.cursor(dictionary=True)
+    lock_name = f"analysis_job:{key}"
+    locked = False
+    try:
+        # 같은 키를 동시에 제출해도 한 요청만 INSERT, 나머지는 그 작업을 재사용
+        cur.execute("SELECT GET_LOCK(%s, %s) AS locked", (lock_name, SUBMIT_LOCK_TIMEOUT))
+        locked = cur.fetchall()[0]["locked"] == 1
+        if not locked:
+            raise JobQueueError(f"같은 분석 작업 제출 잠금 대기 시간 초과 ({SUBMIT_LOCK_TIMEOUT}s)")
+        conn.commit()  # 잠금을 얻은 뒤의 스냅샷으로 조회 (앞 요청이 커밋한 작업이 보이도록)
+        job = _find_reusable(cur, key)
+        if job is not None:
+            return job, True
+        job_id = uuid.uuid4().hex
+        cur.execute(
+            "INSERT INTO analysis_jobs (job_id, job_key, kind, params, state) VALUES (%s, %s, %s, %s, %s)",
+            (job_id, key, kind, json.dumps(params, default=str), PENDING),
+        )
+        conn.commit()  # 잠금을 풀기 전에 커밋해야 다음 요청의 재사용 조회에 보임
+    finally:
+        if locked:
+            cur.execute("SELECT RELEASE_LOCK(%s)", (lock_name,))
+            cur.fetchall()
+        cur.close(); conn.close()
+
+    # 순환 import 방지 (analysis_tasks → analysis_jobs)
+    from app.analysis_tasks import run_analysis_job
+    try:
+        run_analysis_job.delay(job_id)
+    except Exception as e:
+        _finish(job_id, FAILURE, error=f"작업 큐 등록 실패: {e}")
+        raise JobQueueError(str(e)) from e
+    return get_job(job_id), False
+
+
+def get_job(job_id):
+    conn = get_connection()  # 방금 만든 작업을 복제 지연 없이 조회 (primary)
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            """
+            SELECT job_id, kind, params, state, error, created_at, started_at, finished_at
+            FROM analysis_jobs WHERE job_id = %s
+            """,
+            (job_id,),
+        )
+        rows = cur.fetchall()
+        return _row_to_job(rows[0]) if rows else None
+    finally:
+        cur.close(); conn.close()
+
+
+def get_result(job_id):
+    """return: (job dict, 결과 dict 또는 None), 작업이 없으면 (None, None)"""
+    conn = get_connection()
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            """
+            SELECT job_id, kind, params, state, result, error, created_at, started_at, finished_at
+            FROM analysis_jobs WHERE job_id = %s
+            """,
+            (job_id,),
+        )
+        rows = cur.fetchall()
+    finally:
+        cur.close(); conn.close()
+    if not rows:
+        return None, None
+    result = rows[0]["result"]
+    return _row_to_job(rows[0]), (json.loads(result) if result else None)
+
+
+# ==============================
+# 실행 (Celery 워커)
+# ==============================
+def _claim(job_id):
+    """PENDING → RUNNING. 다른 워커가 이미 가져갔거나 끝난 작업이면 False"""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "UPDATE analysis_jobs SET state = %s, started_at = NOW() WHERE job_id = %s AND state = %s",
+            (RUNNING, job_id, PENDING),
+        )
+        conn.commit()
+        return cur.rowcount == 1
+    finally:
+        cur.close(); conn.close()
+
+
+def _finish(job_id, state, result=None, error=None):
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "UPDATE analysis_jobs SET state = %s, result = %s, error = %s, finished_at = NOW() WHERE job_id = %s",
+            (state, json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+             error, job_id),
+        )
+        conn.commit()
+    finally:
+        cur.close(); conn.close()
+
+
+def run_job(job_id):
+    """return: 최종 상태 문자열"""
+    job = get_job(job_id)
+    if job is None:
+        print(f"[WARN] analysis job {job_id} 없음")
+        return None
+    if not _claim(job_id):
+        print(f"[WARN] analysis job {job_id} 이미 {job['state']}, 건너뜀")
+        return job["state"]
+
+    print(f"[..] analysis job {job_id} ({job['kind']}) 시작: {job['params']}")
+    try:
+        result = run_inline(job["kind"], job["params"])
+    except Exception as e:
+        traceback.print_exc()
+        _finish(job_id, FAILURE, error=str(e))
+        print(f"❌ analysis job {job_id} 실패: {e}")
+        return FAILURE
+    _finish(job_id, SUCCESS, result=result)
+    print(f"[OK] analysis job {job_id} 완료")
+    return SUCCESS
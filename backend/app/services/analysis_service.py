@@ -14,6 +14,9 @@ from log_anaylzer.prompt import build_log_analysis_prompt, build_threat_json_pro
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+class AnalysisError(Exception):
+    """OpenAI 호출 실패 (분석 작업은 FAILURE 로 기록되어 재사용되지 않음)"""
+
 def _analyze_logs_with_ai(prompt: str):
     try:
         response = client.chat.completions.create(
@@ -27,7 +30,7 @@ def _analyze_logs_with_ai(prompt: str):
     except Exception as e:
         print("--- OpenAI API 호출 오류 ---")
         traceback.print_exc()
-        return f"## 🤖 AI 분석 오류\n\nAPI 호출 중 문제가 발생했습니다: {e}"
+        raise AnalysisError(f"AI 분석 API 호출 중 문제가 발생했습니다: {e}") from e
 
 # =======================================================
 # 기능 1: 위협 로그만 JSON으로 추출
@@ -35,8 +38,9 @@ def _analyze_logs_with_ai(prompt: str):
 def get_threat_logs_as_json(log_type: str = None, range_type: str = "daily", limit: int = 100) -> list:
     """
     로그를 조회하여 AI로 위협 로그만 분석하고, 결과를 JSON(리스트)으로 반환합니다.
+    (최신 limit 건만 조회)
     """
-    logs = get_logs(range_type=range_type)
+    logs = get_logs(range_type=range_type, limit=limit)
 
     if not logs:
         return []
@@ -83,9 +87,8 @@ def get_threat_logs_as_json(log_type: str = None, range_type: str = "daily", lim
 # 기능 2: 트래픽 로그 상세 분석 보고서 생성
 # =======================================================
 def get_traffic_analysis_report(range_type: str = "daily", limit: int = 100) -> str:
-    # [수정] log_service.get_logs에는 range_type만 전달합니다.
-    # limit 파라미터는 여기서는 무시됩니다.
-    logs = get_logs(range_type=range_type)
+    # 최신 limit 건만 SQL 에서 잘라서 가져옴
+    logs = get_logs(range_type=range_type, limit=limit)
 
     if not logs:
         return "### 📝 분석 요약\n\n분석할 트래픽 로그 데이터가 없습니다."
@@ -82,35 +82,41 @@ def apply_rules(rules, default_policy=None, policy_name="unnamed"):
 # DB 스냅샷 기반: 현재(on-prem) 규칙 조회
 # ==============================
 
+# 조회 SQL (migrate.py check-plans 가 같은 SQL 을 EXPLAIN)
+LATEST_VERSION_SQL = """
+    SELECT pv.id AS version_id
+    FROM policy_versions pv
+    ORDER BY pv.created_at DESC, pv.id DESC
+    LIMIT 1
+"""
+LATEST_VERSION_BY_NAME_SQL = """
+    SELECT pv.id AS version_id
+    FROM policy_versions pv
+    JOIN policies p ON p.id = pv.policy_id
+    WHERE p.name = %s
+    ORDER BY pv.created_at DESC, pv.id DESC
+    LIMIT 1
+"""
+RULES_SQL = """
+    SELECT chain, proto, src, dst, dport, target, comment, state
+    FROM policy_rules
+    WHERE version_id = %s
+    ORDER BY priority ASC, id ASC
+"""
+
+
 def _get_latest_onprem_version(policy_name: Optional[str] = None) -> Optional[int]:
     """
     policies/policy_versions에서 '가장 최신 버전'의 version_id 반환.
     policy_name 주면 해당 정책 이름으로 한정.
     """
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cur = conn.cursor(dictionary=True)
     try:
         if policy_name:
-            cur.execute(
-                """
-                SELECT pv.id AS version_id
-                FROM policy_versions pv
-                JOIN policies p ON p.id = pv.policy_id
-                WHERE p.name = %s
-                ORDER BY pv.created_at DESC, pv.id DESC
-                LIMIT 1
-                """,
-                (policy_name,),
-            )
+            cur.execute(LATEST_VERSION_BY_NAME_SQL, (policy_name,))
         else:
-            cur.execute(
-                """
-                SELECT pv.id AS version_id
-                FROM policy_versions pv
-                ORDER BY pv.created_at DESC, pv.id DESC
-                LIMIT 1
-                """
-            )
+            cur.execute(LATEST_VERSION_SQL)
         row = cur.fetchone()
         return row["version_id"] if row else None
     finally:
@@ -145,6 +151,11 @@ def _map_rule_to_dashboard_format(r: Dict[str, Any]) -> Dict[str, Any]:
     return out
 
 
+def get_latest_version_id(policy_name: Optional[str] = None) -> Optional[int]:
+    """/api/policy/current ETag 용 최신 version_id (버전의 규칙 스냅샷은 바뀌지 않음)"""
+    return _get_latest_onprem_version(policy_name=policy_name)
+
+
 def fetch_rules(policy_name: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     /api/policy/current 에서 사용.
@@ -156,18 +167,10 @@ def fetch_rules(policy_name: Optional[str] = None) -> List[Dict[str, Any]]:
     if not version_id:
         return []
 
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cur = conn.cursor(dictionary=True)
     try:
-        cur.execute(
-            """
-            SELECT chain, proto, src, dst, dport, target, comment, state
-            FROM policy_rules
-            WHERE version_id = %s
-            ORDER BY priority ASC, id ASC
-            """,
-            (version_id,),
-        )
+        cur.execute(RULES_SQL, (version_id,))
         rows = cur.fetchall() or []
         return [_map_rule_to_dashboard_format(r) for r in rows]
     finally:
@@ -179,18 +182,10 @@ def fetch_rules_by_version(version_id: int) -> List[Dict[str, Any]]:
     """
     (선택) 특정 version_id로 직접 조회해야 할 때 사용.
     """
-    conn = get_connection()
+    conn = get_connection(readonly=True)
     cur = conn.cursor(dictionary=True)
     try:
-        cur.execute(
-            """
-            SELECT chain, proto, src, dst, dport, target, comment, state
-            FROM policy_rules
-            WHERE version_id = %s
-            ORDER BY priority ASC, id ASC
-            """,
-            (version_id,),
-        )
+        cur.execute(RULES_SQL, (version_id,))
         rows = cur.fetchall() or []
         return [_map_rule_to_dashboard_format(r) for r in rows]
     finally:
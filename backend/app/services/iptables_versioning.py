@@ -2,6 +2,7 @@ import os, json, hashlib, yaml, re
 from typing import Dict, Any, List, Tuple
 from datetime import datetime
 from app.connector_db import get_connection
+from app.response_cache import invalidate
 
 REQUIRED_RULE_FIELDS = ["chain", "target"]
 VALID_STATES = {"present", "absent"}
@@ -64,18 +65,30 @@ def _load_yaml(yaml_text: str) -> Dict[str, Any]:
         raise ValueError("rules 는 list 여야 합니다.")
     return data
 
+# 조회 SQL (migrate.py check-plans 가 같은 SQL 을 EXPLAIN)
+POLICY_ID_SQL = "SELECT id FROM policies WHERE name=%s"
+NEXT_VERSION_SQL = "SELECT COALESCE(MAX(version),0)+1 AS v FROM policy_versions WHERE policy_id=%s"
+
+def _create_or_get_policy_id(cur, name: str, scope: str, description: str = None) -> int:
+    cur.execute(POLICY_ID_SQL, (name,))
+    row = cur.fetchone()
+    if row:
+        return row["id"]
+    cur.execute("INSERT INTO policies (name, scope, description) VALUES (%s,%s,%s)",
+                (name, scope, description))
+    return cur.lastrowid
+
+def _get_next_version(cur, policy_id: int) -> int:
+    cur.execute(NEXT_VERSION_SQL, (policy_id,))
+    return cur.fetchone()["v"]
+
 def create_or_get_policy_id(name: str, scope: str = "onprem", description: str = None) -> int:
     conn = get_connection()
     cur = conn.cursor(dictionary=True)
     try:
-        cur.execute("SELECT id FROM policies WHERE name=%s", (name,))
-        row = cur.fetchone()
-        if row:
-            return row["id"]
-        cur.execute("INSERT INTO policies (name, scope, description) VALUES (%s,%s,%s)",
-                    (name, scope, description))
+        policy_id = _create_or_get_policy_id(cur, name, scope, description)
         conn.commit()
-        return cur.lastrowid
+        return policy_id
     finally:
         cur.close(); conn.close()
 
@@ -83,8 +96,7 @@ def get_next_version(policy_id: int) -> int:
     conn = get_connection()
     cur = conn.cursor(dictionary=True)
     try:
-        cur.execute("SELECT COALESCE(MAX(version),0)+1 AS v FROM policy_versions WHERE policy_id=%s", (policy_id,))
-        return cur.fetchone()["v"]
+        return _get_next_version(cur, policy_id)
     finally:
         cur.close(); conn.close()
 
@@ -120,18 +132,17 @@ def save_policy_version(yaml_text: str) -> Tuple[int, int]:
     # 체크섬(원본 기준)
     checksum = _sha256(yaml_text)
 
-    # DB 저장 트랜잭션
-    policy_id = create_or_get_policy_id(name=name, description=description)
-    version = get_next_version(policy_id)
-
+    # DB 저장 트랜잭션 (정책 조회/생성 → 버전 번호 → 버전/규칙 저장을 한 커넥션에서)
     conn = get_connection()
     cur = conn.cursor(dictionary=True)
     try:
+        policy_id = _create_or_get_policy_id(cur, name, "onprem", description)
+        version = _get_next_version(cur, policy_id)
+
         cur.execute("""
             INSERT INTO policy_versions (policy_id, version, author, message, source_yaml, checksum)
             VALUES (%s,%s,%s,%s,%s,%s)
         """, (policy_id, version, author, message, yaml_text, checksum))
-        conn.commit()
         version_id = cur.lastrowid
 
         # 규칙 저장
@@ -142,20 +153,23 @@ def save_policy_version(yaml_text: str) -> Tuple[int, int]:
         VALUES
         (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
         """
-        for nr in norm_rules:
-            cur.execute(ins_sql, (
+        cur.executemany(ins_sql, [
+            (
                 version_id, nr["rule_key"], nr["table"], nr["chain"], nr["priority"], nr["target"],
                 nr["proto"], nr["src"], nr["dst"], nr["sport"], nr["dport"],
                 nr["in_iface"], nr["out_iface"], nr["state_match"], nr["comment"],
                 nr["raw_match"], nr["state"]
-            ))
+            )
+            for nr in norm_rules
+        ])
         conn.commit()
+        invalidate("policy:version")
         return policy_id, version_id
     finally:
         cur.close(); conn.close()
 
-def _get_rules_by_version(version_id: int) -> List[Dict[str, Any]]:
-    conn = get_connection()
+def _get_rules_by_version(version_id: int, readonly: bool = False) -> List[Dict[str, Any]]:
+    conn = get_connection(readonly=readonly)
     cur = conn.cursor(dictionary=True)
     try:
         cur.execute("SELECT * FROM policy_rules WHERE version_id=%s ORDER BY priority ASC, id ASC", (version_id,))
@@ -163,16 +177,20 @@ def _get_rules_by_version(version_id: int) -> List[Dict[str, Any]]:
     finally:
         cur.close(); conn.close()
 
-def diff_versions(base_version_id: int, new_version_id: int) -> Dict[str, List[Dict[str, Any]]]:
+def diff_versions(base_version_id: int, new_version_id: int,
+                  read_your_writes: bool = False) -> Dict[str, List[Dict[str, Any]]]:
     """
     base 대비 new의 차이.
+    - 기본은 복제본에서 읽음. 방금 저장한 버전을 바로 비교할 때는 read_your_writes=True 로
+      primary 에서 읽어 복제 지연으로 규칙이 비어 보이는 것을 막음
     - present 규칙: 새로 추가된 키 → added
     - absent 규칙: new에 absent가 있으면 → removed(명시적 삭제)
     - 동일 키 존재하나 내용이 일부 바뀐 경우 → changed
     (단, 'YAML에 없음'은 삭제로 취급하지 않음)
     """
-    base = _get_rules_by_version(base_version_id)
-    new  = _get_rules_by_version(new_version_id)
+    readonly = not read_your_writes
+    base = _get_rules_by_version(base_version_id, readonly=readonly)
+    new  = _get_rules_by_version(new_version_id, readonly=readonly)
 
     base_map = {r["rule_key"]: r for r in base}
     new_map  = {r["rule_key"]: r for r in new}
@@ -207,8 +225,8 @@ def diff_versions(base_version_id: int, new_version_id: int) -> Dict[str, List[D
         "kept": kept
     }
 
-def get_version_header(version_id: int) -> Dict[str, Any]:
-    conn = get_connection()
+def get_version_header(version_id: int, readonly: bool = False) -> Dict[str, Any]:
+    conn = get_connection(readonly=readonly)
     cur = conn.cursor(dictionary=True)
     try:
         cur.execute("""
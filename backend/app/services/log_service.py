@@ -3,6 +3,7 @@
 from datetime import datetime
 import json
 from app.connector_db import get_connection
+from app.services.pagination import clamp_limit, encode_cursor, decode_cursor, parse_ts
 import json
 
 def normalize_log(row):
@@ -47,34 +48,405 @@ def normalize_log(row):
         return raw
 
 
-def get_logs(range_type="hour"):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+# 조회 범위 → 시작 시각 SQL
+RANGE_FILTERS = {
+    "10min": "NOW() - INTERVAL 10 MINUTE",
+    "hour": "NOW() - INTERVAL 1 HOUR",
+    "daily": "NOW() - INTERVAL 1 DAY",
+    "weekly": "NOW() - INTERVAL 7 DAY",
+    "monthly": "NOW() - INTERVAL 1 MONTH",
+}
 
-    if range_type == "daily":
-        date_filter = "NOW() - INTERVAL 1 DAY"
-    elif range_type == "weekly":
-        date_filter = "NOW() - INTERVAL 7 DAY"
-    elif range_type == "monthly":
-        date_filter = "NOW() - INTERVAL 1 MONTH"
-    elif range_type == "hour":
-        date_filter = "NOW() - INTERVAL 1 HOUR"
-    elif range_type == "10min":
-        date_filter = "NOW() - INTERVAL 10 MINUTE"
-    else:
+def range_filter(range_type):
+    if range_type not in RANGE_FILTERS:
         raise ValueError("Invalid range type")
+    return RANGE_FILTERS[range_type]
+
+
+# ==============================
+# 필드 필터 (log_onprem / log_cloud 타입 컬럼)
+# ==============================
+LOG_FILTERS = ("srcip", "dstip", "srcport", "dstport", "protocol", "action", "log_type")
+LOG_TYPES = ("ONPREM", "CLOUD")
+
+# 필터 이름 → 타입 테이블 컬럼
+FILTER_COLUMNS = {
+    "srcip": "source_ip",
+    "dstip": "destination_ip",
+    "srcport": "source_port",
+    "dstport": "destination_port",
+}
+
+# flow log 는 프로토콜 번호, iptables 는 이름으로 저장됨 (rollup.PROTOCOL_NAMES 와 같은 번호)
+PROTOCOL_NUMBERS = {"ICMP": "1", "TCP": "6", "UDP": "17", "GRE": "47", "ESP": "50", "ICMPV6": "58"}
+
+def protocol_values(value):
+    """'tcp' / 'TCP' / '6' → ['TCP', '6'] (두 표기 모두 매칭)"""
+    value = str(value).strip().upper()
+    for name, number in PROTOCOL_NUMBERS.items():
+        if value in (name, number):
+            return [name, number]
+    return [value]
+
+def clean_filters(filters):
+    """빈 값 제거 + 타입 검증 (잘못된 값은 ValueError)"""
+    cleaned = {}
+    for name, value in (filters or {}).items():
+        if name not in LOG_FILTERS:
+            raise ValueError(f"Unknown filter: {name}")
+        if value is None or str(value).strip() == "":
+            continue
+        value = str(value).strip()
+        if name in ("srcport", "dstport"):
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f"Invalid {name}: {value}")
+        elif name in ("log_type", "action"):
+            value = value.upper()
+            if name == "log_type" and value not in LOG_TYPES:
+                raise ValueError("Invalid log_type. Use 'ONPREM' or 'CLOUD'.")
+        cleaned[name] = value
+    # action 은 flow log(log_cloud)에만 있음
+    if "action" in cleaned and cleaned.get("log_type") == "ONPREM":
+        raise ValueError("action filter is only available for CLOUD logs")
+    return cleaned
+
+def _log_aliases(filters):
+    """조인할 타입 테이블 별칭 목록과 JOIN 종류 (log_type 이 정해지면 그 테이블만 INNER JOIN)"""
+    log_type = filters.get("log_type")
+    if "action" in filters:
+        log_type = "CLOUD"
+    if log_type:
+        return ["o"] if log_type == "ONPREM" else ["cl"], "JOIN"
+    return ["o", "cl"], "LEFT JOIN"
+
+def _typed(aliases, column):
+    exprs = [f"{a}.{column}" for a in aliases]
+    return exprs[0] if len(exprs) == 1 else f"COALESCE({', '.join(exprs)})"
+
+def _log_sql(filters, include_raw=False):
+    """
+    return: (SELECT 컬럼, JOIN 절, WHERE 조건 목록, 파라미터)
+    정규화 필드는 log_onprem(o) / log_cloud(cl) 타입 컬럼에서 바로 읽는다.
+    raw_log 는 include_raw 이거나 타입 테이블이 없는 log_type 일 때만 읽는다.
+    """
+    aliases, kind = _log_aliases(filters)
+    joins = []
+    # 타입 테이블은 시각 컬럼으로 일자 파티셔닝 → 적재 시 log_common.timestamp 와 같은 값을 쓰므로
+    # 시각까지 조인해야 log_common 행마다 모든 파티션을 뒤지지 않고 한 파티션만 읽는다
+    if "o" in aliases:
+        joins.append(f"{kind} log_onprem o ON o.log_id = c.log_id AND o.timestamp = c.timestamp")
+    if "cl" in aliases:
+        joins.append(f"{kind} log_cloud cl ON cl.log_id = c.log_id AND cl.start_time = c.timestamp")
+
+    columns = ["c.log_id", "c.log_type", "c.timestamp"]
+    columns += [f"{_typed(aliases, column)} AS {name}" for name, column in FILTER_COLUMNS.items()]
+    columns.append(f"{_typed(aliases, 'protocol')} AS protocol")
+    columns.append("cl.action AS action" if "cl" in aliases else "NULL AS action")
+    if include_raw:
+        columns.append("c.raw_log")
+    else:
+        types = ",".join(f"'{t}'" for t in LOG_TYPES)
+        columns.append(f"CASE WHEN c.log_type IN ({types}) THEN NULL ELSE c.raw_log END AS raw_log")
+
+    where, params = [], []
+    if filters.get("log_type"):
+        where.append("c.log_type = %s")
+        params.append(filters["log_type"])
+
+    def any_of(column, values):
+        holders = ",".join(["%s"] * len(values))
+        conds = [f"{a}.{column} IN ({holders})" for a in aliases]
+        params.extend(list(values) * len(aliases))
+        return conds[0] if len(conds) == 1 else "(" + " OR ".join(conds) + ")"
+
+    for name, column in FILTER_COLUMNS.items():
+        if name in filters:
+            where.append(any_of(column, [filters[name]]))
+    if "protocol" in filters:
+        where.append(any_of("protocol", protocol_values(filters["protocol"])))
+    if "action" in filters:
+        where.append("cl.action = %s")
+        params.append(filters["action"])
+    return ", ".join(columns), "\n".join(joins), where, params
 
+
+def _decode_raw(raw_log):
+    try:
+        return json.loads(raw_log) if raw_log else {}
+    except Exception:
+        return {"error": "invalid_json", "raw": raw_log}
+
+def _port_text(port, log_type):
+    """타입 테이블의 정수 포트 → normalize_log 와 같은 원본 JSON 문자열 (flow log 는 포트가 없으면 "-")"""
+    if port is not None:
+        return str(port)
+    return "-" if log_type == "CLOUD" else None
+
+def typed_log(row, include_raw=False):
+    """_log_sql 결과 행 → normalize_log 와 같은 모양 (raw_log 는 include_raw 일 때만 파싱)"""
+    log_type = row["log_type"].upper()
+    if log_type not in LOG_TYPES:
+        return normalize_log(row)  # 타입 테이블이 없는 로그는 원본 JSON 그대로
+    log = {
+        "id": row["log_id"],
+        "timestamp": row["timestamp"].isoformat() if row["timestamp"] else None,
+        "log_type": log_type,
+        "srcip": row["srcip"],
+        "dstip": row["dstip"],
+        "srcport": _port_text(row["srcport"], log_type),
+        "dstport": _port_text(row["dstport"], log_type),
+        "protocol": row["protocol"],
+        "action": row["action"],
+    }
+    if include_raw:
+        log["raw_log"] = _decode_raw(row["raw_log"])
+    return log
+
+
+# ==============================
+# 키셋 페이지네이션 (log_id 내림차순)
+# ==============================
+LOGS_CURSOR = "logs"
+
+def time_window(range_type, start_ts=None, end_ts=None, before_ts=None):
+    """
+    조회 구간 결정. start_ts 를 주면 range_type 대신 사용.
+    return: (구간 시작 SQL 또는 None, 시작 datetime 또는 None, 상한 datetime 또는 None)
+    end_ts(미포함)와 before_ts 가 둘 다 있으면 더 이른 쪽이 상한.
+    """
+    start_ts, end_ts, before_ts = parse_ts(start_ts), parse_ts(end_ts), parse_ts(before_ts)
+    upper = min([t for t in (end_ts, before_ts) if t is not None], default=None)
+    if start_ts is not None and end_ts is not None and start_ts >= end_ts:
+        raise ValueError("'from' must be earlier than 'to'")
+    date_filter = None if start_ts is not None else range_filter(range_type)
+    return date_filter, start_ts, upper
+
+def log_query(since, after_id=None, before_ts=None, filters=None, include_raw=False, limit=None):
+    """
+    log_common(c) + 타입 테이블 조회 SQL (log_id 내림차순)과 파라미터.
+    limit 이 없으면 LIMIT 없이 (스트리밍). migrate.py check-plans 도 이 SQL 을 EXPLAIN 한다.
+    """
+    # timestamp 를 함수로 감싸지 않아야 일자 파티션(TO_DAYS) pruning 이 적용됨
+    where, params = ["c.timestamp >= %s"], [since]
+    if after_id is not None:
+        where.append("c.log_id < %s")
+        params.append(int(after_id))
+    if before_ts is not None:
+        where.append("c.timestamp < %s")
+        params.append(before_ts)
+    columns, joins, fwhere, fparams = _log_sql(filters or {}, include_raw)
     sql = f"""
-        SELECT log_id, log_type, raw_log, timestamp
+        SELECT {columns}
+        FROM log_common c
+        {joins}
+        WHERE {" AND ".join(where + fwhere)}
+        ORDER BY c.log_id DESC
+    """
+    params += fparams
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    return sql, params
+
+def _page_window(range_type, after_id, before_ts, cursor, start_ts, end_ts):
+    """cursor 가 있으면 그 값으로 → (after_id, 구간 시작 SQL, 시작 datetime, 상한 datetime)"""
+    if cursor:
+        c = decode_cursor(cursor, LOGS_CURSOR)
+        after_id, start_ts, before_ts, end_ts = c.get("id"), c.get("since"), c.get("before"), None
+    date_filter, since, before_ts = time_window(range_type, start_ts, end_ts, before_ts)
+    return after_id, date_filter, since, before_ts
+
+def log_version_query(since, after_id=None, before_ts=None, log_type=None):
+    """구간의 (최신 log_id, 건수) SQL. log_common (timestamp, log_id) 인덱스만 읽는다"""
+    where, params = ["timestamp >= %s"], [since]
+    if after_id is not None:
+        where.append("log_id < %s")
+        params.append(int(after_id))
+    if before_ts is not None:
+        where.append("timestamp < %s")
+        params.append(before_ts)
+    if log_type:
+        where.append("log_type = %s")
+        params.append(log_type)
+    return f"""
+        SELECT MAX(log_id) AS latest, COUNT(*) AS total
         FROM log_common
-        WHERE timestamp >= {date_filter}
-        ORDER BY log_id DESC
+        WHERE {" AND ".join(where)}
+    """, params
+
+def logs_version(range_type="hour", after_id=None, before_ts=None, cursor=None,
+                 start_ts=None, end_ts=None, filters=None):
+    """
+    ETag 용 (구간 최신 log_id, 구간 건수). get_logs_page 쿼리 전에 304 판단에 쓴다.
+    로그는 추가/삭제만 되므로 새 행이 들어오면 최신 id 가, 빠지면 건수가 바뀐다.
+    필드 필터는 적용하지 않음 (log_type 만) → 필터 결과가 바뀌면 이 값도 반드시 바뀐다.
     """
+    filters = clean_filters(filters)
+    log_type = "CLOUD" if "action" in filters else filters.get("log_type")
+    after_id, date_filter, since, before_ts = _page_window(range_type, after_id, before_ts, cursor,
+                                                           start_ts, end_ts)
+
+    conn = get_connection(readonly=True)
+    cur = conn.cursor(dictionary=True)
+    try:
+        if since is None:
+            cur.execute(f"SELECT {date_filter} AS since")
+            since = cur.fetchall()[0]["since"]
+        cur.execute(*log_version_query(since, after_id, before_ts, log_type))
+        row = cur.fetchall()[0]
+    finally:
+        cur.close()
+        conn.close()
+    return row["latest"] or 0, row["total"]
+
+def get_logs_page(range_type="hour", limit=None, after_id=None, before_ts=None, cursor=None,
+                  start_ts=None, end_ts=None, filters=None, include_raw=False):
+    """
+    최신순 한 페이지. 다음 페이지는 반환된 next_cursor 로 요청 (마지막 페이지면 None)
+    - after_id: 이 log_id 보다 오래된(작은) 로그부터
+    - before_ts: 이 시각 이전 로그만
+    - start_ts / end_ts: 명시적 구간 [start_ts, end_ts) (start_ts 가 있으면 range_type 무시)
+    - filters: LOG_FILTERS 키의 dict (다음 페이지 요청에도 같은 값을 넘겨야 함)
+    - include_raw: 각 로그에 원본 JSON(raw_log)을 파싱해 포함
+    - cursor: 이전 응답의 next_cursor (after_id/before_ts/구간 시작을 모두 담고 있음)
+    """
+    filters = clean_filters(filters)
+    limit = clamp_limit(limit)
+    after_id, date_filter, since, before_ts = _page_window(range_type, after_id, before_ts, cursor,
+                                                           start_ts, end_ts)
+
+    conn = get_connection(readonly=True)
+    cur = conn.cursor(dictionary=True)
+    try:
+        if since is None:
+            # 구간 시작을 첫 페이지에서 고정 → 페이지를 넘기는 동안 NOW() 가 움직여도 같은 구간
+            cur.execute(f"SELECT {date_filter} AS since")
+            since = cur.fetchall()[0]["since"]  # unbuffered 커서: 결과를 끝까지 읽어야 다음 execute 가능
 
-    cursor.execute(sql)
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
+        sql, params = log_query(since, after_id, before_ts, filters, include_raw, limit=limit + 1)
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+        conn.close()
 
-    return [normalize_log(row) for row in rows]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(LOGS_CURSOR, id=rows[-1]["log_id"], since=since, before=before_ts)
+    return [typed_log(row, include_raw) for row in rows], next_cursor
+
+
+def iter_logs(range_type="hour", page_size=None, **filters):
+    """모든 페이지를 차례로 읽으며 로그를 하나씩 yield (한 번에 한 페이지만 메모리에 유지)"""
+    cursor = None
+    while True:
+        rows, cursor = get_logs_page(range_type, limit=page_size, cursor=cursor, **filters)
+        yield from rows
+        if not cursor:
+            return
+
+
+# ==============================
+# 스트리밍 조회 (unbuffered 커서 → 제너레이터)
+# ==============================
+STREAM_FETCH_SIZE = 500
+
+def stream_logs(range_type="hour", after_id=None, before_ts=None, start_ts=None, end_ts=None, filters=None,
+                include_raw=False):
+    """
+    구간 전체를 최신순으로 한 건씩 yield.
+    unbuffered 커서에서 STREAM_FETCH_SIZE 건씩 꺼내 정규화하므로 결과 크기와 무관하게 메모리 일정.
+    끝까지 읽기 전에 멈추면(클라이언트 끊김 등) 남은 결과를 읽지 않고 커넥션을 버린다.
+    """
+    filters = clean_filters(filters)
+    date_filter, since, before_ts = time_window(range_type, start_ts, end_ts, before_ts)
+
+    conn = get_connection(readonly=True)
+    cur = conn.cursor(dictionary=True)  # buffered=False (기본): 서버에서 행을 읽는 만큼만 받아옴
+    finished = False
+    try:
+        if since is None:
+            cur.execute(f"SELECT {date_filter} AS since")
+            since = cur.fetchall()[0]["since"]
+        sql, params = log_query(since, after_id, before_ts, filters, include_raw)
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(STREAM_FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield typed_log(row, include_raw)
+        finished = True
+    finally:
+        close_stream(conn, cur, finished)
+
+
+def close_stream(conn, cur, finished):
+    if not finished:
+        conn.discard()
+        return
+    try:
+        cur.close()
+    finally:
+        conn.close()
+
+
+def get_logs(range_type="hour", limit=None):
+    """limit 을 주면 최신 limit 건, 없으면 구간 전체"""
+    if limit:
+        rows, _ = get_logs_page(range_type, limit=limit)
+        return rows
+    return list(iter_logs(range_type))
+
+
+# ==============================
+# 트래픽 롤업 조회 (traffic_rollup_minute / traffic_rollup_hour)
+# ==============================
+ROLLUP_TABLES = {"minute": "traffic_rollup_minute", "hour": "traffic_rollup_hour"}
+# 범위별 기본 집계 단위 (차트 점 개수 기준)
+DEFAULT_GRANULARITY = {"10min": "minute", "hour": "minute", "daily": "hour", "weekly": "hour", "monthly": "hour"}
+
+def traffic_rollup_query(range_type="daily", granularity=None, log_type=None):
+    """get_traffic_rollup 의 SQL 과 파라미터"""
+    date_filter = range_filter(range_type)
+    granularity = granularity or DEFAULT_GRANULARITY[range_type]
+    if granularity not in ROLLUP_TABLES:
+        raise ValueError("Invalid granularity (minute, hour)")
+
+    # 시간 롤업은 시간 시작 시각 기준이므로 구간 시작이 속한 버킷부터 포함
+    bucket_floor = "%Y-%m-%d %H:%i:00" if granularity == "minute" else "%Y-%m-%d %H:00:00"
+    sql = f"""
+        SELECT bucket, log_type, source_ip, destination_ip, destination_port, protocol, action,
+               flows, packets, bytes
+        FROM {ROLLUP_TABLES[granularity]}
+        WHERE bucket >= DATE_FORMAT({date_filter}, %s)
+    """
+    params = [bucket_floor]
+    if log_type:
+        sql += " AND log_type = %s"
+        params.append(log_type.upper())
+    sql += " ORDER BY bucket ASC"
+    return sql, params
+
+def get_traffic_rollup(range_type="daily", granularity=None, log_type=None):
+    """
+    (bucket, log_type, src, dst, dport, protocol, action) 별 flows/packets/bytes.
+    원본 로그 대신 적재 시 누적한 롤업 테이블을 읽는다.
+    """
+    sql, params = traffic_rollup_query(range_type, granularity, log_type)
+
+    conn = get_connection(readonly=True)
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
 
+    for row in rows:
+        row["bucket"] = row["bucket"].isoformat()
+    return rows
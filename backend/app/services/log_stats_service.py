@@ -0,0 +1,211 @@
+"""
+대시보드 통계 집계 (/api/logs/stats/*)
+
+원본 로그를 내려받아 브라우저에서 세던 상위 IP/포트, 허용·차단 비율, 분당 트래픽을
+트래픽 롤업 테이블(traffic_rollup_minute / traffic_rollup_hour)에서 SQL 로 집계해 수 KB 로 돌려준다.
+롤업 PK 가 bucket 으로 시작하므로 어떤 구간이든 bucket 범위 스캔 + GROUP BY 한 번이다.
+"""
+from datetime import datetime, timedelta
+
+from app.connector_db import get_connection
+from app.services.log_service import ROLLUP_TABLES, DEFAULT_GRANULARITY, time_window
+
+METRICS = ("flows", "packets", "bytes")
+STATS_LOG_TYPES = ("ONPREM", "CLOUD", "CLOUDTRAIL")
+TRAFFIC_LOG_TYPES = ("ONPREM", "CLOUD")  # log_type 미지정 시 (CLOUDTRAIL 은 API 호출이라 트래픽 통계에서 제외)
+DEFAULT_TOP = 10
+MAX_TOP = 100
+# from/to 구간이 이보다 짧으면 분 단위 롤업, 길면 시간 단위 롤업
+MINUTE_WINDOW = timedelta(hours=6)
+
+
+def _floor(dt, granularity):
+    dt = dt.replace(second=0, microsecond=0)
+    return dt.replace(minute=0) if granularity == "hour" else dt
+
+
+def _window(cur, range_type, start_ts, end_ts, granularity):
+    """return: (시작 bucket, 상한 bucket 또는 None, granularity)"""
+    date_filter, since, until = time_window(range_type, start_ts, end_ts)
+    if since is None:
+        cur.execute(f"SELECT {date_filter} AS since")
+        since = cur.fetchall()[0]["since"]
+    if not granularity:
+        if date_filter:
+            granularity = DEFAULT_GRANULARITY[range_type]
+        else:
+            granularity = "minute" if (until or datetime.now()) - since <= MINUTE_WINDOW else "hour"
+    if granularity not in ROLLUP_TABLES:
+        raise ValueError("Invalid granularity (minute, hour)")
+    # 시간 롤업은 시간 시작 시각 기준 → 구간 양 끝이 걸친 시간 버킷을 포함
+    if until is not None and _floor(until, granularity) != until:
+        until = _floor(until, granularity) + (timedelta(hours=1) if granularity == "hour" else timedelta(minutes=1))
+    return _floor(since, granularity), until, granularity
+
+
+def stats_where(since, until=None, log_type=None):
+    """롤업 bucket 구간 + log_type 조건 (migrate.py check-plans 도 사용)"""
+    where, params = ["bucket >= %s"], [since]
+    if until is not None:
+        where.append("bucket < %s")
+        params.append(until)
+    if log_type:
+        log_type = log_type.upper()
+        if log_type not in STATS_LOG_TYPES:
+            raise ValueError("Invalid log_type (ONPREM, CLOUD, CLOUDTRAIL)")
+        where.append("log_type = %s")
+        params.append(log_type)
+    else:
+        where.append("log_type IN (%s, %s)")
+        params.extend(TRAFFIC_LOG_TYPES)
+    return " AND ".join(where), params
+
+
+def _top_args(metric, limit):
+    if metric not in METRICS:
+        raise ValueError("Invalid metric (flows, packets, bytes)")
+    limit = limit or DEFAULT_TOP
+    if limit < 1:
+        raise ValueError("limit 은 1 이상이어야 합니다.")
+    return metric, min(limit, MAX_TOP)
+
+
+def _run(query, range_type, start_ts, end_ts, granularity, log_type):
+    """query(cur, table, where, params) 결과와 구간 정보를 함께 반환"""
+    conn = get_connection(readonly=True)
+    cur = conn.cursor(dictionary=True)
+    try:
+        since, until, granularity = _window(cur, range_type, start_ts, end_ts, granularity)
+        where, params = stats_where(since, until, log_type)
+        data = query(cur, ROLLUP_TABLES[granularity], where, params)
+    finally:
+        cur.close()
+        conn.close()
+    window = {
+        "from": since.isoformat(),
+        "to": until.isoformat() if until else None,
+        "granularity": granularity,
+    }
+    return data, window
+
+
+# ==============================
+# 개별 통계 SQL: (sql, params)
+# ==============================
+def top_talkers_query(table, where, params, metric=METRICS[0], limit=DEFAULT_TOP):
+    return f"""
+        SELECT source_ip, SUM(flows) AS flows, SUM(packets) AS packets, SUM(bytes) AS bytes
+        FROM {table}
+        WHERE {where} AND source_ip <> ''
+        GROUP BY source_ip
+        ORDER BY {metric} DESC
+        LIMIT %s
+    """, params + [limit]
+
+
+def top_ports_query(table, where, params, metric=METRICS[0], limit=DEFAULT_TOP):
+    return f"""
+        SELECT destination_port, protocol, SUM(flows) AS flows, SUM(packets) AS packets, SUM(bytes) AS bytes
+        FROM {table}
+        WHERE {where} AND destination_port <> 0
+        GROUP BY destination_port, protocol
+        ORDER BY {metric} DESC
+        LIMIT %s
+    """, params + [limit]
+
+
+def actions_query(table, where, params):
+    return f"""
+        SELECT action, SUM(flows) AS flows, SUM(bytes) AS bytes
+        FROM {table}
+        WHERE {where}
+        GROUP BY action
+    """, params
+
+
+def timeline_query(table, where, params):
+    return f"""
+        SELECT bucket,
+               SUM(flows) AS flows, SUM(packets) AS packets, SUM(bytes) AS bytes,
+               SUM(CASE WHEN action = 'ACCEPT' THEN flows ELSE 0 END) AS accept,
+               SUM(CASE WHEN action = 'REJECT' THEN flows ELSE 0 END) AS reject
+        FROM {table}
+        WHERE {where}
+        GROUP BY bucket
+        ORDER BY bucket ASC
+    """, params
+
+
+# ==============================
+# 개별 통계
+# ==============================
+def _top_talkers(cur, table, where, params, metric=METRICS[0], limit=DEFAULT_TOP):
+    cur.execute(*top_talkers_query(table, where, params, metric, limit))
+    return [{"srcip": r["source_ip"], "flows": int(r["flows"]), "packets": int(r["packets"]),
+             "bytes": int(r["bytes"])} for r in cur.fetchall()]
+
+
+def _top_ports(cur, table, where, params, metric=METRICS[0], limit=DEFAULT_TOP):
+    cur.execute(*top_ports_query(table, where, params, metric, limit))
+    return [{"dstport": r["destination_port"], "protocol": r["protocol"], "flows": int(r["flows"]),
+             "packets": int(r["packets"]), "bytes": int(r["bytes"])} for r in cur.fetchall()]
+
+
+def _actions(cur, table, where, params):
+    cur.execute(*actions_query(table, where, params))
+    counts = {(r["action"] or "UNKNOWN"): {"flows": int(r["flows"]), "bytes": int(r["bytes"])}
+              for r in cur.fetchall()}
+    accept = counts.get("ACCEPT", {}).get("flows", 0)
+    reject = counts.get("REJECT", {}).get("flows", 0)
+    return {
+        "actions": counts,
+        # iptables 로그에는 action 이 없어(UNKNOWN) 비율은 ACCEPT/REJECT 가 있는 flow log 기준
+        "accept_ratio": round(accept / (accept + reject), 4) if accept + reject else None,
+    }
+
+
+def _timeline(cur, table, where, params):
+    cur.execute(*timeline_query(table, where, params))
+    return [{"bucket": r["bucket"].isoformat(), "flows": int(r["flows"]), "packets": int(r["packets"]),
+             "bytes": int(r["bytes"]), "accept": int(r["accept"]), "reject": int(r["reject"])}
+            for r in cur.fetchall()]
+
+
+# ==============================
+# 외부 호출용
+# ==============================
+def top_talkers(range_type="daily", start_ts=None, end_ts=None, granularity=None, log_type=None,
+                metric="flows", limit=None):
+    metric, limit = _top_args(metric, limit)
+    return _run(lambda *a: _top_talkers(*a, metric=metric, limit=limit),
+                range_type, start_ts, end_ts, granularity, log_type)
+
+
+def top_ports(range_type="daily", start_ts=None, end_ts=None, granularity=None, log_type=None,
+              metric="flows", limit=None):
+    metric, limit = _top_args(metric, limit)
+    return _run(lambda *a: _top_ports(*a, metric=metric, limit=limit),
+                range_type, start_ts, end_ts, granularity, log_type)
+
+
+def action_ratio(range_type="daily", start_ts=None, end_ts=None, granularity=None, log_type=None):
+    return _run(_actions, range_type, start_ts, end_ts, granularity, log_type)
+
+
+def timeline(range_type="daily", start_ts=None, end_ts=None, granularity=None, log_type=None):
+    return _run(_timeline, range_type, start_ts, end_ts, granularity, log_type)
+
+
+def summary(range_type="daily", start_ts=None, end_ts=None, granularity=None, log_type=None,
+            metric="flows", limit=None):
+    """대시보드 첫 화면용: 네 가지 통계를 한 커넥션/한 구간으로"""
+    metric, limit = _top_args(metric, limit)
+
+    def query(cur, table, where, params):
+        return {
+            "top_talkers": _top_talkers(cur, table, where, params, metric, limit),
+            "top_ports": _top_ports(cur, table, where, params, metric, limit),
+            **_actions(cur, table, where, params),
+            "timeline": _timeline(cur, table, where, params),
+        }
+    return _run(query, range_type, start_ts, end_ts, granularity, log_type)
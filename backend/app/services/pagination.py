@@ -0,0 +1,55 @@
+"""
+키셋(커서) 페이지네이션 공용 헬퍼
+
+OFFSET 대신 마지막 행의 정렬 키를 WHERE 조건으로 넘겨 다음 페이지를 읽는다.
+클라이언트에는 정렬 키를 base64 로 감싼 불투명(opaque) 커서만 전달한다.
+"""
+import os
+import json
+import base64
+from datetime import datetime, timezone, timedelta
+
+DEFAULT_LIMIT = int(os.getenv("API_PAGE_DEFAULT_LIMIT", "1000"))
+MAX_LIMIT = int(os.getenv("API_PAGE_MAX_LIMIT", "10000"))
+kst = timezone(timedelta(hours=9))
+
+
+def clamp_limit(limit):
+    """None/0 이면 기본값, 상한 초과 시 상한으로"""
+    if not limit:
+        return DEFAULT_LIMIT
+    if limit < 0:
+        raise ValueError("limit 은 0 이상이어야 합니다.")
+    return min(limit, MAX_LIMIT)
+
+
+def encode_cursor(kind, **keys):
+    payload = {"k": kind}
+    for name, value in keys.items():
+        payload[name] = value.isoformat() if isinstance(value, datetime) else value
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, kind):
+    """커서 문자열 → dict. 형식이 깨졌거나 다른 API 의 커서면 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict) or payload.get("k") != kind:
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def parse_ts(value):
+    """before_ts / 커서의 시각 문자열 → datetime (ISO 8601)"""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value}")
+    # DB 의 DATETIME 은 naive KST (서버 타임존과 무관)
+    return dt.astimezone(kst).replace(tzinfo=None) if dt.tzinfo else dt
@@ -1,106 +1,176 @@
 from datetime import datetime
 import json
 from app.connector_db import get_connection
-import json
+from app.services.log_service import range_filter, close_stream, STREAM_FETCH_SIZE
+from app.services.pagination import clamp_limit, encode_cursor, decode_cursor, parse_ts
 
 
-from app.connector_db import get_connection
+# 정책 타입 → (이력 테이블, 반환 컬럼)
+POLICY_TABLES = {
+    "cloud": ("policy_history_c", "raw_event"),
+    "onprem": ("policy_history_o", "message"),
+}
+
+# ==============================
+# 키셋 페이지네이션 (timestamp, history_id 내림차순)
+# ==============================
+def _policy_table(policy_type):
+    if policy_type not in POLICY_TABLES:
+        raise ValueError("Invalid type. Use 'cloud' or 'onprem'.")
+    return POLICY_TABLES[policy_type]
+
+
+def _policy_where(since, after_id=None, before_ts=None):
+    where, params = ["timestamp >= %s"], [since]
+    if before_ts is not None and after_id is not None:
+        where.append("(timestamp < %s OR (timestamp = %s AND history_id < %s))")
+        params += [before_ts, before_ts, int(after_id)]
+    elif before_ts is not None:
+        where.append("timestamp < %s")
+        params.append(before_ts)
+    elif after_id is not None:
+        where.append("history_id < %s")
+        params.append(int(after_id))
+    return " AND ".join(where), params
+
+
+def policy_query(policy_type, since, after_id=None, before_ts=None, limit=None, with_key=True):
+    """
+    이력 조회 SQL 과 파라미터 (get_policy_page / stream_policy, migrate.py check-plans 공용).
+    with_key: 키셋 커서용 history_id, timestamp 도 함께 SELECT
+    """
+    table, column = _policy_table(policy_type)
+    where, params = _policy_where(since, after_id, before_ts)
+    columns = f"history_id, timestamp, {column}" if with_key else column
+    sql = f"""
+        SELECT {columns}
+        FROM {table}
+        WHERE {where}
+        ORDER BY timestamp DESC, history_id DESC
+    """
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    return sql, params
+
+
+def policy_version_query(policy_type, since):
+    """구간의 (최신 history_id, 건수) SQL. timestamp 인덱스만 읽는다"""
+    table, _ = _policy_table(policy_type)
+    return f"""
+        SELECT MAX(history_id) AS latest, COUNT(*) AS total
+        FROM {table}
+        WHERE timestamp >= %s
+    """, [since]
+
+
+def policy_version(policy_type, range_type, cursor=None):
+    """
+    ETag 용 (구간 최신 history_id, 구간 건수). 페이지 쿼리 전에 304 판단에 쓴다.
+    이력은 추가만 되므로 새 행이 들어오면 최신 id 가, 구간에서 빠지면 건수가 바뀐다.
+    """
+    date_filter = range_filter(range_type)
+    since = None
+    if cursor:
+        since = parse_ts(decode_cursor(cursor, f"policy_{policy_type}").get("since"))
+
+    conn = get_connection(readonly=True)
+    cur = conn.cursor(dictionary=True)
+    try:
+        if since is None:
+            cur.execute(f"SELECT {date_filter} AS since")
+            since = cur.fetchall()[0]["since"]
+        cur.execute(*policy_version_query(policy_type, since))
+        row = cur.fetchall()[0]
+    finally:
+        cur.close()
+        conn.close()
+    return row["latest"] or 0, row["total"]
 
-def get_policy_cloud(range_type):
-    conn = get_connection()
+
+def get_policy_page(policy_type, range_type, limit=None, after_id=None, before_ts=None, cursor=None):
+    """
+    최신순 한 페이지. return: (rows, next_cursor)
+    - before_ts: 이 시각 이전 이력만
+    - before_ts + after_id: (timestamp, history_id) 가 이 위치보다 앞선 이력부터 (키셋 위치)
+    - cursor: 이전 응답의 next_cursor
+    """
+    _, column = _policy_table(policy_type)
+    date_filter = range_filter(range_type)
+    limit = clamp_limit(limit)
+    kind = f"policy_{policy_type}"
+    since = None
+    if cursor:
+        c = decode_cursor(cursor, kind)
+        after_id, before_ts, since = c.get("id"), c.get("ts"), parse_ts(c.get("since"))
+    before_ts = parse_ts(before_ts)
+
+    conn = get_connection(readonly=True)
     cur = conn.cursor(dictionary=True)
+    try:
+        if since is None:
+            cur.execute(f"SELECT {date_filter} AS since")
+            since = cur.fetchall()[0]["since"]
+
+        sql, params = policy_query(policy_type, since, after_id, before_ts, limit=limit + 1)
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+        conn.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(kind, id=last["history_id"], ts=last["timestamp"], since=since)
+    # 응답 형태는 기존과 동일하게 이력 컬럼만
+    return [{column: row[column]} for row in rows], next_cursor
+
+
+def iter_policy(policy_type, range_type, page_size=None):
+    cursor = None
+    while True:
+        rows, cursor = get_policy_page(policy_type, range_type, limit=page_size, cursor=cursor)
+        yield from rows
+        if not cursor:
+            return
+
 
-    if range_type == "daily":
-        sql = """
-        SELECT raw_event
-        FROM policy_history_c
-        WHERE timestamp >= NOW() - INTERVAL 1 DAY
-        ORDER BY timestamp DESC
-        """
-    elif range_type == "weekly":
-        sql = """
-        SELECT raw_event
-        FROM policy_history_c
-        WHERE timestamp >= NOW() - INTERVAL 7 DAY
-        ORDER BY timestamp DESC
-        """
-    elif range_type == "monthly":
-        sql = """
-        SELECT raw_event
-        FROM policy_history_c
-        WHERE timestamp >= NOW() - INTERVAL 1 MONTH
-        ORDER BY timestamp DESC
-        """
-    elif range_type == "hour":
-        sql = """
-        SELECT raw_event
-        FROM policy_history_c
-        WHERE timestamp >= NOW() - INTERVAL 1 HOUR
-        ORDER BY timestamp DESC
-        """
-    elif range_type == "10min":
-        sql = """
-        SELECT raw_event
-        FROM policy_history_c
-        WHERE timestamp >= NOW() - INTERVAL 10 MINUTE
-        ORDER BY timestamp DESC
-        """
-    else:
-        raise ValueError("Invalid range type")
-
-    cur.execute(sql)
-    rows = cur.fetchall()
-
-    cur.close()
-    conn.close()
-    return rows
-
-
-def get_policy_onprem(range_type):
-    conn = get_connection()
+def stream_policy(policy_type, range_type, after_id=None, before_ts=None):
+    """구간 전체를 최신순으로 한 건씩 yield (log_service.stream_logs 와 같은 방식)"""
+    _policy_table(policy_type)
+    date_filter = range_filter(range_type)
+    before_ts = parse_ts(before_ts)
+
+    conn = get_connection(readonly=True)
     cur = conn.cursor(dictionary=True)
+    finished = False
+    try:
+        cur.execute(f"SELECT {date_filter} AS since")
+        since = cur.fetchall()[0]["since"]
+        sql, params = policy_query(policy_type, since, after_id, before_ts, with_key=False)
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(STREAM_FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+        finished = True
+    finally:
+        close_stream(conn, cur, finished)
+
+
+def _get_policy(policy_type, range_type, limit=None):
+    if limit:
+        rows, _ = get_policy_page(policy_type, range_type, limit=limit)
+        return rows
+    return list(iter_policy(policy_type, range_type))
+
+
+def get_policy_cloud(range_type, limit=None):
+    return _get_policy("cloud", range_type, limit)
+
 
-    if range_type == "daily":
-        sql = """
-        SELECT message
-        FROM policy_history_o
-        WHERE timestamp >= NOW() - INTERVAL 1 DAY
-        ORDER BY timestamp DESC
-        """
-    elif range_type == "weekly":
-        sql = """
-        SELECT message
-        FROM policy_history_o
-        WHERE timestamp >= NOW() - INTERVAL 7 DAY
-        ORDER BY timestamp DESC
-        """
-    elif range_type == "monthly":
-        sql = """
-        SELECT message
-        FROM policy_history_o
-        WHERE timestamp >= NOW() - INTERVAL 1 MONTH
-        ORDER BY timestamp DESC
-        """
-    elif range_type == "hour":
-        sql = """
-        SELECT message
-        FROM policy_history_o
-        WHERE timestamp >= NOW() - INTERVAL 1 HOUR
-        ORDER BY timestamp DESC
-        """
-    elif range_type == "10min":
-        sql = """
-        SELECT message
-        FROM policy_history_o
-        WHERE timestamp >= NOW() - INTERVAL 10 MINUTE
-        ORDER BY timestamp DESC
-        """
-    else:
-        raise ValueError("Invalid range type")
-
-    cur.execute(sql)
-    rows = cur.fetchall()
-
-    cur.close()
-    conn.close()
-    return rows
\ No newline at end of file
+def get_policy_onprem(range_type, limit=None):
+    return _get_policy("onprem", range_type, limit)
@@ -0,0 +1,79 @@
+"""
+로그 시각 파싱 공용 모듈 (온프레/정책/CloudTrail 인입 경로 공통)
+
+- syslog 형식("Sep  3 12:34:56")은 미리 컴파일한 정규식으로 바로 분해 (strptime 미사용)
+- ISO 형식("2025-09-03T12:34:56Z", "2025-09-03 12:34:56")은 datetime.fromisoformat 사용
+- 같은 초의 로그가 수천 건씩 반복되므로 원본 문자열 기준 LRU 캐시
+- syslog 에는 연도가 없으므로 현재 시각과 가장 가까운 연도(작년/올해/내년)로 추론
+  → 12/31 23:59 로그를 1/1 에 받아도 작년으로 기록
+- 실패는 None 을 반환하고 건수를 집계 (stats())
+"""
+import re
+import threading
+from datetime import datetime, date
+from functools import lru_cache
+
+CACHE_SIZE = 65536
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)}
+_SYSLOG = re.compile(r"^([A-Z][a-z]{2})\s+(\d{1,2})\s+(\d{1,2}):(\d{2}):(\d{2})$")
+
+_lock = threading.Lock()
+_stats = {"parsed": 0, "failures": 0, "last_failure": None}
+
+
+def _infer_year(month, day, hour, minute, second, ref):
+    best = None
+    for year in (ref.year - 1, ref.year, ref.year + 1):
+        try:
+            cand = datetime(year, month, day, hour, minute, second)
+        except ValueError:
+            continue  # 2/29 등
+        if best is None or abs(cand - ref) < abs(best - ref):
+            best = cand
+    return best
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_cached(raw, ref_ordinal):
+    raw = raw.strip()
+    if raw[:1].isdigit():  # ISO 는 날짜/시각 구분자가 "T" 또는 공백
+        return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    m = _SYSLOG.match(raw)
+    if not m:
+        return None
+    month = _MONTHS.get(m.group(1))
+    if not month:
+        return None
+    ref = datetime.combine(date.fromordinal(ref_ordinal), datetime.min.time()).replace(hour=12)
+    return _infer_year(month, int(m.group(2)), int(m.group(3)), int(m.group(4)), int(m.group(5)), ref)
+
+
+def parse_log_time(raw, now=None):
+    """
+    syslog / ISO 시각 문자열 → datetime (ISO 에 오프셋이 있으면 aware).
+    파싱 불가 시 None (실패 건수 집계)
+    """
+    if not raw or not isinstance(raw, str):
+        return None
+    ref = (now or datetime.now()).toordinal()
+    try:
+        dt = _parse_cached(raw, ref)
+    except ValueError:
+        dt = None
+    with _lock:
+        if dt is None:
+            _stats["failures"] += 1
+            _stats["last_failure"] = raw[:100]
+        else:
+            _stats["parsed"] += 1
+    return dt
+
+
+def stats():
+    with _lock:
+        s = dict(_stats)
+    info = _parse_cached.cache_info()
+    s.update({"cache_hits": info.hits, "cache_misses": info.misses, "cache_size": info.currsize})
+    return s
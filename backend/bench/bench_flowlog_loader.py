@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+VPC Flow Log 로더 처리량 벤치마크 (합성 코퍼스)
+
+사용법 (backend 디렉터리에서):
+    # 파싱만 측정 (DB 불필요)
+    python3 bench/bench_flowlog_loader.py --files 16 --lines 20000 --workers 1 4
+
+    # 실제 적재까지 측정 (테스트용 DB 의 .env 설정 필요, 삽입한 행은 삭제)
+    python3 bench/bench_flowlog_loader.py --files 8 --lines 20000 --workers 1 4 --db
+"""
+import os
+import sys
+import gzip
+import time
+import random
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import save_log
+
+HEADER = ("version account-id interface-id srcaddr dstaddr srcport dstport protocol "
+          "packets bytes start end action log-status\n")
+
+
+def make_corpus(directory, files, lines, seed=42):
+    """VPC Flow Log v2 형식의 .gz 파일 생성"""
+    rnd = random.Random(seed)
+    base = int(time.time()) - 86400
+    paths = []
+    for n in range(files):
+        path = os.path.join(directory, f"flow-{n:04d}.log.gz")
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(HEADER)
+            for i in range(lines):
+                start = base + n * lines + i
+                f.write(
+                    f"2 401448503579 eni-0abc{n:04d} "
+                    f"10.0.{rnd.randint(0, 255)}.{rnd.randint(1, 254)} "
+                    f"172.31.{rnd.randint(0, 255)}.{rnd.randint(1, 254)} "
+                    f"{rnd.randint(1024, 65535)} {rnd.choice((22, 80, 443, 3306))} "
+                    f"{rnd.choice((6, 17))} {rnd.randint(1, 50)} {rnd.randint(40, 90000)} "
+                    f"{start} {start + 60} {rnd.choice(('ACCEPT', 'REJECT'))} OK\n"
+                )
+        paths.append(path)
+    return paths
+
+
+def parse_only(path):
+    rows = 0
+    with save_log.open_log(path) as f:
+        for cols, _ in save_log.iter_file_columns(f):
+            if cols is None:
+                continue
+            save_log.common_rows(cols)
+            save_log.cloud_rows(cols, 1)
+            rows += cols["count"]
+    return rows
+
+
+def bench_parse(paths, workers):
+    start = time.perf_counter()
+    if workers == 1:
+        rows = sum(parse_only(p) for p in paths)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = sum(pool.map(parse_only, paths))
+    return rows, time.perf_counter() - start
+
+
+def bench_legacy_db(log_dir):
+    conn = save_log.get_connection()
+    cur = conn.cursor()
+    start = time.perf_counter()
+    try:
+        for fpath in save_log.list_log_files(log_dir):
+            save_log.process_file(fpath, cur)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+    return time.perf_counter() - start
+
+
+def cleanup(since_id):
+    conn = save_log.get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM log_cloud WHERE log_id > %s", (since_id,))
+        cur.execute("DELETE FROM log_common WHERE log_id > %s AND log_type='CLOUD'", (since_id,))
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def max_log_id():
+    conn = save_log.get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COALESCE(MAX(log_id), 0) FROM log_common")
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="flow log 로더 rows/sec 측정")
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--db", action="store_true", help="실제 DB 적재까지 측정")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_corpus(tmp, args.files, args.lines)
+        total = args.files * args.lines
+        print(f"corpus: {args.files} files x {args.lines} lines = {total:,} rows")
+
+        for w in args.workers:
+            rows, elapsed = bench_parse(paths, w)
+            print(f"  parse  workers={w:<2d} {elapsed:7.2f}s  {rows / elapsed:>12,.0f} rows/sec")
+
+        if not args.db:
+            return
+
+        mark = max_log_id()
+        elapsed = bench_legacy_db(tmp)
+        cleanup(mark)
+        print(f"  load   legacy     {elapsed:7.2f}s  {total / elapsed:>12,.0f} rows/sec")
+
+        for w in args.workers:
+            mark = max_log_id()
+            start = time.perf_counter()
+            save_log.run_bulk(paths, workers=w, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - start
+            cleanup(mark)
+            print(f"  load   bulk w={w:<2d}  {elapsed:7.2f}s  {total / elapsed:>12,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
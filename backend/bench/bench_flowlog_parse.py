@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+VPC Flow Log 파서 마이크로 벤치마크: 줄 단위 dict 파싱 vs 컬럼 단위(NumPy) 파싱
+
+DB 없이 INSERT 파라미터 생성까지만 측정합니다.
+    python3 bench/bench_flowlog_parse.py --lines 1000000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import save_log
+from flowlog_columns import iter_file_columns, common_rows, cloud_rows
+from bench_flowlog_loader import make_corpus
+
+
+def parse_rowwise(path):
+    """기존 process_file 과 같은 경로: 줄마다 dict + tz 변환 + json.dumps"""
+    rows = 0
+    with save_log.open_log(path) as f:
+        for line in f:
+            try:
+                entry = save_log.parse_line(line)
+                if entry is None:
+                    continue
+                ("CLOUD", save_log.entry_timestamp(entry), json.dumps(entry, ensure_ascii=False))
+                save_log.cloud_params(rows, entry)
+                rows += 1
+            except Exception:
+                pass
+    return rows
+
+
+def parse_columnar(path, chunk_lines):
+    rows = 0
+    with save_log.open_log(path) as f:
+        for cols, _ in iter_file_columns(f, chunk_lines):
+            if cols is None:
+                continue
+            common_rows(cols)
+            cloud_rows(cols, rows + 1)
+            rows += cols["count"]
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="flow log 파싱 lines/sec 비교")
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--chunk-lines", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gz_path = make_corpus(tmp, 1, args.lines)[0]
+        # 압축 해제 비용을 빼기 위해 평문 파일로 풀어서 측정
+        path = os.path.join(tmp, "flow.log")
+        with save_log.open_log(gz_path) as src, open(path, "w", encoding="utf-8") as dst:
+            dst.write(src.read())
+
+        print(f"file: {args.lines:,} lines")
+        for name, fn in (("row-wise", lambda: parse_rowwise(path)),
+                         ("columnar", lambda: parse_columnar(path, args.chunk_lines))):
+            start = time.perf_counter()
+            rows = fn()
+            elapsed = time.perf_counter() - start
+            print(f"  {name:9s} {elapsed:7.2f}s  {rows / elapsed:>12,.0f} lines/sec")
+
+
+if __name__ == "__main__":
+    main()
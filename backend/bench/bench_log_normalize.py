@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+/api/logs 정규화 경로 벤치마크: raw_log JSON 파싱(기존) vs 타입 컬럼 조인
+
+사용법 (backend 디렉터리에서):
+    # 정규화 단계만 측정 (합성 100만 행, DB 불필요)
+    python3 bench/bench_log_normalize.py --rows 1000000
+
+    # 실제 조회까지 측정 (테스트용 DB 의 .env 설정 필요, 구간 안의 최신 --rows 건)
+    python3 bench/bench_log_normalize.py --rows 1000000 --db --from 2026-10-01 --to 2026-10-18
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.services import log_service
+
+
+def make_rows(n, seed=42):
+    """(raw_log 행, 타입 컬럼 행) 목록. 온프레/클라우드 반반"""
+    rnd = random.Random(seed)
+    base = datetime.now() - timedelta(days=1)
+    raw_rows, typed_rows = [], []
+    for i in range(n):
+        ts = base + timedelta(milliseconds=i)
+        src = f"10.0.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}"
+        dst = f"172.31.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}"
+        sport, dport = rnd.randint(1024, 65535), rnd.choice((22, 80, 443, 3306))
+        if i % 2:
+            log_type, proto, action = "CLOUD", rnd.choice(("6", "17")), rnd.choice(("ACCEPT", "REJECT"))
+            raw = {"version": "2", "account-id": "401448503579", "interface-id": "eni-0abc0001",
+                   "srcaddr": src, "dstaddr": dst, "srcport": str(sport), "dstport": str(dport),
+                   "protocol": proto, "packets": "10", "bytes": "8400",
+                   "start": str(int(ts.timestamp())), "end": str(int(ts.timestamp()) + 60),
+                   "action": action, "log-status": "OK"}
+        else:
+            log_type, proto, action = "ONPREM", rnd.choice(("TCP", "UDP")), None
+            raw = {"host": "bench-fw", "program": "kernel", "readable_time": ts.strftime("%b %d %H:%M:%S"),
+                   "IN": "eth0", "OUT": "", "MAC": "00:11:22:33:44:55", "SRC": src, "DST": dst,
+                   "LEN": "60", "TOS": "0x00", "PREC": "0x00", "TTL": "64", "ID": str(i),
+                   "PROTO": proto, "SPT": str(sport), "DPT": str(dport)}
+        raw_rows.append({"log_id": i, "log_type": log_type, "raw_log": json.dumps(raw), "timestamp": ts})
+        typed_rows.append({"log_id": i, "log_type": log_type, "timestamp": ts,
+                           "srcip": src, "dstip": dst, "srcport": sport, "dstport": dport,
+                           "protocol": proto, "action": action, "raw_log": None})
+    return raw_rows, typed_rows
+
+
+def bench_normalize(raw_rows, typed_rows):
+    start = time.perf_counter()
+    for row in raw_rows:
+        log_service.normalize_log(row)
+    raw_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in typed_rows:
+        log_service.typed_log(row)
+    typed_elapsed = time.perf_counter() - start
+    return raw_elapsed, typed_elapsed
+
+
+# ==============================
+# DB 조회 (unbuffered 커서로 끝까지 읽기)
+# ==============================
+LEGACY_SQL = """
+    SELECT log_id, log_type, raw_log, timestamp
+    FROM log_common
+    WHERE timestamp >= %s AND timestamp < %s
+    ORDER BY log_id DESC
+    LIMIT %s
+"""
+
+
+def _drain(sql, params, convert):
+    conn = log_service.get_connection(readonly=True)
+    cur = conn.cursor(dictionary=True)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        cur.execute(sql, params)
+        while True:
+            batch = cur.fetchmany(log_service.STREAM_FETCH_SIZE)
+            if not batch:
+                break
+            for row in batch:
+                convert(row)
+            rows += len(batch)
+    finally:
+        cur.close()
+        conn.close()
+    return rows, time.perf_counter() - start
+
+
+def bench_db(start_ts, end_ts, limit):
+    legacy = _drain(LEGACY_SQL, (start_ts, end_ts, limit), log_service.normalize_log)
+    sql, params = log_service.log_query(start_ts, before_ts=end_ts)
+    typed = _drain(sql + " LIMIT %s", params + [limit], log_service.typed_log)
+    return legacy, typed
+
+
+def report(name, rows, elapsed):
+    print(f"  {name:16s} {elapsed:7.2f}s  {rows / elapsed:>12,.0f} rows/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로그 정규화 rows/sec 비교")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", action="store_true", help="실제 DB 조회까지 측정")
+    parser.add_argument("--from", dest="start", help="YYYY-MM-DD[THH:MM] (--db)")
+    parser.add_argument("--to", dest="end", help="YYYY-MM-DD[THH:MM] 미포함 (--db)")
+    args = parser.parse_args()
+
+    raw_rows, typed_rows = make_rows(args.rows)
+    raw_elapsed, typed_elapsed = bench_normalize(raw_rows, typed_rows)
+    print(f"normalize: {args.rows:,} rows")
+    report("raw_log json", args.rows, raw_elapsed)
+    report("typed columns", args.rows, typed_elapsed)
+    print(f"  speedup          x{raw_elapsed / typed_elapsed:.1f}")
+    del raw_rows, typed_rows
+
+    if not args.db:
+        return
+    if not (args.start and args.end):
+        raise SystemExit("❌ --db 에는 --from / --to 가 필요합니다.")
+
+    (l_rows, l_elapsed), (t_rows, t_elapsed) = bench_db(
+        datetime.fromisoformat(args.start), datetime.fromisoformat(args.end), args.rows)
+    print(f"query + normalize: {args.start} ~ {args.end}")
+    report("raw_log json", l_rows, l_elapsed)
+    report("typed join", t_rows, t_elapsed)
+    if l_elapsed and t_elapsed:
+        print(f"  speedup          x{l_elapsed / t_elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
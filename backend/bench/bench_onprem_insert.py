@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+온프레 로그 저장 벤치마크: 기존 행 단위 루프 vs 일괄(multi-row) 저장
+
+사용법 (backend 디렉터리에서, 테스트용 DB 의 .env 설정 필요):
+    python3 bench/bench_onprem_insert.py --rows 5000 --chunk-size 1000
+
+실행 후 벤치마크로 넣은 행은 log_onprem / log_common 에서 삭제합니다.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from dotenv import load_dotenv
+from log_db import get_connection, insert_log_common, insert_log_onprem, insert_logs_onprem_bulk
+
+load_dotenv()
+
+
+def make_logs(n):
+    """iptables 로그 형태의 합성 데이터 생성"""
+    logs = []
+    for i in range(n):
+        logs.append({
+            "host": "bench-fw",
+            "program": "kernel",
+            "readable_time": f"Sep {1 + i % 28:2d} {i % 24:02d}:{i % 60:02d}:{(i * 7) % 60:02d}",
+            "IN": "eth0", "OUT": "", "MAC": "00:11:22:33:44:55",
+            "SRC": f"10.0.{random.randint(0, 255)}.{random.randint(1, 254)}",
+            "DST": f"192.168.5.{random.randint(1, 254)}",
+            "LEN": "60", "TOS": "0x00", "PREC": "0x00", "TTL": "64", "ID": str(i),
+            "PROTO": random.choice(["TCP", "UDP"]),
+            "SPT": str(random.randint(1024, 65535)),
+            "DPT": str(random.choice([22, 80, 443, 3306])),
+        })
+    return logs
+
+
+def cleanup(ids):
+    if not ids:
+        return
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        lo, hi = min(ids), max(ids)
+        cur.execute("DELETE FROM log_onprem WHERE log_id BETWEEN %s AND %s", (lo, hi))
+        cur.execute("DELETE FROM log_common WHERE log_id BETWEEN %s AND %s AND log_type='ONPREM'", (lo, hi))
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def bench_row_loop(logs):
+    start = time.perf_counter()
+    ids = insert_log_common("ONPREM", logs)
+    insert_log_onprem(ids, logs)
+    return time.perf_counter() - start, ids
+
+
+def bench_bulk(logs, chunk_size):
+    start = time.perf_counter()
+    ids = insert_logs_onprem_bulk(logs, chunk_size=chunk_size)
+    return time.perf_counter() - start, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="onprem 로그 저장 rows/sec 비교")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="삽입한 행을 삭제하지 않음")
+    args = parser.parse_args()
+
+    logs = make_logs(args.rows)
+    results = {"row-loop": [], "bulk": []}
+
+    for _ in range(args.repeat):
+        for name, fn in (("row-loop", lambda: bench_row_loop(logs)),
+                         ("bulk", lambda: bench_bulk(logs, args.chunk_size))):
+            elapsed, ids = fn()
+            results[name].append(elapsed)
+            if not args.keep:
+                cleanup(ids)
+
+    print(f"rows={args.rows} chunk_size={args.chunk_size} repeat={args.repeat}")
+    for name, times in results.items():
+        best = min(times)
+        print(f"  {name:9s} best={best:.3f}s  {args.rows / best:,.0f} rows/sec")
+    speedup = min(results["row-loop"]) / min(results["bulk"])
+    print(f"  speedup   x{speedup:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+API 부하 테스트: 라우트별 p50/p99 지연 시간과 초당 요청 수
+
+사용법 (backend 디렉터리에서, 서버를 먼저 띄운 뒤):
+    python3 serve.py &
+    python3 bench/load_test.py --duration 30 --concurrency 32
+
+    # 라우트 지정 (여러 번), 수집 API 에 합성 온프레 로그 POST 섞기
+    python3 bench/load_test.py --route "/api/logs?range=hour" --route "/api/logs/stats?range=daily" \\
+        --ingest-url http://localhost:5000 --ingest-batch 100
+
+라우트는 가중치 없이 라운드로빈으로 고르고 난수 시드를 고정하므로 같은 옵션이면 같은 요청 순서.
+표준 라이브러리만 사용 (urllib + 스레드).
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_ROUTES = [
+    "/api/logs?range=hour&limit=500",
+    "/api/logs/stats?range=daily",
+    "/api/policy?type=cloud&range=daily&limit=500",
+    "/api/policy?type=onprem&range=daily&limit=500",
+    "/api/db/stats",
+]
+
+
+def make_onprem_logs(rnd, n):
+    """iptables 로그 형태의 합성 데이터 (bench_onprem_insert.py 와 같은 모양)"""
+    now = time.localtime()
+    return [{
+        "host": "load-test", "program": "kernel",
+        "readable_time": time.strftime("%b %d %H:%M:%S", now),
+        "IN": "eth0", "OUT": "", "MAC": "00:11:22:33:44:55",
+        "SRC": f"10.0.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}",
+        "DST": f"192.168.5.{rnd.randint(1, 254)}",
+        "LEN": "60", "TOS": "0x00", "PREC": "0x00", "TTL": "64", "ID": str(i),
+        "PROTO": rnd.choice(["TCP", "UDP"]),
+        "SPT": str(rnd.randint(1024, 65535)),
+        "DPT": str(rnd.choice([22, 80, 443, 3306])),
+    } for i in range(n)]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, name, elapsed, status):
+        with self._lock:
+            self.latencies[name].append(elapsed)
+            self.statuses[name][status] += 1
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def send(req, timeout):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except Exception as e:
+        status = type(e).__name__
+    return time.perf_counter() - start, status
+
+
+def worker(n, args, jobs, recorder, deadline):
+    rnd = random.Random(args.seed + n)
+    i = n
+    while time.monotonic() < deadline:
+        name, build = jobs[i % len(jobs)]
+        i += args.concurrency
+        elapsed, status = send(build(rnd), args.timeout)
+        recorder.add(name, elapsed, status)
+
+
+def build_jobs(args):
+    jobs = []
+    headers = {"Accept-Encoding": "gzip"} if args.gzip else {}
+    for route in args.route or DEFAULT_ROUTES:
+        url = args.url.rstrip("/") + route
+        jobs.append((f"GET {route}", lambda _rnd, url=url: urllib.request.Request(url, headers=headers)))
+    if args.ingest_url:
+        url = args.ingest_url.rstrip("/") + "/api/log/onprem"
+
+        def post(rnd):
+            body = json.dumps(make_onprem_logs(rnd, args.ingest_batch)).encode("utf-8")
+            return urllib.request.Request(url, data=body, method="POST",
+                                          headers={"Content-Type": "application/json"})
+        jobs.append((f"POST /api/log/onprem x{args.ingest_batch}", post))
+    return jobs
+
+
+def report(recorder, wall):
+    print(f"{'route':58s} {'reqs':>7s} {'rps':>8s} {'p50 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}  status")
+    total = 0
+    for name in sorted(recorder.latencies):
+        values = sorted(recorder.latencies[name])
+        total += len(values)
+        statuses = ", ".join(f"{k}:{v}" for k, v in sorted(recorder.statuses[name].items(), key=str))
+        print(f"{name[:58]:58s} {len(values):7d} {len(values) / wall:8.1f} "
+              f"{percentile(values, 50) * 1000:8.1f} {percentile(values, 99) * 1000:8.1f} "
+              f"{values[-1] * 1000:8.1f}  {statuses}")
+    print(f"{'TOTAL':58s} {total:7d} {total / wall:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 부하 테스트 (p50/p99, rps)")
+    parser.add_argument("--url", default=os.getenv("API_BASE_URL", "http://localhost:5001"))
+    parser.add_argument("--route", action="append", help="GET 경로 (여러 번 지정 가능, 기본: 대시보드 조회 API)")
+    parser.add_argument("--ingest-url", help="수집 API 주소 (예: http://localhost:5000), 지정 시 POST 섞음")
+    parser.add_argument("--ingest-batch", type=int, default=100, help="POST 한 번당 로그 건수")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="측정 전 워밍업 시간(초)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--gzip", action="store_true", help="Accept-Encoding: gzip 전송")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    jobs = build_jobs(args)
+    print(f"routes={len(jobs)} concurrency={args.concurrency} duration={args.duration}s url={args.url}")
+
+    for phase, seconds in (("warmup", args.warmup), ("measure", args.duration)):
+        if seconds <= 0:
+            continue
+        recorder = Recorder()
+        deadline = time.monotonic() + seconds
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for n in range(args.concurrency):
+                pool.submit(worker, n, args, jobs, recorder, deadline)
+        wall = time.perf_counter() - start
+
+    report(recorder, wall)
+    errors = sum(v for s in recorder.statuses.values() for k, v in s.items() if not (isinstance(k, int) and k < 500))
+    if errors:
+        print(f"[WARN] 5xx/연결 오류 {errors}건")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
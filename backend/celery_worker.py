@@ -10,5 +10,5 @@ celery_app = Celery(
     broker=os.getenv('CELERY_BROKER_URL'),
     backend=os.getenv('CELERY_RESULT_BACKEND'),
     # 실행할 작업들이 정의된 파일을 'include'에 추가합니다.
-    include=['app.tasks']
+    include=['app.tasks', 'app.analysis_tasks']
 )
\ No newline at end of file
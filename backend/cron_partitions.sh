@@ -0,0 +1,7 @@
+#!/bin/bash
+cd /home/fortizero/Dashboard/backend
+export $(grep -v '^#' .env | xargs)
+PATH=/usr/bin:/bin
+
+# 만료 일자 파티션 DROP + 앞으로 쓸 일자 파티션 미리 생성 (하루 한 번)
+python3 app/partition_maintenance.py run >> /var/log/partition-maintenance.log 2>&1
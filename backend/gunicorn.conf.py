@@ -0,0 +1,52 @@
+"""
+gunicorn 설정 (serve.py 가 SERVER_ROLE=api / ingest 로 각각 실행)
+
+    SERVER_ROLE=api gunicorn -c gunicorn.conf.py wsgi:api
+    SERVER_ROLE=ingest gunicorn -c gunicorn.conf.py wsgi:ingest
+
+역할별 환경 변수 (API_ / INGEST_ 접두사):
+    *_BIND      바인드 주소 (기본 0.0.0.0:5001 / 0.0.0.0:5000)
+    *_WORKERS   워커 프로세스 수 (기본 api: CPU*2+1, ingest: 2)
+    *_THREADS   워커당 스레드 수 (기본 api: 8, ingest: 4)
+    *_TIMEOUT   요청 처리 제한 시간(초) (기본 api: 180 — AI 리포트, ingest: 30)
+"""
+import os
+import multiprocessing
+
+ROLE = os.getenv("SERVER_ROLE", "api")
+if ROLE not in ("api", "ingest"):
+    raise RuntimeError(f"SERVER_ROLE must be 'api' or 'ingest': {ROLE}")
+
+DEFAULTS = {
+    "api": {"BIND": "0.0.0.0:5001", "WORKERS": multiprocessing.cpu_count() * 2 + 1, "THREADS": 8, "TIMEOUT": 180},
+    "ingest": {"BIND": "0.0.0.0:5000", "WORKERS": 2, "THREADS": 4, "TIMEOUT": 30},
+}[ROLE]
+
+
+def _env(name):
+    return os.getenv(f"{ROLE.upper()}_{name}", str(DEFAULTS[name]))
+
+
+bind = _env("BIND")
+workers = int(_env("WORKERS"))
+threads = int(_env("THREADS"))
+worker_class = "gthread"        # 느린 요청(AI 리포트)이 워커 하나를 통째로 막지 않도록 스레드 처리
+timeout = int(_env("TIMEOUT"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))  # 0: 워커 재시작 안 함
+max_requests_jitter = max_requests // 10
+preload_app = True              # 마스터에서 import 후 fork → 워커가 모듈 메모리를 공유
+proc_name = f"fortizero-{ROLE}"
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """write-behind 버퍼(flusher 스레드, 스풀 파일 잠금)는 워커마다 fork 이후에 시작"""
+    if ROLE != "ingest":
+        return
+    import ingest_buffer
+    if ingest_buffer.WRITE_BEHIND:
+        ingest_buffer.get_buffer()
+        server.log.info(f"[OK] worker {worker.pid}: write-behind buffer started")
@@ -0,0 +1,43 @@
+"""
+대량 조회 API 응답 디코드 (log_anaylzer / anomaly_log_detection 의 fetcher 공용)
+
+서버(app/response_format.py)는 Accept 헤더에 따라 json / columnar / msgpack / arrow 로 응답한다.
+msgpack / pyarrow 는 선택 의존성: 있으면 MessagePack, 없으면 열 단위 JSON 을 요청한다.
+"""
+import os
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+FETCH_FORMAT = os.getenv("API_FETCH_FORMAT") or ("msgpack" if msgpack else "columnar")
+ACCEPT = {
+    "json": "application/json",
+    "columnar": "application/vnd.fortizero.columnar+json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+def decode_body(response):
+    """Content-Type 에 맞게 디코드해 항상 {"data": [행 dict...], "next_cursor": ...} 형태로 반환"""
+    ctype = response.headers.get("Content-Type", "").split(";")[0].strip()
+    if ctype == ACCEPT["arrow"]:
+        reader = pa.ipc.open_stream(response.content)
+        table = reader.read_all()
+        meta = {k.decode(): json.loads(v) for k, v in (table.schema.metadata or {}).items()}
+        return {**meta, "data": table.to_pylist()}
+    if ctype == ACCEPT["msgpack"]:
+        body = msgpack.unpackb(response.content, raw=False)
+    else:
+        body = response.json()
+    if body.get("format") == "columnar":
+        columns, data = body["columns"], body["data"]
+        body["data"] = [dict(zip(columns, values)) for values in zip(*(data[c] for c in columns))]
+    return body
@@ -1,4 +1,3 @@
-
 import os
 import requests
 from dotenv import load_dotenv
@@ -6,25 +5,52 @@ from dotenv import load_dotenv
 # .env 파일 로드
 load_dotenv()
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:5001")
+PAGE_SIZE = int(os.getenv("API_FETCH_PAGE_SIZE", "1000"))
+
+# 응답 형식 협상/디코드는 anomaly_log_detection 과 공용 (API_FETCH_FORMAT 은 .env 로드 후 읽음)
+from api_codec import FETCH_FORMAT, ACCEPT, decode_body
+
+def iter_from_api(path: str, params: dict | None = None, page_size: int = PAGE_SIZE, max_items: int | None = None):
+    """
+    API 응답의 next_cursor 를 따라가며 항목을 하나씩 yield 합니다.
+    다음 페이지는 앞 페이지를 다 소비한 뒤에 요청하므로, 필요한 만큼만 읽고 멈출 수 있습니다.
+
+    Args:
+        path (str): API 경로 (예: "/api/logs", "/api/policy")
+        params (dict, optional): 쿼리 파라미터 딕셔너리 (예: {"range": "daily"})
+        page_size (int): 페이지당 요청 건수 (limit)
+        max_items (int, optional): 최대 항목 수 (None 이면 끝까지)
+    """
+    url = f"{API_BASE_URL}{path}"
+    query = dict(params or {})
+    count = 0
+    while True:
+        limit = page_size if max_items is None else min(page_size, max_items - count)
+        query["limit"] = limit
+        try:
+            # requests 라이브러리가 params 딕셔너리를 안전하게 URL 쿼리 스트링으로 만들어줍니다.
+            response = requests.get(url, params=query, headers={"Accept": ACCEPT[FETCH_FORMAT]}, timeout=60)
+            response.raise_for_status()
+            body = decode_body(response)
+        except requests.exceptions.RequestException as e:
+            print(f"API 호출 오류 ({url}): {e}")
+            return
+
+        for item in body.get("data", []):
+            yield item
+            count += 1
+        cursor = body.get("next_cursor")
+        if not cursor or (max_items is not None and count >= max_items):
+            return
+        query["cursor"] = cursor
 
-def fetch_from_api(path: str, params: dict | None = None):
+def fetch_from_api(path: str, params: dict | None = None, max_items: int | None = None):
     """
-    지정된 경로(path)와 파라미터(params)로 API 서버에서 데이터를 가져옵니다.
+    지정된 경로(path)와 파라미터(params)로 API 서버에서 데이터를 가져옵니다. (모든 페이지를 리스트로)
 
     Args:
         path (str): API 경로 (예: "/api/logs", "/api/policy")
         params (dict, optional): 쿼리 파라미터 딕셔너리 (예: {"range": "daily"}). Defaults to None.
+        max_items (int, optional): 최대 항목 수. Defaults to None (전체).
     """
-    try:
-        url = f"{API_BASE_URL}{path}"
-        
-        # requests 라이브러리가 params 딕셔너리를 안전하게 URL 쿼리 스트링으로 만들어줍니다.
-        # 예: {"range":"daily"} -> ?range=daily
-        response = requests.get(url, params=params, timeout=60)
-        
-        response.raise_for_status()
-        return response.json().get("data", [])
-    
-    except requests.exceptions.RequestException as e:
-        print(f"API 호출 오류 ({url}): {e}")
-        return []
\ No newline at end of file
+    return list(iter_from_api(path, params, max_items=max_items))
@@ -0,0 +1,193 @@
+-- 기준 스키마: 코드가 INSERT/SELECT 하는 테이블들
+-- 이미 운영 중인 DB 에서는 CREATE TABLE IF NOT EXISTS 라 아무것도 바꾸지 않는다.
+
+-- ==============================
+-- 트래픽 로그
+-- ==============================
+CREATE TABLE IF NOT EXISTS log_common (
+    log_id      BIGINT      NOT NULL AUTO_INCREMENT,
+    log_type    VARCHAR(16) NOT NULL,             -- ONPREM / CLOUD
+    timestamp   DATETIME    NULL,
+    raw_log     LONGTEXT    NULL,                 -- 원본 JSON
+    created_at  DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (log_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS log_onprem (
+    log_id            BIGINT       NOT NULL,      -- log_common.log_id
+    host              VARCHAR(255) NULL,
+    program           VARCHAR(64)  NULL,
+    in_iface          VARCHAR(32)  NULL,
+    out_iface         VARCHAR(32)  NULL,
+    mac               VARCHAR(128) NULL,
+    source_ip         VARCHAR(45)  NULL,
+    destination_ip    VARCHAR(45)  NULL,
+    length            INT          NULL,
+    tos               VARCHAR(8)   NULL,
+    precedence        VARCHAR(8)   NULL,
+    ttl               INT          NULL,
+    packet_id         INT          NULL,
+    protocol          VARCHAR(16)  NULL,
+    source_port       INT          NULL,
+    destination_port  INT          NULL,
+    timestamp         DATETIME     NULL,
+    PRIMARY KEY (log_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS log_cloud (
+    log_id            BIGINT      NOT NULL,       -- log_common.log_id
+    version           INT         NULL,
+    account_id        VARCHAR(32) NULL,
+    interface_id      VARCHAR(64) NULL,
+    source_ip         VARCHAR(45) NULL,
+    destination_ip    VARCHAR(45) NULL,
+    protocol          VARCHAR(16) NULL,
+    source_port       INT         NULL,
+    destination_port  INT         NULL,
+    packet            BIGINT      NULL,
+    byte              BIGINT      NULL,
+    start_time        DATETIME    NULL,
+    end_time          DATETIME    NULL,
+    action            VARCHAR(16) NULL,
+    log_status        VARCHAR(16) NULL,
+    PRIMARY KEY (log_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ==============================
+-- 정책 변경 이력
+-- ==============================
+CREATE TABLE IF NOT EXISTS policy_history_c (
+    history_id     BIGINT       NOT NULL AUTO_INCREMENT,
+    policy_id      VARCHAR(255) NULL,             -- 버킷명 / 정책 ARN / 그룹명 등
+    user_id        INT          NULL,
+    change_type    VARCHAR(16)  NULL,
+    before_change  LONGTEXT     NULL,
+    after_change   LONGTEXT     NULL,
+    reason         VARCHAR(255) NULL,
+    timestamp      DATETIME     NULL,
+    event_id       VARCHAR(64)  NULL,
+    raw_event      LONGTEXT     NULL,
+    PRIMARY KEY (history_id),
+    UNIQUE KEY uq_policy_history_c_event (event_id)  -- INSERT IGNORE 중복 방지
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS policy_history_o (
+    history_id  BIGINT       NOT NULL AUTO_INCREMENT,
+    host        VARCHAR(255) NULL,
+    timestamp   DATETIME     NULL,
+    message     TEXT         NULL,
+    PRIMARY KEY (history_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ==============================
+-- iptables 정책 버전관리
+-- ==============================
+CREATE TABLE IF NOT EXISTS policies (
+    id           INT          NOT NULL AUTO_INCREMENT,
+    name         VARCHAR(255) NOT NULL,
+    scope        VARCHAR(32)  NOT NULL DEFAULT 'onprem',
+    description  TEXT         NULL,
+    created_at   DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS policy_versions (
+    id           INT          NOT NULL AUTO_INCREMENT,
+    policy_id    INT          NOT NULL,
+    version      INT          NOT NULL,
+    author       VARCHAR(128) NULL,
+    message      TEXT         NULL,
+    source_yaml  MEDIUMTEXT   NULL,
+    checksum     CHAR(64)     NULL,
+    created_at   DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS policy_rules (
+    id           BIGINT       NOT NULL AUTO_INCREMENT,
+    version_id   INT          NOT NULL,
+    rule_key     CHAR(64)     NOT NULL,
+    `table`      VARCHAR(16)  NOT NULL DEFAULT 'filter',
+    `chain`      VARCHAR(32)  NOT NULL,
+    priority     INT          NOT NULL DEFAULT 100,
+    target       VARCHAR(32)  NOT NULL,
+    proto        VARCHAR(16)  NULL,
+    src          VARCHAR(64)  NULL,
+    dst          VARCHAR(64)  NULL,
+    sport        VARCHAR(32)  NULL,
+    dport        VARCHAR(32)  NULL,
+    in_iface     VARCHAR(32)  NULL,
+    out_iface    VARCHAR(32)  NULL,
+    state_match  VARCHAR(64)  NULL,
+    comment      VARCHAR(255) NULL,
+    raw_match    TEXT         NULL,
+    state        VARCHAR(16)  NOT NULL DEFAULT 'present',
+    PRIMARY KEY (id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS deployments (
+    id          INT          NOT NULL AUTO_INCREMENT,
+    version_id  INT          NOT NULL,
+    host        VARCHAR(255) NOT NULL,
+    status      VARCHAR(16)  NOT NULL DEFAULT 'PENDING',
+    log_text    MEDIUMTEXT   NULL,
+    created_at  DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    applied_at  DATETIME     NULL,
+    PRIMARY KEY (id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ==============================
+-- 클라우드 정책 스냅샷 (policy_cloud.py)
+-- ==============================
+CREATE TABLE IF NOT EXISTS policy_cloud (
+    policy_id  INT      NOT NULL AUTO_INCREMENT,  -- 스냅샷 배치 ID
+    timestamp  DATETIME NOT NULL,
+    PRIMARY KEY (policy_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS policy_cloud_s3 (
+    id           BIGINT       NOT NULL AUTO_INCREMENT,
+    policy_id    INT          NOT NULL,
+    bucket_name  VARCHAR(255) NOT NULL,
+    policy_doc   LONGTEXT     NULL,
+    PRIMARY KEY (id),
+    KEY idx_policy_cloud_s3_batch (policy_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS policy_cloud_iam (
+    id               BIGINT       NOT NULL AUTO_INCREMENT,
+    policy_id        INT          NOT NULL,
+    policy_arn       VARCHAR(512) NOT NULL,
+    policy_name      VARCHAR(255) NULL,
+    default_version  VARCHAR(32)  NULL,
+    document         LONGTEXT     NULL,
+    PRIMARY KEY (id),
+    KEY idx_policy_cloud_iam_batch (policy_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS policy_cloud_sg (
+    id           BIGINT       NOT NULL AUTO_INCREMENT,
+    policy_id    INT          NOT NULL,
+    group_id     VARCHAR(64)  NOT NULL,
+    group_name   VARCHAR(255) NULL,
+    description  TEXT         NULL,
+    vpc_id       VARCHAR(64)  NULL,
+    rule         LONGTEXT     NULL,
+    PRIMARY KEY (id),
+    KEY idx_policy_cloud_sg_batch (policy_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- ==============================
+-- 적재 완료 파일 매니페스트 (file_manifest.MANIFEST_DDL 과 동일)
+-- ==============================
+CREATE TABLE IF NOT EXISTS ingest_file_manifest (
+    id           BIGINT AUTO_INCREMENT PRIMARY KEY,
+    loader       VARCHAR(32)  NOT NULL,
+    path         VARCHAR(512) NOT NULL,
+    size         BIGINT       NOT NULL,
+    mtime        DOUBLE       NOT NULL,
+    sha256       CHAR(64)     NOT NULL,
+    rows_loaded  INT          NOT NULL DEFAULT 0,
+    processed_at DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_manifest_loader_path (loader, path)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
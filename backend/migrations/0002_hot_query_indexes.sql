@@ -0,0 +1,32 @@
+-- 대시보드/적재 경로의 자주 쓰는 쿼리용 인덱스
+-- 운영 DB 에 같은 이름의 인덱스가 이미 있으면(errno 1061) migrate.py 가 건너뛴다.
+
+-- log_service.get_logs: WHERE timestamp >= ? ORDER BY log_id DESC
+CREATE INDEX idx_log_common_ts_id ON log_common (timestamp, log_id);
+
+-- save_cloudtrail.get_previous_after / preload_previous_after:
+--   WHERE policy_id = ? ORDER BY history_id DESC LIMIT 1, MAX(history_id) GROUP BY policy_id
+CREATE INDEX idx_policy_history_c_policy_hist ON policy_history_c (policy_id, history_id);
+
+-- policy_service.get_policy_cloud: WHERE timestamp >= ? ORDER BY timestamp DESC
+CREATE INDEX idx_policy_history_c_ts ON policy_history_c (timestamp);
+
+-- policy_service.get_policy_onprem: WHERE timestamp >= ? ORDER BY timestamp DESC
+CREATE INDEX idx_policy_history_o_ts ON policy_history_o (timestamp);
+
+-- ansible_service.fetch_rules / iptables_versioning._get_rules_by_version:
+--   WHERE version_id = ? ORDER BY priority, id
+CREATE INDEX idx_policy_rules_version_prio ON policy_rules (version_id, priority, id);
+
+-- ansible_service._get_latest_onprem_version: ORDER BY created_at DESC, id DESC LIMIT 1
+CREATE INDEX idx_policy_versions_created ON policy_versions (created_at, id);
+
+-- iptables_versioning._get_next_version: MAX(version) WHERE policy_id = ?
+-- (정책 이름으로 최신 버전 조회 시 JOIN 키로도 사용)
+CREATE INDEX idx_policy_versions_policy_ver ON policy_versions (policy_id, version);
+
+-- iptables_versioning._create_or_get_policy_id: WHERE name = ?
+CREATE INDEX idx_policies_name ON policies (name);
+
+-- ansible_apply 배포 이력 조회
+CREATE INDEX idx_deployments_version ON deployments (version_id);
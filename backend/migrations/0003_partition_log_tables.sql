@@ -0,0 +1,56 @@
+-- 로그 테이블 일 단위 RANGE 파티셔닝 (TO_DAYS)
+-- - 파티션 키는 모든 UNIQUE/PRIMARY KEY 에 포함되어야 하므로 PK 를 (log_id, 시각) 으로 변경
+-- - 처음에는 p_future(MAXVALUE) 하나만 만들고, 일자별 파티션은
+--   app/partition_maintenance.py 가 p_future 를 쪼개 미리 만든다 (cron_partitions.sh)
+-- - 기존 데이터가 많으면 테이블 재작성이 일어나므로 점검 시간에 적용
+
+-- ==============================
+-- log_common (timestamp)
+-- ==============================
+UPDATE log_common SET timestamp = created_at WHERE timestamp IS NULL;
+
+ALTER TABLE log_common
+    MODIFY timestamp DATETIME NOT NULL,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (log_id, timestamp);
+
+ALTER TABLE log_common
+    PARTITION BY RANGE (TO_DAYS(timestamp)) (
+        PARTITION p_future VALUES LESS THAN MAXVALUE
+    );
+
+-- ==============================
+-- log_onprem (timestamp)
+-- ==============================
+UPDATE log_onprem o JOIN log_common c ON c.log_id = o.log_id
+    SET o.timestamp = c.timestamp
+    WHERE o.timestamp IS NULL;
+UPDATE log_onprem SET timestamp = NOW() WHERE timestamp IS NULL;  -- log_common 에 짝이 없는 행
+
+ALTER TABLE log_onprem
+    MODIFY timestamp DATETIME NOT NULL,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (log_id, timestamp);
+
+ALTER TABLE log_onprem
+    PARTITION BY RANGE (TO_DAYS(timestamp)) (
+        PARTITION p_future VALUES LESS THAN MAXVALUE
+    );
+
+-- ==============================
+-- log_cloud (start_time)
+-- ==============================
+UPDATE log_cloud l JOIN log_common c ON c.log_id = l.log_id
+    SET l.start_time = c.timestamp
+    WHERE l.start_time IS NULL;
+UPDATE log_cloud SET start_time = COALESCE(end_time, NOW()) WHERE start_time IS NULL;
+
+ALTER TABLE log_cloud
+    MODIFY start_time DATETIME NOT NULL,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (log_id, start_time);
+
+ALTER TABLE log_cloud
+    PARTITION BY RANGE (TO_DAYS(start_time)) (
+        PARTITION p_future VALUES LESS THAN MAXVALUE
+    );
@@ -0,0 +1,30 @@
+-- 트래픽 롤업 (app/rollup.py)
+-- 키 컬럼은 NULL 대신 '' / 0 을 써야 UNIQUE(PRIMARY) 키로 ON DUPLICATE KEY UPDATE 합산이 된다.
+
+CREATE TABLE IF NOT EXISTS traffic_rollup_minute (
+    bucket            DATETIME     NOT NULL,              -- 분 시작 시각
+    log_type          VARCHAR(16)  NOT NULL,              -- ONPREM / CLOUD / CLOUDTRAIL
+    source_ip         VARCHAR(45)  NOT NULL DEFAULT '',
+    destination_ip    VARCHAR(255) NOT NULL DEFAULT '',   -- CLOUDTRAIL 은 eventSource
+    destination_port  INT          NOT NULL DEFAULT 0,
+    protocol          VARCHAR(16)  NOT NULL DEFAULT '',
+    action            VARCHAR(16)  NOT NULL DEFAULT '',   -- CLOUDTRAIL 은 change_type
+    flows             BIGINT       NOT NULL DEFAULT 0,
+    packets           BIGINT       NOT NULL DEFAULT 0,
+    bytes             BIGINT       NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, log_type, source_ip, destination_ip, destination_port, protocol, action)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS traffic_rollup_hour (
+    bucket            DATETIME     NOT NULL,              -- 시간 시작 시각
+    log_type          VARCHAR(16)  NOT NULL,
+    source_ip         VARCHAR(45)  NOT NULL DEFAULT '',
+    destination_ip    VARCHAR(255) NOT NULL DEFAULT '',
+    destination_port  INT          NOT NULL DEFAULT 0,
+    protocol          VARCHAR(16)  NOT NULL DEFAULT '',
+    action            VARCHAR(16)  NOT NULL DEFAULT '',
+    flows             BIGINT       NOT NULL DEFAULT 0,
+    packets           BIGINT       NOT NULL DEFAULT 0,
+    bytes             BIGINT       NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, log_type, source_ip, destination_ip, destination_port, protocol, action)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
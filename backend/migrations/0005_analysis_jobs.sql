@@ -0,0 +1,17 @@
+-- AI 분석 비동기 작업 (app/services/analysis_jobs.py, app/analysis_tasks.py)
+-- job_key 가 같고 최근에 끝난(또는 진행 중인) 작업이 있으면 새로 만들지 않고 재사용한다.
+
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    job_id       CHAR(32)     NOT NULL,                    -- uuid4 hex
+    job_key      CHAR(40)     NOT NULL,                    -- sha1(kind + 파라미터)
+    kind         VARCHAR(32)  NOT NULL,                    -- threats / traffic_report / policy_report
+    params       JSON         NOT NULL,
+    state        VARCHAR(16)  NOT NULL DEFAULT 'PENDING',  -- PENDING / RUNNING / SUCCESS / FAILURE
+    result       LONGTEXT     NULL,                        -- 응답 JSON ({"report": ...} / {"threats": [...]})
+    error        TEXT         NULL,
+    created_at   DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at   DATETIME     NULL,
+    finished_at  DATETIME     NULL,
+    PRIMARY KEY (job_id),
+    KEY idx_analysis_jobs_key (job_key, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
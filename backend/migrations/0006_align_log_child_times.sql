@@ -0,0 +1,12 @@
+-- 타입 테이블 시각을 log_common.timestamp 와 맞춤
+-- 로그 조회는 c.log_id + c.timestamp 로 log_onprem / log_cloud 를 조인해 같은 일자 파티션만 읽는다.
+-- 이전 적재 경로는 두 시각을 따로 계산해 (수신 시각 대체 등) 어긋난 행이 있을 수 있다.
+-- 파티션 키 UPDATE 라 해당 행은 맞는 일자 파티션으로 옮겨진다.
+
+UPDATE log_onprem o JOIN log_common c ON c.log_id = o.log_id
+    SET o.timestamp = c.timestamp
+    WHERE o.timestamp <> c.timestamp;
+
+UPDATE log_cloud l JOIN log_common c ON c.log_id = l.log_id
+    SET l.start_time = c.timestamp
+    WHERE l.start_time <> c.timestamp;
@@ -0,0 +1,7 @@
+-- save_cloudtrail.get_previous_after / preload_previous_after:
+--   정책별 "가장 최근" 이력을 적재 순서(history_id)가 아닌 eventTime(timestamp, history_id) 기준으로 찾음
+--   WHERE policy_id = ? ORDER BY timestamp DESC, history_id DESC LIMIT 1
+CREATE INDEX idx_policy_history_c_policy_ts ON policy_history_c (policy_id, timestamp, history_id);
+
+-- (policy_id, history_id) 인덱스는 위 인덱스로 대체
+DROP INDEX idx_policy_history_c_policy_hist ON policy_history_c;
@@ -3,16 +3,29 @@ import requests
 
 API_PORT = os.environ.get("API_PORT", "5001")
 BASE_URL = f"http://localhost:{API_PORT}"
+PAGE_SIZE = int(os.environ.get("API_FETCH_PAGE_SIZE", "1000"))
+
+def iter_policies(policy_type: str, range_type: str, base_url: str = BASE_URL, page_size: int = PAGE_SIZE):
+    """
+    /api/policy?type={policy_type}&range={range_type} 를 next_cursor 를 따라 페이지 단위로 읽어 하나씩 yield 합니다.
+    """
+    url = f"{base_url}/api/policy"
+    params = {"type": policy_type, "range": range_type, "limit": page_size}
+    while True:
+        try:
+            response = requests.get(url, params=params)
+            response.raise_for_status()
+            body = response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"❌ API 호출 중 오류 발생: {e}")
+            return
+        yield from body.get("data", [])
+        if not body.get("next_cursor"):
+            return
+        params["cursor"] = body["next_cursor"]
 
 def fetch_policies(policy_type: str, range_type: str, base_url: str = BASE_URL):
     """
-    /api/policy?type={policy_type}&range={range_type} 형식으로 정책 데이터를 가져옵니다.
+    /api/policy?type={policy_type}&range={range_type} 형식으로 정책 데이터를 가져옵니다. (모든 페이지)
     """
-    url = f"{base_url}/api/policy?type={policy_type}&range={range_type}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json().get("data", [])
-    except requests.exceptions.RequestException as e:
-        print(f"❌ API 호출 중 오류 발생: {e}")
-        return []
+    return list(iter_policies(policy_type, range_type, base_url))
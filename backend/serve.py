@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+운영용 서버 실행 (gunicorn, 멀티 워커 + 스레드)
+
+    python3 serve.py            # 대시보드 API(5001) + 로그 수집 API(5000)
+    python3 serve.py api        # 대시보드 API 만
+    python3 serve.py ingest     # 로그 수집 API 만
+
+워커/스레드/타임아웃은 gunicorn.conf.py 의 환경 변수(API_WORKERS, INGEST_THREADS 등)로 조정.
+개발 중에는 기존처럼 python run.py / python3 app/log_app.py 를 사용한다.
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROLES = ("api", "ingest")
+
+
+def start(role):
+    env = dict(os.environ, SERVER_ROLE=role)
+    cmd = [sys.executable, "-m", "gunicorn", "-c", os.path.join(BASE_DIR, "gunicorn.conf.py"), f"wsgi:{role}"]
+    print(f"[..] {role}: {' '.join(cmd[2:])}")
+    return subprocess.Popen(cmd, cwd=BASE_DIR, env=env)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gunicorn 으로 API / 수집 서버 실행")
+    parser.add_argument("role", nargs="?", choices=ROLES + ("all",), default="all")
+    args = parser.parse_args()
+
+    roles = ROLES if args.role == "all" else (args.role,)
+    procs = {role: start(role) for role in roles}
+
+    def shutdown(signum, _frame):
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.send_signal(signum)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    # 하나라도 종료되면 나머지도 정리 (supervisor/systemd 가 다시 띄우도록 같이 종료)
+    exit_code = 0
+    try:
+        while all(proc.poll() is None for proc in procs.values()):
+            time.sleep(1)
+    finally:
+        for role, proc in procs.items():
+            if proc.poll() is None:
+                proc.terminate()
+            code = proc.wait()
+            if code:
+                print(f"❌ {role} 종료 코드 {code}")
+                exit_code = exit_code or code
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+WSGI 진입점 (gunicorn 용)
+
+    api     대시보드 API (app.create_app, 기본 5001)
+    ingest  로그 수집 API (app/log_app.py, 기본 5000)
+
+gunicorn.conf.py 의 preload_app 으로 마스터에서 한 번 import 한 뒤 워커를 fork 한다.
+커넥션 풀, write-behind 버퍼 등 스레드/소켓을 쓰는 객체는 프로세스(pid)별로 처음 쓸 때 만들어지므로
+fork 전에 만들어지지 않는다.
+"""
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# log_app.py 는 app 디렉터리 기준 import (from log_db import ...) 를 사용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from app import create_app, connector_db, response_cache
+
+# 같은 파일이 connector_db / app.connector_db 두 모듈로 로드되면 커넥션 풀·프로브 스레드·캐시 세대가
+# 둘로 갈라지므로, log_app 쪽 bare import 가 패키지 모듈을 그대로 쓰도록 별칭 등록 (log_app import 전)
+for _module in (connector_db, response_cache):
+    sys.modules[_module.__name__.rsplit(".", 1)[-1]] = _module
+
+import log_app
+
+api = create_app()
+ingest = log_app.app
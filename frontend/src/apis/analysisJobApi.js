@@ -0,0 +1,23 @@
+// src/apis/analysisJobApi.js
+// AI 분석 API 는 작업(job)만 만들고 202 + job_id 를 바로 반환한다.
+// 작업이 끝날 때까지 상태를 폴링한 뒤 결과({ status, report | threats })를 반환.
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export const runAnalysisJob = async (api, path, params, { interval = 2000, timeout = 300000 } = {}) => {
+  const { data: job } = await api.get(path, { params });
+  if (!job.job_id) return job; // sync=1 등 결과를 바로 받은 경우
+
+  const deadline = Date.now() + timeout;
+  let state = job.state;
+  while (state === 'PENDING' || state === 'RUNNING') {
+    if (Date.now() > deadline) throw new Error('Analysis job timed out');
+    await sleep(interval);
+    const { data } = await api.get(job.status_url);
+    state = data.job.state;
+  }
+
+  // 실패한 작업은 500 + { status: 'error', message } 로 오므로 호출 측에서 status 로 판단
+  const { data } = await api.get(job.result_url, { validateStatus: (s) => s < 600 });
+  return data;
+};
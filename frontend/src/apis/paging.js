@@ -0,0 +1,19 @@
+// src/apis/paging.js
+// /api/logs, /api/policy 는 한 번에 한 페이지(limit 건)와 next_cursor 를 반환한다.
+// 구간 전체가 필요한 화면은 next_cursor 가 없을 때까지 이어서 요청해 합친다.
+
+const PAGE_SIZE = 10000; // 서버 API_PAGE_MAX_LIMIT 기본값
+
+export const fetchAllPages = async (api, path, params = {}) => {
+  const rows = [];
+  let cursor = null;
+  do {
+    const { data } = await api.get(path, {
+      params: { ...params, limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    });
+    if (data.status !== 'success') return data;
+    rows.push(...data.data);
+    cursor = data.next_cursor;
+  } while (cursor);
+  return { status: 'success', data: rows };
+};
@@ -1,5 +1,6 @@
 // src/apis/policyApi.js
 import axios from "axios";
+import { fetchAllPages } from "./paging";
 
 const api = axios.create({
   baseURL: import.meta.env.VITE_API_BASE_URL || "http://localhost:5001",
@@ -22,6 +23,5 @@ export const applyNewPolicy = async (formData) => {
 
 // 온프레/클라우드 정책 변경 이력 조회
 export const getPolicyHistory = async (type = "onprem", range = "daily") => {
-  const { data } = await api.get("/api/policy", { params: { type, range } });
-  return data; // { status, data: [ {event_name, user, timestamp, details} ] }
+  return fetchAllPages(api, "/api/policy", { type, range }); // { status, data: [ {event_name, user, timestamp, details} ] }
 };
@@ -5,6 +5,8 @@ import { AreaChart, Area, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'rec
 import { MdInfo } from 'react-icons/md';
 import { useQuery } from '@tanstack/react-query';
 import axios from 'axios';
+import { runAnalysisJob } from '../apis/analysisJobApi';
+import { fetchAllPages } from '../apis/paging';
 
 // --- axios 클라이언트 ---
 const api = axios.create({
@@ -14,14 +16,14 @@ const api = axios.create({
 
 // --- API 함수 ---
 const fetchGeneralLogs = async (range) => {
-  const { data } = await api.get('/api/logs', { params: { range } });
+  const data = await fetchAllPages(api, '/api/logs', { range });
   if (data.status !== 'success') throw new Error(data.message);
   return data.data;
 };
 
 const fetchPolicyLogs = async (type, range) => {
   // 임시: 정책 로그도 /api/logs 로 가져오고 type 필터링한다고 가정
-  const { data } = await api.get('/api/logs', { params: { range } });
+  const data = await fetchAllPages(api, '/api/logs', { range });
   if (data.status !== 'success') throw new Error(data.message);
   // 정책 로그는 log_type으로 구분 (CLOUD/ONPREM)
   return data.data.filter((l) => l.log_type?.toLowerCase() === type);
@@ -29,7 +31,7 @@ const fetchPolicyLogs = async (type, range) => {
 
 // Threat Logs (항상 10분 단위)
 const fetchThreatLogs = async () => {
-  const { data } = await api.get('/api/logs/threats', { params: { range: '10min' } });
+  const data = await runAnalysisJob(api, '/api/logs/threats', { range: '10min' });
   if (data.status !== 'success') throw new Error(data.message);
   return data.threats;
 };
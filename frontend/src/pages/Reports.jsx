@@ -7,6 +7,7 @@ import rehypeHighlight from 'rehype-highlight';
 import 'highlight.js/styles/github-dark.css';
 import { MdDateRange, MdTopic, MdFileCopy, MdAddAlert, MdNotificationsOff, MdAdd } from 'react-icons/md';
 import axios from 'axios';
+import { runAnalysisJob } from '../apis/analysisJobApi';
 
 // --- axios ---
 const api = axios.create({
@@ -188,17 +189,17 @@ const Reports = () => {
       setIsGenerating(true);
       setReportContent('AI generating a report... 🤖');
 
-      let res;
+      let data;
       if (topic === 'general') {
-        res = await api.get('/api/logs/analysis-report', { params: { range } });
+        data = await runAnalysisJob(api, '/api/logs/analysis-report', { range });
       } else if (topic === 'onprem') {
-        res = await api.get('/api/policy/analysis-report', { params: { type: 'onprem', range } });
+        data = await runAnalysisJob(api, '/api/policy/analysis-report', { type: 'onprem', range });
       } else if (topic === 'cloud') {
-        res = await api.get('/api/policy/analysis-report', { params: { type: 'cloud', range } });
+        data = await runAnalysisJob(api, '/api/policy/analysis-report', { type: 'cloud', range });
       }
 
-      if (res?.data?.status === 'success') {
-        setReportContent(normalizeMarkdown(res.data.report));
+      if (data?.status === 'success') {
+        setReportContent(normalizeMarkdown(data.report));
       } else {
         setReportContent('❌ Failed to generate report. Please try again.');
       }